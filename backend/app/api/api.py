@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import auth, oauth, strava, stats, profile, calendar, weather
+from app.api.routes import auth, oauth, strava, stats, profile, calendar, weather, goals, dashboard
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -9,3 +9,5 @@ api_router.include_router(stats.router, prefix="", tags=["stats"])
 api_router.include_router(profile.router, prefix="", tags=["profile"])
 api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
 api_router.include_router(weather.router, prefix="/weather", tags=["weather"])
+api_router.include_router(goals.router, prefix="/goals", tags=["goals"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
@@ -1,14 +1,16 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-import json
-import urllib.request
 
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.calendar import CalendarEvent
 from app.schemas.calendar import CalendarEvent as CalendarEventSchema
+from app.services.calendar_feed import CalendarFeedService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -23,111 +25,24 @@ def get_calendar_events(
 ):
     """Get user's calendar events (future events only by default)"""
     
-    # Auto-refresh if URL exists and refresh requested or no events
-    if current_user.calendar_url and (refresh or refresh):
+    # Auto-refresh if URL exists and refresh requested
+    if current_user.calendar_url and refresh:
         try:
-            import re
-            # Fetch the .ics content from URL
-            with urllib.request.urlopen(current_user.calendar_url, timeout=30) as response:
-                content = response.read().decode('utf-8')
-            
-            # Parse events
-            events = []
-            in_event = False
-            current_event = {}
-            
-            for line in content.split('\n'):
-                line = line.strip()
-                
-                if line == 'BEGIN:VEVENT':
-                    in_event = True
-                    current_event = {}
-                elif line == 'END:VEVENT':
-                    in_event = False
-                    if 'summary' in current_event:
-                        events.append(current_event)
-                elif in_event:
-                    if line.startswith('SUMMARY:'):
-                        current_event['summary'] = line[8:]
-                    elif line.startswith('DESCRIPTION:'):
-                        current_event['description'] = line[12:]
-                    elif line.startswith('DTSTART'):
-                        match = re.search(r'DTSTART(?:;.*)?:(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})', line)
-                        if match:
-                            current_event['start'] = datetime(
-                                int(match.group(1)), int(match.group(2)), int(match.group(3)),
-                                int(match.group(4)), int(match.group(5)), int(match.group(6))
-                            )
-                        else:
-                            match = re.search(r'DTSTART(?:;.*)?:(\d{4})(\d{2})(\d{2})', line)
-                            if match:
-                                current_event['start'] = datetime(
-                                    int(match.group(1)), int(match.group(2)), int(match.group(3))
-                                )
-                    elif line.startswith('DTEND'):
-                        match = re.search(r'DTEND(?:;.*)?:(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})', line)
-                        if match:
-                            current_event['end'] = datetime(
-                                int(match.group(1)), int(match.group(2)), int(match.group(3)),
-                                int(match.group(4)), int(match.group(5)), int(match.group(6))
-                            )
-                        else:
-                            match = re.search(r'DTEND(?:;.*)?:(\d{4})(\d{2})(\d{2})', line)
-                            if match:
-                                current_event['end'] = datetime(
-                                    int(match.group(1)), int(match.group(2)), int(match.group(3))
-                                )
-            
-            # Delete old URL events and add new ones
-            db.query(CalendarEvent).filter(
-                CalendarEvent.user_id == current_user.id,
-                CalendarEvent.source == 'url'
-            ).delete()
-            
-            for ev in events:
-                start = ev.get('start')
-                end = ev.get('end', start)
-                
-                if start:
-                    cal_event = CalendarEvent(
-                        user_id=current_user.id,
-                        title=ev.get('summary', 'Unnamed'),
-                        description=ev.get('description', ''),
-                        start=start,
-                        end=end,
-                        source='url'
-                    )
-                    db.add(cal_event)
-            
-            db.commit()
-        except Exception as e:
-            print(f"Auto-refresh failed: {e}")
-    
-    query = db.query(CalendarEvent).filter(CalendarEvent.user_id == current_user.id)
+            events = CalendarFeedService.fetch(current_user.calendar_url)
+            CalendarFeedService.replace_url_events(db, current_user.id, events)
+        except Exception:
+            db.rollback()
+            logger.exception("Calendar auto-refresh failed")
     
-    # Default: only return future events
-    now = datetime.now()
-    query = query.filter(CalendarEvent.end >= now)
-    
-    events = query.order_by(CalendarEvent.start.asc()).all()
-    return events
-    
-    if start:
-        try:
-            start_dt = datetime.fromisoformat(str(start))
-            query = query.filter(CalendarEvent.end >= start_dt)
-        except (ValueError, TypeError):
-            pass
-    
-    if end:
-        try:
-            end_dt = datetime.fromisoformat(str(end))
-            query = query.filter(CalendarEvent.start <= end_dt)
-        except (ValueError, TypeError):
-            pass
-    
-    events = query.order_by(CalendarEvent.start.asc()).all()
-    return events
+    return CalendarFeedService.upcoming(db, current_user.id, parse_datetime(start), parse_datetime(end))
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """ISO timestamp from the query, None if missing or invalid."""
+    try:
+        return datetime.fromisoformat(str(value)) if value else None
+    except ValueError:
+        return None
 
 
 @router.post("/import")
@@ -138,59 +53,8 @@ def import_ical(
 ):
     """Import events from iCal file"""
     try:
-        import re
-        from datetime import datetime
-        
         content = file.file.read().decode('utf-8')
-        
-        # Simple iCal parser
-        events = []
-        in_event = False
-        current_event = {}
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            
-            if line == 'BEGIN:VEVENT':
-                in_event = True
-                current_event = {}
-            elif line == 'END:VEVENT':
-                in_event = False
-                if 'summary' in current_event:
-                    events.append(current_event)
-            elif in_event:
-                if line.startswith('SUMMARY:'):
-                    current_event['summary'] = line[8:]
-                elif line.startswith('DESCRIPTION:'):
-                    current_event['description'] = line[12:]
-                elif line.startswith('DTSTART'):
-                    # Parse DTSTART:20260223T100000
-                    match = re.search(r'DTSTART(?:;.*)?:(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})', line)
-                    if match:
-                        current_event['start'] = datetime(
-                            int(match.group(1)), int(match.group(2)), int(match.group(3)),
-                            int(match.group(4)), int(match.group(5)), int(match.group(6))
-                        )
-                    else:
-                        # Try date only format
-                        match = re.search(r'DTSTART(?:;.*)?:(\d{4})(\d{2})(\d{2})', line)
-                        if match:
-                            current_event['start'] = datetime(
-                                int(match.group(1)), int(match.group(2)), int(match.group(3))
-                            )
-                elif line.startswith('DTEND'):
-                    match = re.search(r'DTEND(?:;.*)?:(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})', line)
-                    if match:
-                        current_event['end'] = datetime(
-                            int(match.group(1)), int(match.group(2)), int(match.group(3)),
-                            int(match.group(4)), int(match.group(5)), int(match.group(6))
-                        )
-                    else:
-                        match = re.search(r'DTEND(?:;.*)?:(\d{4})(\d{2})(\d{2})', line)
-                        if match:
-                            current_event['end'] = datetime(
-                                int(match.group(1)), int(match.group(2)), int(match.group(3))
-                            )
+        events = CalendarFeedService.parse_ics(content)
         
         imported_count = 0
         for ev in events:
@@ -237,59 +101,7 @@ def import_ical_from_url(
 ):
     """Import events from an iCal URL (Google Calendar, CalDAV, etc.)"""
     try:
-        import re
-        from datetime import datetime
-        
-        # Fetch the .ics content from URL
-        with urllib.request.urlopen(url, timeout=30) as response:
-            content = response.read().decode('utf-8')
-        
-        # Simple iCal parser (same as file import)
-        events = []
-        in_event = False
-        current_event = {}
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            
-            if line == 'BEGIN:VEVENT':
-                in_event = True
-                current_event = {}
-            elif line == 'END:VEVENT':
-                in_event = False
-                if 'summary' in current_event:
-                    events.append(current_event)
-            elif in_event:
-                if line.startswith('SUMMARY:'):
-                    current_event['summary'] = line[8:]
-                elif line.startswith('DESCRIPTION:'):
-                    current_event['description'] = line[12:]
-                elif line.startswith('DTSTART'):
-                    match = re.search(r'DTSTART(?:;.*)?:(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})', line)
-                    if match:
-                        current_event['start'] = datetime(
-                            int(match.group(1)), int(match.group(2)), int(match.group(3)),
-                            int(match.group(4)), int(match.group(5)), int(match.group(6))
-                        )
-                    else:
-                        match = re.search(r'DTSTART(?:;.*)?:(\d{4})(\d{2})(\d{2})', line)
-                        if match:
-                            current_event['start'] = datetime(
-                                int(match.group(1)), int(match.group(2)), int(match.group(3))
-                            )
-                elif line.startswith('DTEND'):
-                    match = re.search(r'DTEND(?:;.*)?:(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})', line)
-                    if match:
-                        current_event['end'] = datetime(
-                            int(match.group(1)), int(match.group(2)), int(match.group(3)),
-                            int(match.group(4)), int(match.group(5)), int(match.group(6))
-                        )
-                    else:
-                        match = re.search(r'DTEND(?:;.*)?:(\d{4})(\d{2})(\d{2})', line)
-                        if match:
-                            current_event['end'] = datetime(
-                                int(match.group(1)), int(match.group(2)), int(match.group(3))
-                            )
+        events = CalendarFeedService.fetch(url)
         
         imported_count = 0
         for ev in events:
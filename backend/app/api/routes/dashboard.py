@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Callable, Dict, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_db, get_current_user
+from app.api.routes.stats import ACTIVITY_COLUMNS, activity_item, get_athlete, get_weekly_stats, get_training_load
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.calendar import CalendarEvent as CalendarEventSchema
+from app.services.activity_columns import ActivityColumns
+from app.services.calendar_feed import CalendarFeedService
+from app.services.notion_oauth import NotionOAuthService
+from app.services.notion_sessions import NotionSessionService
+from app.services.weather import WeatherService
+
+router = APIRouter()
+
+
+async def _external(call: Optional[Callable[[], Any]]) -> Any:
+    """Run a blocking HTTP call in a thread, bounded by ``DASHBOARD_PART_TIMEOUT``."""
+    if call is None:
+        return None
+    return await asyncio.wait_for(run_in_threadpool(call), settings.DASHBOARD_PART_TIMEOUT)
+
+
+def _error(exc: BaseException) -> str:
+    return "timeout" if isinstance(exc, asyncio.TimeoutError) else str(getattr(exc, "detail", None) or exc)
+
+
+@router.get("")
+async def get_dashboard(
+    days: int = 7,
+    limit: int = Query(100, ge=1),
+    session_days: int = 90,
+    refresh_calendar: bool = True,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Everything the dashboard shows in one response.
+
+    Athlete, latest activities, stats of the last ``days`` days and the
+    training load are read one after another on the request's session,
+    while the Notion sessions, the calendar feed and the sunrise/sunset
+    forecast are fetched concurrently in threads, each within
+    ``DASHBOARD_PART_TIMEOUT``. A part that fails or times out is left out
+    (null) and named in ``errors``; stored calendar events are still
+    returned when the feed can't be refreshed.
+    """
+    timeout = settings.DASHBOARD_PART_TIMEOUT
+    user_id = current_user.id
+    notion_token, location = await run_in_threadpool(
+        lambda: (NotionOAuthService.get_valid_access_token(db, user_id), WeatherService.location(db, user_id))
+    )
+    calendar_url = current_user.calendar_url if refresh_calendar else None
+
+    external = {
+        "training_sessions": asyncio.create_task(_external(
+            (lambda: NotionSessionService.fetch_sessions(notion_token, session_days, timeout)) if notion_token else None
+        )),
+        "calendar_feed": asyncio.create_task(_external(
+            (lambda: CalendarFeedService.fetch(calendar_url, timeout)) if calendar_url else None
+        )),
+        "weather": asyncio.create_task(_external(lambda: WeatherService.daily_sun(*location, timeout)))
+    }
+
+    payload: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+
+    def database_parts():
+        parts = {
+            "athlete": lambda: get_athlete(current_user=current_user, db=db),
+            "activities": lambda: [
+                activity_item(row) for row in ActivityColumns.page(db, user_id, ACTIVITY_COLUMNS, limit)[0]
+            ],
+            "week_stats": lambda: get_weekly_stats(days=days, current_user=current_user, db=db),
+            "training_load": lambda: get_training_load(current_user=current_user, db=db)
+        }
+        for name, part in parts.items():
+            try:
+                payload[name] = part()
+            except Exception as exc:
+                db.rollback()
+                payload[name] = None
+                errors[name] = _error(exc)
+
+    await run_in_threadpool(database_parts)
+
+    results = dict(zip(external, await asyncio.gather(*external.values(), return_exceptions=True)))
+    for name, result in results.items():
+        if isinstance(result, BaseException):
+            errors[name] = _error(result)
+            results[name] = None
+    payload["training_sessions"] = results["training_sessions"] if notion_token else []
+    payload["weather"] = results["weather"]
+
+    def calendar_events():
+        if results["calendar_feed"] is not None:
+            CalendarFeedService.replace_url_events(db, user_id, results["calendar_feed"])
+        return [
+            CalendarEventSchema.model_validate(event).model_dump(mode="json")
+            for event in CalendarFeedService.upcoming(db, user_id)
+        ]
+
+    try:
+        payload["calendar_events"] = await run_in_threadpool(calendar_events)
+    except Exception as exc:
+        db.rollback()
+        payload["calendar_events"] = None
+        errors["calendar_events"] = _error(exc)
+
+    payload["errors"] = errors
+    return payload
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.api.deps import get_db, get_current_user
+from app.models.user import User
+from app.models.goal import Goal
+from app.schemas.goal import Goal as GoalSchema, GoalCreate
+from app.services.goal_forecast import GoalForecastService
+from app.services.taper_optimizer import TaperOptimizer, DEFAULT_MAX_CTL_LOSS
+
+router = APIRouter()
+
+
+def _get_goal(db: Session, user_id: int, goal_id: int) -> Goal:
+    goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == user_id).first()
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return goal
+
+
+@router.get("", response_model=List[GoalSchema])
+def get_goals(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Goals with their forecast, recomputed only where the load data changed"""
+    return GoalForecastService.forecast_user(db, current_user.id)
+
+
+@router.post("", response_model=GoalSchema)
+def create_goal(
+    goal_in: GoalCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    goal = Goal(user_id=current_user.id, **goal_in.model_dump())
+    db.add(goal)
+    db.flush()
+    GoalForecastService.forecast(db, goal)
+    db.commit()
+    db.refresh(goal)
+    return goal
+
+
+@router.get("/{goal_id}/forecast", response_model=GoalSchema)
+def get_goal_forecast(
+    goal_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    goal = _get_goal(db, current_user.id, goal_id)
+    GoalForecastService.forecast(db, goal)
+    db.commit()
+    db.refresh(goal)
+    return goal
+
+
+@router.get("/{goal_id}/taper")
+def get_goal_taper(
+    goal_id: int,
+    max_ctl_loss: float = Query(DEFAULT_MAX_CTL_LOSS, ge=0, le=0.5),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recommended daily loads for a 1-3 week taper towards the goal's event date"""
+    return TaperOptimizer.optimize(db, _get_goal(db, current_user.id, goal_id), max_ctl_loss)
+
+
+@router.delete("/{goal_id}")
+def delete_goal(
+    goal_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    db.delete(_get_goal(db, current_user.id, goal_id))
+    db.commit()
+    return {"status": "deleted"}
@@ -45,7 +45,7 @@ def authorize_strava(current_user: User = Depends(get_current_user)):
     return {"url": url}
 
 @router.get("/strava/callback")
-def strava_callback(
+async def strava_callback(
     code: str = Query(..., description="Authorization code from Strava"),
     error: str = Query(None, description="Error from Strava if any"),
     current_user: User = Depends(get_current_user),
@@ -56,7 +56,7 @@ def strava_callback(
         raise HTTPException(status_code=400, detail=f"Strava error: {error}")
     
     try:
-        result = StravaOAuthService.exchange_code_for_token(db, current_user.id, code)
+        result = await StravaOAuthService.exchange_code_for_token(db, current_user.id, code)
         
         return {
             "status": "success",
@@ -12,10 +12,19 @@ from app.schemas.profile import (
     UserProfileUpdate,
     BodyMetric as BodyMetricSchema,
     BodyMetricCreate,
+    AthleteThreshold as AthleteThresholdSchema,
+    AthleteThresholdCreate,
 )
+from app.services.sync_jobs import SyncJobService
+from app.services.thresholds import ThresholdService
 
 router = APIRouter()
 
+# Versioned: a change applies from today on
+THRESHOLD_FIELDS = ("ftp", "threshold_hr", "threshold_pace")
+# Not versioned, changing them re-rates the whole activity history
+HEART_RATE_FIELDS = ("max_hr", "resting_hr")
+
 
 @router.get("/profile", response_model=UserProfileSchema)
 def get_profile(
@@ -50,6 +59,14 @@ def update_profile(
         db.add(profile)
     
     update_data = profile_update.model_dump(exclude_unset=True)
+    thresholds_changed = {
+        field: value for field, value in update_data.items()
+        if field in THRESHOLD_FIELDS and getattr(profile, field) != value
+    }
+    heart_rate_changed = any(
+        field in HEART_RATE_FIELDS and getattr(profile, field) != value
+        for field, value in update_data.items()
+    )
     
     # Track if weight changed - create metric entry
     new_weight = update_data.get('weight')
@@ -69,10 +86,58 @@ def update_profile(
         db.add(metric)
         db.commit()
     
+    if thresholds_changed:
+        # The very first thresholds rate the whole history
+        valid_from = _today() if ThresholdService.get_versions(db, current_user.id) else None
+        ThresholdService.set_version(db, current_user.id, valid_from, thresholds_changed)
+    if heart_rate_changed:
+        SyncJobService.enqueue_metrics(db, current_user.id)
+    
     db.refresh(profile)
     return profile
 
 
+@router.get("/profile/thresholds", response_model=List[AthleteThresholdSchema])
+def get_thresholds(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Threshold versions, oldest first; each applies until the next one"""
+    return ThresholdService.get_versions(db, current_user.id)
+
+
+@router.post("/profile/thresholds", response_model=AthleteThresholdSchema)
+def set_thresholds(
+    thresholds: AthleteThresholdCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Add or change the thresholds valid from a date (default today).
+
+    Only activities in that version's validity window are re-rated, in the background.
+    """
+    values = thresholds.model_dump(exclude_unset=True)
+    valid_from = values.pop("valid_from", None)
+    valid_from = datetime.combine(valid_from, datetime.min.time()) if valid_from else _today()
+    version, _ = ThresholdService.set_version(db, current_user.id, valid_from, values)
+    return version
+
+
+@router.delete("/profile/thresholds/{version_id}")
+def delete_thresholds(
+    version_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a threshold version; its activities are re-rated with the version before"""
+    job = ThresholdService.delete_version(db, current_user.id, version_id)
+    return {"status": "deleted", "job": SyncJobService.to_dict(job)}
+
+
+def _today() -> datetime:
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+
 @router.get("/metrics", response_model=List[BodyMetricSchema])
 def get_body_metrics(
     limit: int = 30,
@@ -1,13 +1,43 @@
-from fastapi import APIRouter, Depends
+from typing import Dict, Any, Optional
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from app.api.deps import get_db, get_current_user
+from app.api.streaming import parse_fields, stream_items
 from app.models.user import User
-from app.models.activity import Activity
 from app.models.oauth import OAuthConnection
+from app.models.curve import ActivityCurve
+from app.schemas.simulation import SimulationRequest
+from app.services.activity_columns import ActivityColumns
+from app.services.notion_sessions import NotionSessionService
+from app.services.performance_snapshots import SnapshotService
+from app.services.plan_simulator import PlanSimulator
+from app.services.power_curves import CurveService, SCOPES
+from app.services.volume_stats import VolumeService
 
 router = APIRouter()
 
+# Everything the activity list shows; the description text stays in the table
+ACTIVITY_COLUMNS = (
+    "id", "strava_id", "name", "type", "sport_type", "start_date", "start_date_local", "distance",
+    "moving_time", "elapsed_time", "total_elevation_gain", "average_speed", "max_speed", "average_heartrate",
+    "max_heartrate", "average_watts", "kilojoules", "calories", "tss", "normalized_power", "intensity_factor"
+)
+
+# Shown as 0 rather than null when missing
+ZERO_DEFAULT_COLUMNS = ("distance", "moving_time", "elapsed_time", "total_elevation_gain", "average_speed", "max_speed")
+
+
+def activity_item(row) -> Dict[str, Any]:
+    item = row._asdict()
+    if item.get("start_date"):
+        item["start_date"] = item["start_date"].isoformat()
+    for column in ZERO_DEFAULT_COLUMNS:
+        if column in item:
+            item[column] = item[column] or 0
+    return item
+
 @router.get("/athlete")
 def get_athlete(
     current_user: User = Depends(get_current_user),
@@ -37,35 +67,21 @@ def get_athlete(
 
 @router.get("/activities")
 def get_activities(
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
+    before: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get activities from our DB."""
-    activities = db.query(Activity).filter(
-        Activity.user_id == current_user.id
-    ).order_by(Activity.start_date.desc()).limit(limit).all()
-    
-    return [{
-        "id": a.id,
-        "strava_id": a.strava_id,
-        "name": a.name,
-        "type": a.type,
-        "sport_type": a.sport_type,
-        "start_date": a.start_date.isoformat() if a.start_date else None,
-        "start_date_local": a.start_date_local,
-        "distance": a.distance or 0,
-        "moving_time": a.moving_time or 0,
-        "elapsed_time": a.elapsed_time or 0,
-        "total_elevation_gain": a.total_elevation_gain or 0,
-        "average_speed": a.average_speed or 0,
-        "max_speed": a.max_speed or 0,
-        "average_heartrate": a.average_heartrate,
-        "max_heartrate": a.max_heartrate,
-        "average_watts": a.average_watts,
-        "kilojoules": a.kilojoules,
-        "calories": a.calories
-    } for a in activities]
+    """Activities from our DB, newest first, streamed as a JSON array or NDJSON.
+
+    The ``X-Next-Cursor`` response header, passed back as ``before``, pages
+    further back; ``fields`` (comma separated) selects the keys of each item.
+    """
+    columns = parse_fields(fields, ACTIVITY_COLUMNS)
+    rows, next_cursor = ActivityColumns.page(db, current_user.id, columns, limit, before)
+    return stream_items((activity_item(row) for row in rows), format == "ndjson", next_cursor)
 
 @router.get("/stats/week")
 def get_weekly_stats(
@@ -74,92 +90,145 @@ def get_weekly_stats(
     db: Session = Depends(get_db)
 ):
     """Get weekly statistics."""
-    from datetime import datetime, timedelta
-    
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    activities = db.query(Activity).filter(
-        Activity.user_id == current_user.id,
-        Activity.start_date >= start_date
-    ).all()
-    
-    # Group by day
-    activities_by_day = {}
-    total_distance = 0
-    total_time = 0
-    
-    for a in activities:
-        if a.start_date:
-            day_key = a.start_date.strftime("%Y-%m-%d")
-            if day_key not in activities_by_day:
-                activities_by_day[day_key] = {"distance": 0, "time": 0, "count": 0}
-            
-            activities_by_day[day_key]["distance"] += (a.distance or 0) / 1000  # km
-            activities_by_day[day_key]["time"] += (a.moving_time or 0) / 3600  # hours
-            activities_by_day[day_key]["count"] += 1
-            
-            total_distance += a.distance or 0
-            total_time += a.moving_time or 0
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
+    
+    day_totals = VolumeService.aggregate(db, current_user.id, "day", start_date)
+    activities_by_day = {
+        day["period_start"].isoformat(): {
+            "distance": day["distance"] / 1000,  # km
+            "time": day["moving_time"] / 3600,  # hours
+            "count": day["count"]
+        }
+        for day in day_totals
+    }
     
     return {
-        "total_distance_km": round(total_distance / 1000, 1),
-        "total_time_hours": round(total_time / 3600, 1),
-        "total_activities": len(activities),
+        "total_distance_km": round(sum(day["distance"] for day in day_totals) / 1000, 1),
+        "total_time_hours": round(sum(day["moving_time"] for day in day_totals) / 3600, 1),
+        "total_activities": sum(day["count"] for day in day_totals),
         "activities_by_day": activities_by_day
     }
 
+@router.get("/stats/volume")
+def get_volume(
+    period: str = Query("week", pattern="^(week|month|year)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Count, distance, moving time and elevation per week, month or year, in total and per sport type.
+
+    Defaults to the last year; read from the rollups maintained on ingest.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=365)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    
+    return {
+        "period": period,
+        "periods": VolumeService.get_volume(db, current_user.id, period, start, end)
+    }
+
 @router.get("/stats/training-load")
 def get_training_load(
+    days: int = 90,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Calculate training load (CTL, ATL, TSB)."""
-    from datetime import datetime, timedelta
-    import math
-    
-    # Get all activities from last 90 days
-    start_date = datetime.utcnow() - timedelta(days=90)
-    
-    activities = db.query(Activity).filter(
-        Activity.user_id == current_user.id,
-        Activity.start_date >= start_date
-    ).order_by(Activity.start_date).all()
-    
-    # Calculate TSS per day (simplified)
-    daily_tss = {}
-    for a in activities:
-        if a.start_date and a.moving_time:
-            day_key = a.start_date.strftime("%Y-%m-%d")
-            # Rough TSS calculation: (time in hours * IF * 100) / 100
-            # Assuming IF of 0.75 for simplicity
-            hours = a.moving_time / 3600
-            tss = hours * 0.75 * 100
-            daily_tss[day_key] = daily_tss.get(day_key, 0) + tss
-    
-    # Calculate CTL (42-day), ATL (7-day), TSB
-    ctl = 0
-    atl = 0
-    
-    # CTL = rolling 42-day average
-    ctl_values = list(daily_tss.values())
-    if len(ctl_values) >= 42:
-        ctl = sum(ctl_values[-42:]) / 42
-    elif len(ctl_values) > 0:
-        ctl = sum(ctl_values) / len(ctl_values)
+    """Daily CTL/ATL/TSB series (exponentially weighted, 42/7 days) plus today's values,
+    combined and per sport group (swim/bike/run), and the current FTP/VO2max/CSS estimates.
+
+    Defaults to the last ``days`` days; ``start``/``end`` select any range,
+    multi-year included.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=days - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
     
-    # ATL = rolling 7-day average
-    if len(ctl_values) >= 7:
-        atl = sum(ctl_values[-7:]) / 7
-    elif len(ctl_values) > 0:
-        atl = sum(ctl_values) / len(ctl_values)
+    series = SnapshotService.get_series(db, current_user.id, start, end)
     
-    tsb = ctl - atl
+    return {
+        "ctl": series["ctl"][-1],
+        "atl": series["atl"][-1],
+        "tsb": series["tsb"][-1],
+        "daily_tss": {day: tss for day, tss in zip(series["dates"], series["tss"]) if tss},
+        "sports": {
+            group: {"ctl": values["ctl"][-1], "atl": values["atl"][-1], "tsb": values["tsb"][-1]}
+            for group, values in series["sports"].items()
+        },
+        "estimates": series["estimates"],
+        "series": series
+    }
+
+@router.post("/stats/training-load/simulate")
+def simulate_training_load(
+    request: SimulationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Project CTL/ATL/TSB from today for one or more candidate plans, e.g. up to race day."""
+    plans = [plan.model_dump() for plan in request.plans]
+    if request.include_notion:
+        today = datetime.utcnow().date()
+        horizon = (request.race_date - today).days if request.race_date and request.race_date > today else 14
+        plans.append({"name": "Notion", "sessions": [
+            {"date": date.fromisoformat(session["date"][:10]), "tss": None,
+             "duration": session["duration"], "sport_type": session["type"], "name": session["name"]}
+            for session in NotionSessionService.get_sessions(db, current_user.id, horizon)
+            if session["date"]
+        ]})
+    return PlanSimulator.simulate(db, current_user.id, plans, request.race_date)
+
+@router.get("/stats/power-curve")
+def get_power_curve(
+    scope: str = "all",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Best mean power per duration: all-time, season or last 90 days, or a custom date range."""
+    return _curve_response(db, current_user.id, "power", scope, start, end)
+
+@router.get("/stats/pace-curve")
+def get_pace_curve(
+    scope: str = "all",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Best mean running speed (and pace) per duration."""
+    return _curve_response(db, current_user.id, "speed", scope, start, end)
+
+@router.get("/stats/activities/{activity_id}/curves")
+def get_activity_curves(
+    activity_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Power and pace curves of a single activity."""
+    curves = db.query(ActivityCurve).filter(
+        ActivityCurve.activity_id == activity_id,
+        ActivityCurve.user_id == current_user.id
+    ).all()
     
     return {
-        "ctl": round(ctl, 1),
-        "atl": round(atl, 1),
-        "tsb": round(tsb, 1),
-        "daily_tss": daily_tss
+        curve.metric: CurveService.to_points(curve.metric, np.frombuffer(curve.values, dtype=np.float32))
+        for curve in curves
+    }
+
+def _curve_response(db: Session, user_id: int, metric: str, scope: str, start, end):
+    if scope not in SCOPES:
+        raise HTTPException(status_code=400, detail=f"scope must be one of {', '.join(SCOPES)}")
+    return {
+        "scope": "range" if start or end else scope,
+        "points": CurveService.get_curve(db, user_id, metric, scope, start, end)
     }
 
 @router.get("/training-sessions")
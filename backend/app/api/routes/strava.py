@@ -1,136 +1,124 @@
-import requests
-from datetime import datetime, timedelta
-from typing import Optional
+import math
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.oauth import OAuthConnection
 from app.models.activity import Activity
-from app.core.config import settings
-from app.core.encryption import encrypt_token, decrypt_token
+from app.models.sync import SyncJob
+from app.services.strava_rate_limiter import rate_limiter, RateLimitExceeded, Priority
+from app.services.sync_jobs import SyncJobService
+from app.services.strava_webhooks import webhook_service
+from app.services.activity_streams import ActivityStreamService
 
 router = APIRouter()
 
-STRAVA_TOKEN_URL = "https://www.strava.com/oauth/token"
-STRAVA_API_URL = "https://www.strava.com/api/v3"
+def rate_limit_exception(e: RateLimitExceeded) -> HTTPException:
+    """429 with a Retry-After estimate instead of a generic Strava error."""
+    retry_after = math.ceil(e.retry_after)
+    return HTTPException(
+        status_code=429,
+        detail={"message": str(e), "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)}
+    )
 
-def get_valid_access_token(db: Session, user_id: int) -> Optional[str]:
-    """Get a valid Strava access token, refreshing if needed."""
+@router.post("/sync", status_code=202)
+def sync_strava(
+    full: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a Strava sync for the current user.
+
+    Only activities newer than the stored watermark are requested unless
+    ``full`` is set. A click while a sync is already queued or running
+    returns that job instead of starting a second one.
+    """
     connection = db.query(OAuthConnection).filter(
-        OAuthConnection.user_id == user_id, 
+        OAuthConnection.user_id == current_user.id,
         OAuthConnection.provider == "strava"
     ).first()
     
     if not connection:
-        return None
-        
-    # Check if expired (with 5 min buffer)
-    if connection.expires_at and connection.expires_at < (datetime.utcnow() + timedelta(minutes=5)):
-        if not connection.refresh_token:
-            return None
-        
-        # Refresh token
-        payload = {
-            "client_id": settings.STRAVA_CLIENT_ID,
-            "client_secret": settings.STRAVA_CLIENT_SECRET,
-            "grant_type": "refresh_token",
-            "refresh_token": decrypt_token(connection.refresh_token)
-        }
-        res = requests.post(STRAVA_TOKEN_URL, data=payload)
-        if res.status_code == 200:
-            data = res.json()
-            connection.access_token = encrypt_token(data.get("access_token"))
-            connection.refresh_token = encrypt_token(data.get("refresh_token"))
-            connection.expires_at = datetime.utcnow() + timedelta(seconds=data.get("expires_in", 21600))
-            db.commit()
-            return data.get("access_token")
-        return None
-        
-    return decrypt_token(connection.access_token)
+        raise HTTPException(status_code=400, detail="No Strava connection")
+    
+    job = SyncJobService.enqueue(db, current_user.id, full=full)
+    return SyncJobService.to_dict(job)
 
-@router.post("/sync")
-def sync_strava(
+@router.post("/backfill", status_code=202)
+def backfill_strava(
+    restart: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Fetch and sync Strava activities to our DB."""
-    access_token = get_valid_access_token(db, current_user.id)
+    """Queue a low-priority import of the full Strava history.
+
+    Continues from the stored checkpoint unless ``restart`` is set. Progress
+    is reported through ``GET /sync/{job_id}``.
+    """
+    connection = db.query(OAuthConnection).filter(
+        OAuthConnection.user_id == current_user.id,
+        OAuthConnection.provider == "strava"
+    ).first()
     
-    if not access_token:
+    if not connection:
         raise HTTPException(status_code=400, detail="No Strava connection")
     
-    # Fetch activities from Strava
-    headers = {"Authorization": f"Bearer {access_token}"}
-    
-    # Get all activities (paginated)
-    all_activities = []
-    page = 1
-    per_page = 100
-    
-    while True:
-        res = requests.get(
-            f"{STRAVA_API_URL}/athlete/activities",
-            headers=headers,
-            params={"per_page": per_page, "page": page}
-        )
-        
-        if res.status_code != 200:
-            raise HTTPException(status_code=400, detail=f"Strava API error: {res.text}")
-        
-        data = res.json()
-        if not data:
-            break
-            
-        all_activities.extend(data)
-        page += 1
-        
-        # Safety limit
-        if page > 10:
-            break
-    
-    # Save to DB (skip existing)
-    saved_count = 0
-    for act in all_activities:
-        existing = db.query(Activity).filter(
-            Activity.strava_id == str(act.get("id"))
-        ).first()
-        
-        if not existing:
-            activity = Activity(
-                user_id=current_user.id,
-                strava_id=str(act.get("id")),
-                name=act.get("name"),
-                type=act.get("type"),
-                sport_type=act.get("sport_type"),
-                start_date=datetime.fromisoformat(act.get("start_date").replace("Z", "+00:00")),
-                start_date_local=act.get("start_date_local"),
-                timezone=act.get("timezone"),
-                distance=act.get("distance", 0),
-                moving_time=act.get("moving_time", 0),
-                elapsed_time=act.get("elapsed_time", 0),
-                total_elevation_gain=act.get("total_elevation_gain", 0),
-                average_speed=act.get("average_speed", 0),
-                max_speed=act.get("max_speed", 0),
-                average_heartrate=act.get("average_heartrate"),
-                max_heartrate=act.get("max_heartrate"),
-                average_watts=act.get("average_watts"),
-                kilojoules=act.get("kilojoules"),
-                calories=act.get("calories"),
-                description=act.get("description"),
-                gear_id=act.get("gear_id")
-            )
-            db.add(activity)
-            saved_count += 1
+    job = SyncJobService.enqueue(
+        db, current_user.id, kind="backfill", full=restart, priority=Priority.BACKFILL
+    )
+    return SyncJobService.to_dict(job)
+
+@router.get("/sync/{job_id}")
+def get_sync_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Status and progress of a sync job."""
+    job = db.query(SyncJob).filter(
+        SyncJob.id == job_id,
+        SyncJob.user_id == current_user.id
+    ).first()
     
-    db.commit()
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
     
-    return {
-        "status": "success",
-        "total_activities": len(all_activities),
-        "new_activities": saved_count,
-        "user_id": current_user.id
-    }
+    return SyncJobService.to_dict(job)
+
+@router.get("/rate-limit")
+def get_rate_limit(current_user: User = Depends(get_current_user)):
+    """Current usage of the app-wide Strava request budget."""
+    return rate_limiter.status()
+
+@router.get("/webhook")
+def verify_webhook(
+    mode: str = Query("", alias="hub.mode"),
+    verify_token: str = Query("", alias="hub.verify_token"),
+    challenge: str = Query("", alias="hub.challenge")
+):
+    """Strava's subscription validation handshake."""
+    response = webhook_service.verify_subscription(mode, verify_token, challenge)
+    if response is None:
+        raise HTTPException(status_code=403, detail="Invalid verify token")
+    return response
+
+@router.post("/webhook")
+async def receive_webhook(request: Request):
+    """Strava push events. Only buffered here so Strava gets its 200 right away."""
+    try:
+        event = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(event, dict):
+        raise HTTPException(status_code=400, detail="Invalid event")
+    webhook_service.receive(event)
+    return {"status": "ok"}
+
+@router.get("/webhook/stats")
+def get_webhook_stats(current_user: User = Depends(get_current_user)):
+    """Counters of the webhook buffer and processor."""
+    return webhook_service.stats()
 
 @router.get("/activities")
 def get_activities(
@@ -161,5 +149,40 @@ def get_activities(
         "max_heartrate": a.max_heartrate,
         "average_watts": a.average_watts,
         "kilojoules": a.kilojoules,
-        "calories": a.calories
+        "calories": a.calories,
+        "tss": a.tss,
+        "normalized_power": a.normalized_power,
+        "intensity_factor": a.intensity_factor
     } for a in activities]
+
+@router.get("/activities/{activity_id}/streams")
+def get_activity_streams(
+    activity_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Recorded streams of one activity, keyed by stream type."""
+    activity = db.query(Activity).filter(
+        Activity.id == activity_id,
+        Activity.user_id == current_user.id
+    ).first()
+    
+    if not activity:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    
+    return {
+        "activity_id": activity.id,
+        "status": activity.streams_status or "pending",
+        "streams": {
+            stream_type: ActivityStreamService.to_list(values)
+            for stream_type, values in ActivityStreamService.get_streams(db, activity.id).items()
+        }
+    }
+
+@router.get("/streams/stats")
+def get_stream_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Stream storage of the current user, including bytes per recorded hour."""
+    return ActivityStreamService.storage_stats(db, current_user.id)
@@ -0,0 +1,58 @@
+import json
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional, the standard encoder is slower but equivalent
+    orjson = None
+
+CHUNK_ITEMS = 200  # items encoded per chunk written to the socket
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def dumps(item: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(item)
+    return json.dumps(item, separators=(",", ":")).encode()
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """``fields=a,b`` as a list in ``allowed`` order, all of ``allowed`` if not given."""
+    if not fields:
+        return list(allowed)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [field for field in allowed if field in requested]
+
+
+def chunks(items: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    items = iter(items)
+    while chunk := list(islice(items, CHUNK_ITEMS)):
+        yield chunk
+
+
+def encode_items(items: Iterable[Dict[str, Any]], ndjson: bool) -> Iterator[bytes]:
+    """A JSON array, or one JSON document per line, written in chunks of ``CHUNK_ITEMS``."""
+    if ndjson:
+        for chunk in chunks(items):
+            yield b"".join(dumps(item) + b"\n" for item in chunk)
+        return
+    prefix = b"["
+    for chunk in chunks(items):
+        yield prefix + b",".join(map(dumps, chunk))
+        prefix = b","
+    yield b"[]" if prefix == b"[" else b"]"
+
+
+def stream_items(items: Iterable[Dict[str, Any]], ndjson: bool = False, next_cursor: Optional[str] = None) -> StreamingResponse:
+    """Stream ``items`` without holding the page in memory; the next page's cursor goes in a header."""
+    return StreamingResponse(
+        encode_items(items, ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json",
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    )
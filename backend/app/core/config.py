@@ -27,6 +27,36 @@ class Settings:
     STRAVA_CLIENT_SECRET: str = os.getenv("STRAVA_CLIENT_SECRET", "")
     STRAVA_REDIRECT_URI: str = os.getenv("STRAVA_REDIRECT_URI", "http://192.168.20.112:3000/oauth/strava/callback")
     
+    # Shared Strava HTTP client
+    STRAVA_HTTP_TIMEOUT: float = float(os.getenv("STRAVA_HTTP_TIMEOUT", 30))
+    STRAVA_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("STRAVA_HTTP_CONNECT_TIMEOUT", 5))
+    STRAVA_MAX_CONNECTIONS: int = int(os.getenv("STRAVA_MAX_CONNECTIONS", 10))
+    STRAVA_PAGE_CONCURRENCY: int = int(os.getenv("STRAVA_PAGE_CONCURRENCY", 4))
+    
+    # App-wide Strava rate limits (15 minutes / day), shared by all users
+    STRAVA_RATE_LIMIT_15MIN: int = int(os.getenv("STRAVA_RATE_LIMIT_15MIN", 200))
+    STRAVA_RATE_LIMIT_DAILY: int = int(os.getenv("STRAVA_RATE_LIMIT_DAILY", 2000))
+    # Share of both budgets that backfills leave to interactive syncs
+    STRAVA_INTERACTIVE_RESERVE: float = float(os.getenv("STRAVA_INTERACTIVE_RESERVE", 0.3))
+    # Longest a background request waits for budget before giving up
+    STRAVA_BACKFILL_MAX_WAIT: float = float(os.getenv("STRAVA_BACKFILL_MAX_WAIT", 900))
+    
+    # Background sync jobs
+    SYNC_WORKERS: int = int(os.getenv("SYNC_WORKERS", 2))
+    SYNC_INTERVAL_MINUTES: int = int(os.getenv("SYNC_INTERVAL_MINUTES", 60))  # 0 disables the scheduler
+    STREAMS_BATCH_SIZE: int = int(os.getenv("STREAMS_BATCH_SIZE", 50))  # activities per streams write
+    STREAMS_RETRY_MINUTES: int = int(os.getenv("STREAMS_RETRY_MINUTES", 360))  # before a failed (timeout, 5xx) fetch is retried
+    STREAM_COMPRESSION: str = os.getenv("STREAM_COMPRESSION", "zlib")  # none, zlib or zstd (needs zstandard)
+    
+    # Strava push subscription
+    STRAVA_WEBHOOK_VERIFY_TOKEN: str = os.getenv("STRAVA_WEBHOOK_VERIFY_TOKEN", "")
+    STRAVA_WEBHOOK_SUBSCRIPTION_ID: str = os.getenv("STRAVA_WEBHOOK_SUBSCRIPTION_ID", "")  # events are refused until set
+    STRAVA_WEBHOOK_FLUSH_INTERVAL: float = float(os.getenv("STRAVA_WEBHOOK_FLUSH_INTERVAL", 0.5))
+    STRAVA_WEBHOOK_BATCH_SIZE: int = int(os.getenv("STRAVA_WEBHOOK_BATCH_SIZE", 500))
+    
+    # Aggregated dashboard: longest each external part (Notion, calendar feed, weather) may take
+    DASHBOARD_PART_TIMEOUT: float = float(os.getenv("DASHBOARD_PART_TIMEOUT", 5))
+    
     NOTION_CLIENT_ID: str = os.getenv("NOTION_CLIENT_ID", "")
     NOTION_CLIENT_SECRET: str = os.getenv("NOTION_CLIENT_SECRET", "")
     NOTION_REDIRECT_URI: str = os.getenv("NOTION_REDIRECT_URI", "http://localhost:8080/api/v1/oauth/notion/callback")
@@ -8,21 +8,31 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 import os
 from datetime import datetime, timedelta
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
-import requests
 from dotenv import load_dotenv
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from fastapi import Depends
 from app.api.deps import get_db, get_current_user
+from app.api.streaming import parse_fields, stream_items, NEXT_CURSOR_HEADER
 from app.models.user import User
 from app.services.strava_oauth import StravaOAuthService
-from app.services.notion_oauth import NotionOAuthService
-from app.services.performance_engine import PerformanceEngine
-
+from app.services.notion_sessions import NotionSessionService
+from app.services.performance_snapshots import SnapshotService
+from app.services.activity_ingest import ActivityIngestService
+from app.services.strava_client import get_strava_client, close_strava_client, StravaAPIError
+from app.services.strava_rate_limiter import RateLimitExceeded
+from app.api.routes.strava import rate_limit_exception
+from app.services.sync_jobs import sync_worker, process_new_activities
+from app.services.strava_webhooks import webhook_service
+from starlette.concurrency import run_in_threadpool
+
+from app.services.activity_columns import ActivityColumns
+from app.services.volume_stats import VolumeService
 from app.models.activity import Activity
 from app.models.athlete import Athlete
 
@@ -37,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 from app.api.api import api_router
@@ -45,6 +56,19 @@ from app.core.config import settings
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.on_event("startup")
+async def start_background_services():
+    await sync_worker.start()
+    await webhook_service.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_background_services():
+    await webhook_service.stop()
+    await sync_worker.stop()
+    await close_strava_client()
+
+
 # API Models
 class ActivityOut(BaseModel):
     id: int
@@ -66,6 +90,28 @@ class ActivityOut(BaseModel):
     timezone: Optional[str]
 
 
+# ActivityOut field: (column it is read from, conversion); no column is always null
+ACTIVITY_OUT_FIELDS = {
+    "id": ("id", None),
+    "strava_id": ("strava_id", None),
+    "name": ("name", None),
+    "type": ("sport_type", lambda value: value or "Unknown"),
+    "sport_type": ("sport_type", None),
+    "distance": ("distance", lambda value: round(value, 2) if value else None),
+    "moving_time": ("moving_time", None),
+    "elapsed_time": ("elapsed_time", None),
+    "average_speed": (None, None),
+    "max_speed": (None, None),
+    "average_heartrate": ("average_heartrate", lambda value: round(value, 1) if value else None),
+    "max_heartrate": (None, None),
+    "average_watts": ("average_watts", lambda value: round(value, 1) if value else None),
+    "total_elevation_gain": ("total_elevation_gain", lambda value: round(value, 1) if value else None),
+    "gear_name": (None, None),
+    "start_date_local": ("start_date", lambda value: value.isoformat() if value else None),
+    "timezone": ("timezone", None)
+}
+
+
 class WeekStats(BaseModel):
     total_distance: float
     total_time: int
@@ -120,34 +166,32 @@ def get_athlete(db: Session = Depends(get_db), current_user: User = Depends(get_
     return result
 
 
-@app.get("/activities", response_model=List[ActivityOut])
-def get_activities(limit: int = 10, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-
-    activities = db.query(Activity).filter(Activity.user_id == current_user.id).order_by(Activity.start_date.desc()).limit(limit).all()
-    
-    result = []
-    for a in activities:
-        result.append(ActivityOut(
-            id=a.id,
-            strava_id=a.strava_id,
-            name=a.name,
-            type=a.sport_type or "Unknown",
-            sport_type=a.sport_type,
-            distance=round(a.distance, 2) if a.distance else None,
-            moving_time=a.duration,
-            elapsed_time=a.duration,
-            average_speed=None,
-            max_speed=None,
-            average_heartrate=round(a.avg_hr, 1) if a.avg_hr else None,
-            max_heartrate=None,
-            average_watts=round(a.avg_power, 1) if a.avg_power else None,
-            total_elevation_gain=round(a.elevation, 1) if a.elevation else None,
-            gear_name=None,
-            start_date_local=a.start_date.isoformat() if a.start_date else None,
-            timezone=a.timezone
-        ))
-    
-    return result
+@app.get("/activities")
+def get_activities(
+    limit: int = Query(10, ge=1),
+    before: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Newest activities, streamed; page back with the X-Next-Cursor header as ``before``,
+    pick keys with ``fields=name,distance,...``. Items are ActivityOut objects holding only
+    the selected keys, so no response_model is declared."""
+    fields = parse_fields(fields, list(ACTIVITY_OUT_FIELDS))
+    columns = sorted({ACTIVITY_OUT_FIELDS[field][0] for field in fields} - {None})
+    activities, next_cursor = ActivityColumns.page(db, current_user.id, columns, limit, before)
+
+    def items():
+        for a in activities:
+            item = {}
+            for field in fields:
+                column, convert = ACTIVITY_OUT_FIELDS[field]
+                value = getattr(a, column) if column else None
+                item[field] = convert(value) if convert else value
+            yield item
+
+    return stream_items(items(), format == "ndjson", next_cursor)
 
 
 @app.get("/stats/week", response_model=WeekStats)
@@ -156,30 +200,32 @@ def get_week_stats(days: int = 7, db: Session = Depends(get_db), current_user: U
     days = min(max(days, 1), 140)  # Clamp between 1 and 140
     
     # Get activities from last N days
-    start_date = datetime.now() - timedelta(days=days)
-    activities = db.query(Activity).filter(Activity.user_id == current_user.id, Activity.start_date >= start_date).all()
+    start_date = (datetime.now() - timedelta(days=days)).date()
+    day_totals = VolumeService.aggregate(db, current_user.id, "day", start_date)
     
-    total_distance = sum(a.distance or 0 for a in activities) / 1000  # km
-    total_time = sum(a.duration or 0 for a in activities)  # seconds
-    total_activities = len(activities)
+    total_distance = sum(day["distance"] for day in day_totals) / 1000  # km
+    total_time = int(sum(day["moving_time"] for day in day_totals))  # seconds
+    total_activities = sum(day["count"] for day in day_totals)
     
-    heartrates = [a.avg_hr for a in activities if a.avg_hr]
-    avg_heartrate = sum(heartrates) / len(heartrates) if heartrates else None
+    avg_heartrate = db.query(func.avg(Activity.average_heartrate)).filter(
+        Activity.user_id == current_user.id,
+        Activity.local_date >= start_date,
+        Activity.average_heartrate > 0
+    ).scalar()
     
-    # Group by day
-    activities_by_day = {}
-    for a in activities:
-        if a.start_date:
-            day = a.start_date.strftime("%Y-%m-%d")
-            if day not in activities_by_day:
-                activities_by_day[day] = {"distance": 0, "time": 0, "count": 0}
-            activities_by_day[day]["distance"] += (a.distance or 0) / 1000
-            activities_by_day[day]["time"] += (a.duration or 0) / 60
-            activities_by_day[day]["count"] += 1
+    # Grouped by day in SQL
+    activities_by_day = {
+        day["period_start"].isoformat(): {
+            "distance": day["distance"] / 1000,
+            "time": day["moving_time"] / 60,
+            "count": day["count"]
+        }
+        for day in day_totals
+    }
 
     
     return WeekStats(
-        total_distance=round(total_distance, 2),
+        total_distance=round(float(total_distance), 2),
         total_time=total_time,
         total_activities=total_activities,
         avg_heartrate=round(avg_heartrate, 1) if avg_heartrate else None,
@@ -190,12 +236,14 @@ def get_week_stats(days: int = 7, db: Session = Depends(get_db), current_user: U
 @app.get("/stats/training-load", response_model=TrainingLoad)
 def get_training_load(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Calculate CTL/ATL/TSB training load metrics"""
-        
-    start_date = datetime.now() - timedelta(days=42)
-    activities = db.query(Activity).filter(Activity.user_id == current_user.id, Activity.start_date >= start_date).all()
-    
-    # Calculate daily TSS, ATL, CTL, TSB
-    load = PerformanceEngine.calculate_training_load(activities)
+    today = datetime.utcnow().date()
+    series = SnapshotService.get_series(db, current_user.id, today - timedelta(days=41), today)
+    load = {
+        "ctl": series["ctl"][-1],
+        "atl": series["atl"][-1],
+        "tsb": series["tsb"][-1],
+        "daily_tss": {day: tss for day, tss in zip(series["dates"], series["tss"]) if tss}
+    }
     
     return TrainingLoad(
         ctl=round(load["ctl"], 1),
@@ -205,9 +253,6 @@ def get_training_load(db: Session = Depends(get_db), current_user: User = Depend
     )
 
 
-# Notion Training Sessions DB
-NOTION_TRAINING_DB = "30f8f154-9217-814a-b957-d9030f1a1cd4"
-
 class TrainingSession(BaseModel):
     id: str
     name: str
@@ -221,111 +266,35 @@ class TrainingSession(BaseModel):
 @app.get("/training-sessions", response_model=List[TrainingSession])
 def get_training_sessions(days: int = 14, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Fetch training sessions from Notion"""
-        
-    notion_token = NotionOAuthService.get_valid_access_token(db, current_user.id)
-    if not notion_token:
-        # Silently return empty or log it for now
-        return []
-    
-    headers = {
-        "Authorization": f"Bearer {notion_token}",
-        "Notion-Version": "2022-06-28"
-    }
-    
-    # Query training sessions DB
-    start_date = datetime.now().strftime("%Y-%m-%d")
-    end_date = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
-    
-    resp = requests.post(
-        f"https://api.notion.com/v1/databases/{NOTION_TRAINING_DB}/query",
-        headers=headers,
-        json={
-            "filter": {
-                "and": [
-                    {"property": "Date", "date": {"on_or_after": start_date}},
-                    {"property": "Project", "select": {"equals": "SportDashb"}}
-                ]
-            },
-            "sorts": [{"property": "Date", "direction": "ascending"}]
-        }
-    )
-    
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail=resp.text)
-    
-    sessions = []
-    for page in resp.json().get('results', []):
-        props = page['properties']
-        
-        name = props['Name']['title'][0]['text']['content'] if props['Name']['title'] else ''
-        session_type = props['Type']['select']['name'] if props['Type'].get('select') else None
-        date = props['Date']['date']['start'] if props['Date'].get('date') else None
-        duration = props['Duration']['number'] if props['Duration'].get('number') else None
-        distance = props['Distance']['number'] if props['Distance'].get('number') else None
-        desc = props['Description']['rich_text'][0]['text']['content'] if props['Description'].get('rich_text') else None
-        
-        sessions.append(TrainingSession(
-            id=page['id'],
-            name=name,
-            type=session_type,
-            date=date,
-            duration=duration,
-            distance=distance,
-            description=desc
-        ))
-    
-    return sessions
+    return [TrainingSession(**session) for session in NotionSessionService.get_sessions(db, current_user.id, days)]
 
 
 @app.get("/sync/strava")
-def sync_strava(per_page: int = 200, db: Session = Depends(get_db)):
+async def sync_strava(per_page: int = 200, db: Session = Depends(get_db)):
     """Sync latest activities from Strava"""
     current_user = db.query(User).first()
     if not current_user:
         raise HTTPException(status_code=401, detail="No active user found for sync")
 
-    access_token = StravaOAuthService.get_valid_access_token(db, current_user.id)
+    access_token = await StravaOAuthService.get_valid_access_token(db, current_user.id)
     if not access_token:
         raise HTTPException(status_code=401, detail="Strava not connected or token expired")
-        
-    headers = {"Authorization": f"Bearer {access_token}"}
     
     # Fetch from Strava
-    resp = requests.get(
-        "https://www.strava.com/api/v3/athlete/activities",
-        headers=headers,
-        params={"per_page": per_page}
-    )
-    
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    try:
+        strava_activities = await get_strava_client().get_activities(
+            access_token, per_page=per_page, user_id=current_user.id
+        )
+    except RateLimitExceeded as e:
+        raise rate_limit_exception(e)
+    except StravaAPIError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     
-    strava_activities = resp.json()
-    imported = 0
-    for a in strava_activities:
-        existing = db.query(Activity).filter(Activity.strava_id == str(a['id'])).first()
-        if not existing:
-            start_date = None
-            if a.get('start_date_local'):
-                start_date = datetime.fromisoformat(a['start_date_local'].replace('Z', '+00:00'))
-            
-            act = Activity(
-                user_id=current_user.id,
-                strava_id=str(a['id']),
-                name=a.get('name'),
-                sport_type=a.get('sport_type') or a.get('type'),
-                distance=a.get('distance'),
-                duration=a.get('moving_time'),
-                avg_hr=a.get('average_heartrate'),
-                avg_power=a.get('average_watts'),
-                elevation=a.get('total_elevation_gain'),
-                start_date=start_date,
-                timezone=a.get('timezone')
-            )
-            db.add(act)
-            imported += 1
+    result = await run_in_threadpool(ActivityIngestService.ingest_page, db, current_user.id, strava_activities)
+    imported = result["inserted"]
+    if imported:
+        await process_new_activities(db, current_user.id)
     
-    db.commit()
     return {"imported": imported, "total": len(strava_activities)}
 
 
@@ -1,9 +1,13 @@
 from app.db.database import Base
 from app.models.user import User
-from app.models.profile import UserProfile, BodyMetric
+from app.models.profile import UserProfile, BodyMetric, AthleteThreshold
 from app.models.oauth import OAuthConnection
 from app.models.athlete import Athlete
-from app.models.activity import Activity
-from app.models.performance import PerformanceSnapshot
+from app.models.activity import Activity, ActivityRollup, RollupState
+from app.models.stream import ActivityStream
+from app.models.curve import ActivityCurve, CurveEnvelope
+from app.models.performance import PerformanceSnapshot, SnapshotState
 from app.models.goal import Goal
 from app.models.availability import Availability, BlockedPeriod
+from app.models.sync import StravaSyncState, SyncJob
+from app.models.webhook import StravaWebhookEvent
@@ -1,10 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
 class Activity(Base):
     __tablename__ = "core_activities"
+    # Date-range scans and GROUP BYs of one user's activities
+    __table_args__ = (
+        Index("ix_core_activities_user_start_date", "user_id", "start_date"),
+        Index("ix_core_activities_user_local_date", "user_id", "local_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
@@ -18,6 +23,7 @@ class Activity(Base):
     start_date = Column(DateTime)
     start_date_local = Column(String(50))
     timezone = Column(String(100))
+    local_date = Column(Date)  # day in the activity's timezone, what daily stats bucket by
     moving_time = Column(Integer)  # seconds
     elapsed_time = Column(Integer)  # seconds
     
@@ -48,8 +54,49 @@ class Activity(Base):
     
     # Computed
     tss = Column(Float)
+    normalized_power = Column(Float)
+    intensity_factor = Column(Float)
+    tss_method = Column(String(20))  # power, pace, hr, summary_*, default
+    vo2max = Column(Float)  # runs, from pace/heart rate pairs
+    
+    # Streams: None = not fetched yet, ok, none (no recorded data or not accessible),
+    # failed (transient error, retried after STREAMS_RETRY_MINUTES)
+    streams_status = Column(String(20), index=True)
+    streams_fetched_at = Column(DateTime)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", backref="activities")
+
+
+class ActivityRollup(Base):
+    __tablename__ = "activity_rollups"
+    __table_args__ = (
+        Index("ix_activity_rollups_user_period", "user_id", "period", "period_start", "sport_type", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Volume per sport type and week (from Monday), month or year, recomputed on ingest
+    period = Column(String(10), nullable=False)  # week, month, year
+    period_start = Column(DateTime, nullable=False)
+    sport_type = Column(String(50), nullable=False)
+
+    count = Column(Integer, nullable=False, default=0)
+    distance = Column(Float, nullable=False, default=0.0)  # meters
+    moving_time = Column(Integer, nullable=False, default=0)  # seconds
+    total_elevation_gain = Column(Float, nullable=False, default=0.0)  # meters
+
+
+class RollupState(Base):
+    __tablename__ = "rollup_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+
+    # Set once the user's rollups were built from the whole history; without it
+    # they may be partial and are rebuilt on the next read. Whatever clears
+    # activity_rollups (e.g. a migration) has to delete these rows as well
+    built_at = Column(DateTime, nullable=True)
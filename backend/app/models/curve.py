@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.db.database import Base
+
+class ActivityCurve(Base):
+    __tablename__ = "activity_curves"
+    __table_args__ = (UniqueConstraint("activity_id", "metric"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    activity_id = Column(Integer, ForeignKey("core_activities.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+    metric = Column(String(20), nullable=False)  # power (W), speed (m/s)
+    start_date = Column(DateTime, index=True)  # copy of the activity's, for range queries
+    # float32 best mean value per duration of CurveService.DURATIONS, NaN if the activity is shorter
+    values = Column(LargeBinary, nullable=False)
+
+    activity = relationship("Activity", backref="curves")
+
+
+class CurveEnvelope(Base):
+    __tablename__ = "curve_envelopes"
+    __table_args__ = (UniqueConstraint("user_id", "metric", "scope"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+    metric = Column(String(20), nullable=False)
+    scope = Column(String(20), nullable=False)  # all, season, 90d
+    period_start = Column(DateTime, nullable=True)  # start of the season the envelope belongs to
+
+    # Per duration: best value (float32), activity holding it and its start (int64, epoch seconds)
+    values = Column(LargeBinary, nullable=False)
+    activity_ids = Column(LargeBinary, nullable=False)
+    record_dates = Column(LargeBinary, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
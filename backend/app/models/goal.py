@@ -18,6 +18,15 @@ class Goal(Base):
     event_date = Column(DateTime, nullable=True)
     status = Column(String(50), default="active") # active, achieved, failed
     
+    # Forecast (GoalForecastService), valid while forecast_key matches its inputs
+    required_ctl = Column(Float, nullable=True)
+    current_projection = Column(Float, nullable=True)  # median CTL on event_date (or at the horizon)
+    readiness_percentage = Column(Float, nullable=True)
+    estimated_achievement_date = Column(DateTime, nullable=True)
+    confidence_score = Column(Float, nullable=True)  # 0-1
+    forecast_key = Column(String(40), nullable=True)
+    forecasted_at = Column(DateTime, nullable=True)
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", backref="goals")
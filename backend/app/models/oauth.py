@@ -12,5 +12,6 @@ class OAuthConnection(Base):
     access_token = Column(String, nullable=False)  # To be encrypted
     refresh_token = Column(String, nullable=True)  # To be encrypted
     expires_at = Column(DateTime, nullable=True)
+    provider_user_id = Column(String, index=True, nullable=True)  # e.g. Strava athlete id, used by webhooks
     
     user = relationship("User", backref="oauth_connections")
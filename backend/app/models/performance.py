@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
 
 class PerformanceSnapshot(Base):
     __tablename__ = "performance_snapshots"
+    # One row per user and day; also serves the range reads of the load series
+    __table_args__ = (Index("ix_performance_snapshots_user_date", "user_id", "date", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
@@ -12,13 +14,39 @@ class PerformanceSnapshot(Base):
     date = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Training Load Metrics
+    tss = Column(Float, nullable=False, default=0.0)  # sum of the day's activities
     ctl = Column(Float, nullable=False, default=0.0)
     atl = Column(Float, nullable=False, default=0.0)
     tsb = Column(Float, nullable=False, default=0.0)
+
+    # Per sport group (TSB is their CTL - ATL); "other" sports only count above
+    swim_tss = Column(Float, nullable=False, default=0.0)
+    swim_ctl = Column(Float, nullable=False, default=0.0)
+    swim_atl = Column(Float, nullable=False, default=0.0)
+    bike_tss = Column(Float, nullable=False, default=0.0)
+    bike_ctl = Column(Float, nullable=False, default=0.0)
+    bike_atl = Column(Float, nullable=False, default=0.0)
+    run_tss = Column(Float, nullable=False, default=0.0)
+    run_ctl = Column(Float, nullable=False, default=0.0)
+    run_atl = Column(Float, nullable=False, default=0.0)
     
-    # Estimates
+    # Estimates from the best efforts of the ESTIMATE_DAYS up to the day
     estimated_vo2max = Column(Float, nullable=True)
     estimated_ftp = Column(Float, nullable=True)
+    estimated_css = Column(Float, nullable=True)  # seconds per 100m
     fatigue_index = Column(Float, nullable=True)
     
     user = relationship("User", backref="performance_snapshots")
+
+
+class SnapshotState(Base):
+    __tablename__ = "snapshot_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+
+    # Watermark: earliest day whose load changed since the last refresh,
+    # snapshots from here on are stale
+    dirty_from = Column(DateTime, nullable=True)
+
+    user = relationship("User", backref="snapshot_state")
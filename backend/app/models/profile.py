@@ -14,6 +14,11 @@ class UserProfile(Base):
     resting_hr = Column(Integer, nullable=True)
     max_hr = Column(Integer, nullable=True)
     
+    # Thresholds for training load
+    ftp = Column(Float, nullable=True)  # watts
+    threshold_hr = Column(Integer, nullable=True)  # bpm (LTHR)
+    threshold_pace = Column(Float, nullable=True)  # seconds per km
+    
     timezone = Column(String, default="UTC")
     location = Column(String, nullable=True)
     latitude = Column(Float, nullable=True)
@@ -31,3 +36,20 @@ class BodyMetric(Base):
     weight = Column(Float, nullable=False)
     
     user = relationship("User", backref="body_metrics")
+
+class AthleteThreshold(Base):
+    """Thresholds in effect from ``valid_from`` until the user's next version."""
+    __tablename__ = "athlete_thresholds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+    valid_from = Column(DateTime, nullable=True)  # None: since the beginning
+    ftp = Column(Float, nullable=True)  # watts
+    threshold_hr = Column(Integer, nullable=True)  # bpm (LTHR)
+    threshold_pace = Column(Float, nullable=True)  # seconds per km
+    css = Column(Float, nullable=True)  # critical swim speed, seconds per 100 m
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship("User", backref="thresholds")
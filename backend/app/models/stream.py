@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.db.database import Base
+
+class ActivityStream(Base):
+    __tablename__ = "activity_streams"
+    __table_args__ = (UniqueConstraint("activity_id", "stream_type"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    activity_id = Column(Integer, ForeignKey("core_activities.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    stream_type = Column(String(30), nullable=False)  # time, heartrate, watts, cadence, altitude, latlng, ...
+    series_type = Column(String(20))  # time, distance
+    resolution = Column(String(20))
+    original_size = Column(Integer)  # samples on Strava's side
+    point_count = Column(Integer, nullable=False)
+
+    encoding = Column(String(20), nullable=False, default="json")
+    data = Column(LargeBinary, nullable=False)
+
+    activity = relationship("Activity", backref="streams")
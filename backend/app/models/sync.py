@@ -0,0 +1,61 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Index, text
+from sqlalchemy.orm import relationship
+from app.db.database import Base
+
+ACTIVE_JOB_WHERE = "status IN ('queued', 'running') AND kind != 'metrics'"
+
+
+class StravaSyncState(Base):
+    __tablename__ = "strava_sync_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+
+    # Watermark: start_date (UTC) of the newest activity we have stored
+    latest_activity_at = Column(DateTime, nullable=True)
+    # Upper bound (UTC) of the last sync window that completed successfully
+    last_synced_at = Column(DateTime, nullable=True)
+    # Backfill checkpoint: start_date (UTC) of the oldest activity written so far,
+    # an interrupted backfill continues below it
+    backfill_before = Column(DateTime, nullable=True)
+    backfill_completed_at = Column(DateTime, nullable=True)
+
+    user = relationship("User", backref="strava_sync_state")
+
+
+class SyncJob(Base):
+    __tablename__ = "sync_jobs"
+    # One queued/running job per user and kind, so concurrent enqueues can't both insert.
+    # Metrics jobs are excluded: a new one may queue behind a running one
+    __table_args__ = (
+        Index(
+            "ix_sync_jobs_user_kind_active", "user_id", "kind", unique=True,
+            sqlite_where=text(ACTIVE_JOB_WHERE), postgresql_where=text(ACTIVE_JOB_WHERE)
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+    kind = Column(String(50), nullable=False, default="sync")
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, succeeded, failed, rate_limited
+    priority = Column(Integer, nullable=False, default=0)  # 0 = interactive, 1 = background
+    full = Column(Boolean, default=False)
+    # Metrics jobs: re-rate only activities starting in [window_start, window_end), None is open
+    window_start = Column(DateTime, nullable=True)
+    window_end = Column(DateTime, nullable=True)
+
+    # Progress
+    pages_fetched = Column(Integer, default=0)
+    requests = Column(Integer, default=0)
+    rows_written = Column(Integer, default=0)
+
+    error = Column(Text, nullable=True)
+    retry_after = Column(Integer, nullable=True)  # seconds, set when rate limited
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    user = relationship("User", backref="sync_jobs")
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from app.db.database import Base
+
+class StravaWebhookEvent(Base):
+    __tablename__ = "strava_webhook_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    object_type = Column(String(20), nullable=False)  # activity, athlete
+    object_id = Column(String(50), nullable=False)
+    aspect_type = Column(String(20), nullable=False)  # create, update, delete
+    owner_id = Column(String(50), nullable=False, index=True)  # Strava athlete id
+    updates = Column(Text, nullable=True)  # JSON
+    event_time = Column(Integer, nullable=True)
+
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, done, failed, ignored
+    error = Column(Text, nullable=True)
+
+    received_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
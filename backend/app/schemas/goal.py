@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class GoalBase(BaseModel):
+    title: str
+    metric_type: str  # event, performance, body_composition
+    target_value: float
+    event_date: Optional[datetime] = None
+    status: str = 'active'
+
+class GoalCreate(GoalBase):
+    pass
+
+class Goal(GoalBase):
+    id: int
+    user_id: int
+    required_ctl: Optional[float] = None
+    current_projection: Optional[float] = None
+    readiness_percentage: Optional[float] = None
+    estimated_achievement_date: Optional[datetime] = None
+    confidence_score: Optional[float] = None
+    forecasted_at: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
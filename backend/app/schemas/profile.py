@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 class UserProfileBase(BaseModel):
@@ -7,6 +7,9 @@ class UserProfileBase(BaseModel):
     height: Optional[float] = None
     resting_hr: Optional[int] = None
     max_hr: Optional[int] = None
+    ftp: Optional[float] = None
+    threshold_hr: Optional[int] = None
+    threshold_pace: Optional[float] = None
     timezone: str = "UTC"
     location: Optional[str] = None
     latitude: Optional[float] = None
@@ -20,6 +23,9 @@ class UserProfileUpdate(BaseModel):
     height: Optional[float] = None
     resting_hr: Optional[int] = None
     max_hr: Optional[int] = None
+    ftp: Optional[float] = None
+    threshold_hr: Optional[int] = None
+    threshold_pace: Optional[float] = None
     timezone: Optional[str] = None
     location: Optional[str] = None
     latitude: Optional[float] = None
@@ -48,3 +54,21 @@ class BodyMetric(BodyMetricBase):
     model_config = {
         "from_attributes": True
     }
+
+class AthleteThresholdBase(BaseModel):
+    ftp: Optional[float] = None
+    threshold_hr: Optional[int] = None
+    threshold_pace: Optional[float] = None  # seconds per km
+    css: Optional[float] = None  # seconds per 100 m
+
+class AthleteThresholdCreate(AthleteThresholdBase):
+    valid_from: Optional[date] = None  # today if not given
+
+class AthleteThreshold(AthleteThresholdBase):
+    id: int
+    user_id: int
+    valid_from: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+class PlannedSession(BaseModel):
+    date: date
+    tss: Optional[float] = None  # estimated from duration if not given
+    duration: Optional[float] = None  # minutes
+    sport_type: Optional[str] = None
+    name: Optional[str] = None
+
+class TrainingPlan(BaseModel):
+    name: str
+    sessions: List[PlannedSession] = []
+
+class SimulationRequest(BaseModel):
+    plans: List[TrainingPlan] = []
+    include_notion: bool = False  # adds the sessions planned in Notion as one more plan
+    race_date: Optional[date] = None
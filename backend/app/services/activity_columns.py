@@ -0,0 +1,121 @@
+import base64
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_, Float, Integer, Date, DateTime
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.activity import Activity
+
+PAGE_CHUNK = 200  # rows fetched from the cursor at a time
+
+
+class ActivityColumns:
+    """Reads of a few ``core_activities`` columns without building ORM objects.
+
+    Analytics need a handful of the table's columns; a Core ``select()`` of
+    just those returns plain rows, without identity-map bookkeeping and
+    without dragging the ``description`` text along. Rows still allow
+    attribute access (``row.moving_time``), so code written against
+    ``Activity`` objects works on them unchanged.
+    """
+
+    @staticmethod
+    def select(
+        user_id: int,
+        columns: Sequence[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        criteria: Sequence[Any] = ()
+    ):
+        """Core select of ``columns`` of the user's activities starting in [start, end)."""
+        stmt = select(*(getattr(Activity, column) for column in columns)).where(Activity.user_id == user_id, *criteria)
+        if start is not None:
+            stmt = stmt.where(Activity.start_date >= start)
+        if end is not None:
+            stmt = stmt.where(Activity.start_date < end)
+        return stmt
+
+    @staticmethod
+    def rows(
+        db: Session,
+        user_id: int,
+        columns: Sequence[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        criteria: Sequence[Any] = (),
+        newest_first: bool = False,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        stmt = ActivityColumns.select(user_id, columns, start, end, criteria)
+        if newest_first:
+            stmt = stmt.order_by(Activity.start_date.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def arrays(
+        db: Session,
+        user_id: int,
+        columns: Sequence[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        criteria: Sequence[Any] = ()
+    ) -> Dict[str, np.ndarray]:
+        """One NumPy array per column: numbers as float64 (NaN for NULL),
+        datetimes as datetime64[us], dates as datetime64[D] (NaT), anything else as objects."""
+        rows = ActivityColumns.rows(db, user_id, columns, start, end, criteria)
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        arrays = {}
+        for column, data in zip(columns, values):
+            kind = Activity.__table__.c[column].type
+            if isinstance(kind, (Float, Integer)):
+                arrays[column] = np.array(data, dtype=np.float64)
+            elif isinstance(kind, DateTime):
+                arrays[column] = np.array(data, dtype="datetime64[us]")
+            elif isinstance(kind, Date):
+                arrays[column] = np.array(data, dtype="datetime64[D]")
+            else:
+                arrays[column] = np.array(data, dtype=object)
+        return arrays
+
+    @staticmethod
+    def encode_cursor(start_date: datetime, activity_id: int) -> str:
+        return base64.urlsafe_b64encode(f"{start_date.isoformat()}|{activity_id}".encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            start_date, activity_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+            return datetime.fromisoformat(start_date), int(activity_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @staticmethod
+    def page(
+        db: Session,
+        user_id: int,
+        columns: Sequence[str],
+        limit: int,
+        before: Optional[str] = None
+    ) -> Tuple[Iterator[Row], Optional[str]]:
+        """One page of activities, newest first, and the cursor of the next page (None on the last).
+
+        Keyset pagination on (start_date, id): ``before`` is the cursor of the
+        previous page, so every page is an index range scan however far back
+        it is. The rows are streamed from the database cursor in chunks of
+        ``PAGE_CHUNK``.
+        """
+        stmt = ActivityColumns.select(user_id, columns, criteria=(Activity.start_date.isnot(None),))
+        keys = select(Activity.start_date, Activity.id).where(Activity.user_id == user_id, Activity.start_date.isnot(None))
+        if before:
+            position = tuple_(Activity.start_date, Activity.id) < ActivityColumns.decode_cursor(before)
+            stmt, keys = stmt.where(position), keys.where(position)
+        order = (Activity.start_date.desc(), Activity.id.desc())
+
+        # Keys of the page's last row and the row after it; without the latter this is the last page
+        edge = db.execute(keys.order_by(*order).offset(limit - 1).limit(2)).all()
+        rows = db.execute(stmt.order_by(*order).limit(limit).execution_options(yield_per=PAGE_CHUNK))
+        return iter(rows), ActivityColumns.encode_cursor(*edge[0]) if len(edge) == 2 else None
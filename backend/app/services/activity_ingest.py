@@ -0,0 +1,147 @@
+from datetime import date, datetime, timezone
+from typing import List, Dict, Any, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.activity import Activity
+from app.services.volume_stats import VolumeService
+
+# Summary fields that may change on Strava after the first import (renames, crops, ...)
+UPDATABLE_COLUMNS = (
+    "name", "type", "sport_type", "start_date", "start_date_local", "timezone", "local_date",
+    "distance", "moving_time", "elapsed_time", "total_elevation_gain",
+    "average_speed", "max_speed", "average_heartrate", "max_heartrate",
+    "average_watts", "kilojoules", "calories", "description", "gear_id",
+)
+
+class ActivityIngestService:
+
+    @staticmethod
+    def parse_start_date(act: Dict[str, Any]) -> Optional[datetime]:
+        """Strava's start_date as a naive UTC datetime."""
+        if not act.get("start_date"):
+            return None
+        return datetime.fromisoformat(act["start_date"].replace("Z", "+00:00")).replace(tzinfo=None)
+
+    @staticmethod
+    def local_date(start_date: Optional[datetime], tz: Optional[str], start_date_local: Optional[str]) -> Optional[date]:
+        """Day of the activity where it took place.
+
+        Strava's timezone reads "(GMT+01:00) Europe/Berlin"; without a known
+        zone the date part of start_date_local (local wall time) is used.
+        """
+        if start_date is None:
+            return None
+        try:
+            zone = ZoneInfo((tz or "").split(" ")[-1])
+            return start_date.replace(tzinfo=timezone.utc).astimezone(zone).date()
+        except (ValueError, ZoneInfoNotFoundError):
+            pass
+        if start_date_local:
+            try:
+                return date.fromisoformat(start_date_local[:10])
+            except ValueError:
+                pass
+        return start_date.date()
+
+    @staticmethod
+    def row_from_strava(user_id: int, act: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a Strava summary activity onto core_activities columns."""
+        start_date = ActivityIngestService.parse_start_date(act)
+        return {
+            "user_id": user_id,
+            "strava_id": str(act.get("id")),
+            "name": act.get("name"),
+            "type": act.get("type"),
+            "sport_type": act.get("sport_type") or act.get("type"),
+            "start_date": start_date,
+            "start_date_local": act.get("start_date_local"),
+            "timezone": act.get("timezone"),
+            "local_date": ActivityIngestService.local_date(start_date, act.get("timezone"), act.get("start_date_local")),
+            "distance": act.get("distance", 0),
+            "moving_time": act.get("moving_time", 0),
+            "elapsed_time": act.get("elapsed_time", 0),
+            "total_elevation_gain": act.get("total_elevation_gain", 0),
+            "average_speed": act.get("average_speed", 0),
+            "max_speed": act.get("max_speed", 0),
+            "average_heartrate": act.get("average_heartrate"),
+            "max_heartrate": act.get("max_heartrate"),
+            "average_watts": act.get("average_watts"),
+            "kilojoules": act.get("kilojoules"),
+            "calories": act.get("calories"),
+            "description": act.get("description"),
+            "gear_id": act.get("gear_id"),
+        }
+
+    @staticmethod
+    def ingest_page(
+        db: Session,
+        user_id: int,
+        activities: List[Dict[str, Any]],
+        update_existing: bool = False
+    ) -> Dict[str, int]:
+        """Write one page of Strava activities with a single lookup and a single insert.
+
+        Existing strava_ids are resolved with one IN query, new rows go in as one
+        multi-row INSERT ... ON CONFLICT (SQLite/Postgres) and the page is committed
+        once. With ``update_existing`` the summary fields of known activities are
+        refreshed in the same statement.
+        """
+        rows = {}
+        for act in activities:
+            row = ActivityIngestService.row_from_strava(user_id, act)
+            rows[row["strava_id"]] = row
+
+        if not rows:
+            return {"inserted": 0, "updated": 0}
+
+        existing = {}
+        for strava_id, owner_id, local_date in db.query(Activity.strava_id, Activity.user_id, Activity.local_date).filter(
+            Activity.strava_id.in_(list(rows))
+        ):
+            if owner_id == user_id:
+                existing[strava_id] = local_date
+            else:
+                # strava_id is unique across users: another user's row is neither ours to update nor insertable
+                del rows[strava_id]
+        new_rows = [row for strava_id, row in rows.items() if strava_id not in existing]
+
+        table = Activity.__table__
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table)
+            if update_existing:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["strava_id"],
+                    set_={column: stmt.excluded[column] for column in UPDATABLE_COLUMNS},
+                    # Never let one user's payload overwrite another user's row
+                    where=table.c.user_id == stmt.excluded.user_id
+                )
+                if rows:
+                    db.execute(stmt, list(rows.values()))
+            elif new_rows:
+                # ON CONFLICT covers a concurrent sync inserting the same ids in between
+                db.execute(stmt.on_conflict_do_nothing(index_elements=["strava_id"]), new_rows)
+        else:
+            if new_rows:
+                db.execute(table.insert(), new_rows)
+            if update_existing and existing:
+                for strava_id in existing:
+                    db.query(Activity).filter(
+                        Activity.strava_id == strava_id,
+                        Activity.user_id == user_id
+                    ).update({column: rows[strava_id][column] for column in UPDATABLE_COLUMNS})
+
+        # Old dates too, an activity moved on Strava leaves its former period
+        touched = [row["local_date"] for row in new_rows]
+        if update_existing:
+            touched += [rows[strava_id]["local_date"] for strava_id in existing] + list(existing.values())
+        VolumeService.update_rollups(db, user_id, touched)
+        db.commit()
+
+        return {
+            "inserted": len(new_rows),
+            "updated": len(existing) if update_existing else 0
+        }
@@ -0,0 +1,216 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.activity import Activity
+from app.models.stream import ActivityStream
+from app.services.performance_engine import PerformanceEngine
+from app.services.performance_snapshots import SnapshotService
+from app.services.power_curves import CurveService
+from app.services.stream_codec import StreamCodec
+from app.services.strava_client import get_strava_client, StravaAPIError
+from app.services.strava_oauth import StravaOAuthService
+from app.services.strava_rate_limiter import RateLimitExceeded, Priority
+
+STREAM_KEYS = [
+    "time", "distance", "latlng", "altitude", "velocity_smooth",
+    "heartrate", "cadence", "watts", "temp", "moving", "grade_smooth"
+]
+
+
+class ActivityStreamService:
+
+    @staticmethod
+    def encode(data: List[Any]) -> Tuple[str, bytes]:
+        """Binary codec, JSON only for streams it can't represent (ragged or non-numeric)."""
+        try:
+            return "sc1", StreamCodec.encode(data, settings.STREAM_COMPRESSION)
+        except (TypeError, ValueError):
+            return "json", json.dumps(data, separators=(",", ":")).encode()
+
+    @staticmethod
+    def decode(stream: ActivityStream) -> np.ndarray:
+        return StreamCodec.decode_stored(stream.encoding, stream.data)
+
+    @staticmethod
+    def to_list(values: np.ndarray) -> List[Any]:
+        """JSON-safe list, gaps (NaN) become None."""
+        if values.dtype.kind == "f" and np.isnan(values).any():
+            return np.where(np.isnan(values), None, values).tolist()
+        return values.tolist()
+
+    @staticmethod
+    def rows_from_strava(activity_id: int, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Map a key_by_type streams response onto activity_streams rows."""
+        rows = []
+        for stream_type, stream in payload.items():
+            data = stream.get("data") or []
+            if not data:
+                continue
+            encoding, blob = ActivityStreamService.encode(data)
+            rows.append({
+                "activity_id": activity_id,
+                "stream_type": stream_type,
+                "series_type": stream.get("series_type"),
+                "resolution": stream.get("resolution"),
+                "original_size": stream.get("original_size"),
+                "point_count": len(data),
+                "encoding": encoding,
+                "data": blob
+            })
+        return rows
+
+    @staticmethod
+    def get_streams(db: Session, activity_id: int, types: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Decoded streams of one activity as NumPy arrays, keyed by stream type."""
+        query = db.query(ActivityStream).filter(ActivityStream.activity_id == activity_id)
+        if types:
+            query = query.filter(ActivityStream.stream_type.in_(types))
+        streams = query.all()
+        return {stream.stream_type: ActivityStreamService.decode(stream) for stream in streams}
+
+    @staticmethod
+    def pending_criterion():
+        """Streams not fetched yet, or failed transiently more than ``STREAMS_RETRY_MINUTES`` ago."""
+        retry_before = datetime.utcnow() - timedelta(minutes=settings.STREAMS_RETRY_MINUTES)
+        return or_(
+            Activity.streams_status.is_(None),
+            and_(Activity.streams_status == "failed", Activity.streams_fetched_at < retry_before)
+        )
+
+    @staticmethod
+    def pending(db: Session, user_id: int, limit: int) -> List[Activity]:
+        """Newest activities whose streams are due to be fetched."""
+        return db.query(Activity).filter(
+            Activity.user_id == user_id,
+            ActivityStreamService.pending_criterion()
+        ).order_by(Activity.start_date.desc()).limit(limit).all()
+
+    @staticmethod
+    def write_batch(db: Session, results: Dict[int, Optional[Dict[str, Any]]], failed: List[int] = ()) -> int:
+        """Store the fetched streams of a batch in one insert and mark the activities."""
+        rows = []
+        for activity_id, payload in results.items():
+            if payload:
+                rows.extend(ActivityStreamService.rows_from_strava(activity_id, payload))
+
+        ids = list(results)
+        # Replace, a re-fetch after an edit on Strava must not hit the unique constraint
+        db.query(ActivityStream).filter(ActivityStream.activity_id.in_(ids)).delete(synchronize_session=False)
+        if rows:
+            db.execute(ActivityStream.__table__.insert(), rows)
+
+        with_data = {row["activity_id"] for row in rows}
+        now = datetime.utcnow()
+        for status, activity_ids in (("ok", with_data), ("none", set(ids) - with_data), ("failed", failed)):
+            if activity_ids:
+                db.query(Activity).filter(Activity.id.in_(activity_ids)).update(
+                    {"streams_status": status, "streams_fetched_at": now},
+                    synchronize_session=False
+                )
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    async def fetch_pending(
+        db: Session,
+        user_id: int,
+        priority: Priority = Priority.BACKFILL,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Fetch streams for every activity that has none yet, newest first.
+
+        Activities are handled in batches of ``STREAMS_BATCH_SIZE``: their
+        requests run concurrently (bounded by the client's page concurrency)
+        within the rate budget of ``priority`` and each batch is written with
+        one insert. On the rate limit the finished part of the batch is kept
+        and the rest stays pending for the next run.
+        """
+        access_token = await StravaOAuthService.get_valid_access_token(db, user_id)
+        if not access_token:
+            raise StravaAPIError(400, "No Strava connection")
+
+        client = get_strava_client()
+        semaphore = asyncio.Semaphore(client.page_concurrency)
+        result = {"activities": 0, "streams": 0, "requests": 0}
+
+        async def fetch(activity: Activity):
+            async with semaphore:
+                result["requests"] += 1
+                return await client.get_activity_streams(
+                    access_token, activity.strava_id, STREAM_KEYS, user_id=user_id, priority=priority
+                )
+
+        while True:
+            batch = await run_in_threadpool(
+                ActivityStreamService.pending, db, user_id, settings.STREAMS_BATCH_SIZE
+            )
+            if not batch:
+                break
+
+            responses = await asyncio.gather(*(fetch(activity) for activity in batch), return_exceptions=True)
+
+            results = {}
+            failed = []
+            rate_limited = None
+            for activity, response in zip(batch, responses):
+                if isinstance(response, RateLimitExceeded):
+                    rate_limited = response
+                elif isinstance(response, StravaAPIError):
+                    # Manual entries, deleted and private activities have nothing to fetch;
+                    # anything else (timeouts, 5xx) is retried after STREAMS_RETRY_MINUTES
+                    if response.status_code in (403, 404):
+                        results[activity.id] = None
+                    else:
+                        failed.append(activity.id)
+                elif isinstance(response, Exception):
+                    raise response
+                else:
+                    results[activity.id] = response
+
+            if results or failed:
+                result["streams"] += await run_in_threadpool(ActivityStreamService.write_batch, db, results, failed)
+                result["activities"] += len(results) + len(failed)
+                # Stream-based load replaces the summary estimate
+                await run_in_threadpool(PerformanceEngine.update_activity_loads, db, user_id, list(results))
+                await run_in_threadpool(CurveService.update_activity_curves, db, user_id, list(results))
+                await run_in_threadpool(SnapshotService.refresh, db, user_id)
+                if progress:
+                    await run_in_threadpool(progress, result)
+            if rate_limited:
+                raise rate_limited
+
+        return result
+
+    @staticmethod
+    def storage_stats(db: Session, user_id: int) -> Dict[str, Any]:
+        """Stored stream bytes, also per hour of recording."""
+        stream_bytes, points = db.query(
+            func.coalesce(func.sum(func.length(ActivityStream.data)), 0),
+            func.coalesce(func.sum(ActivityStream.point_count), 0)
+        ).join(Activity).filter(Activity.user_id == user_id).one()
+
+        activities, recorded_seconds = db.query(
+            func.count(Activity.id),
+            func.coalesce(func.sum(Activity.elapsed_time), 0)
+        ).filter(Activity.user_id == user_id, Activity.streams_status == "ok").one()
+
+        pending = db.query(func.count(Activity.id)).filter(
+            Activity.user_id == user_id,
+            ActivityStreamService.pending_criterion()
+        ).scalar()
+
+        hours = recorded_seconds / 3600
+        return {
+            "activities_with_streams": activities,
+            "activities_pending": pending,
+            "stream_bytes": int(stream_bytes),
+            "points": int(points),
+            "recorded_hours": round(hours, 2),
+            "bytes_per_hour": round(stream_bytes / hours) if hours else None
+        }
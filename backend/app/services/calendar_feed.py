@@ -0,0 +1,94 @@
+import re
+import urllib.request
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from sqlalchemy.orm import Session
+from app.models.calendar import CalendarEvent
+
+DATETIME_PATTERN = r'{}(?:;.*)?:(\d{{4}})(\d{{2}})(\d{{2}})T(\d{{2}})(\d{{2}})(\d{{2}})'
+DATE_PATTERN = r'{}(?:;.*)?:(\d{{4}})(\d{{2}})(\d{{2}})'
+
+
+def parse_time(line: str, prop: str) -> Optional[datetime]:
+    """DTSTART/DTEND value as a datetime, date-only values at midnight."""
+    match = re.search(DATETIME_PATTERN.format(prop), line) or re.search(DATE_PATTERN.format(prop), line)
+    return datetime(*(int(group) for group in match.groups())) if match else None
+
+
+class CalendarFeedService:
+    """iCal import and the calendar URL feed refreshed with the dashboard."""
+
+    @staticmethod
+    def parse_ics(content: str) -> List[Dict[str, Any]]:
+        """Summary, description, start and end of every VEVENT with a summary."""
+        events = []
+        in_event = False
+        current_event = {}
+
+        for line in content.split('\n'):
+            line = line.strip()
+
+            if line == 'BEGIN:VEVENT':
+                in_event = True
+                current_event = {}
+            elif line == 'END:VEVENT':
+                in_event = False
+                if 'summary' in current_event:
+                    events.append(current_event)
+            elif in_event:
+                if line.startswith('SUMMARY:'):
+                    current_event['summary'] = line[8:]
+                elif line.startswith('DESCRIPTION:'):
+                    current_event['description'] = line[12:]
+                elif line.startswith('DTSTART'):
+                    start = parse_time(line, 'DTSTART')
+                    if start:
+                        current_event['start'] = start
+                elif line.startswith('DTEND'):
+                    end = parse_time(line, 'DTEND')
+                    if end:
+                        current_event['end'] = end
+        return events
+
+    @staticmethod
+    def fetch(url: str, timeout: float = 30) -> List[Dict[str, Any]]:
+        """Download and parse an .ics feed; touches no database session, so it can run in a thread."""
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            content = response.read().decode('utf-8')
+        return CalendarFeedService.parse_ics(content)
+
+    @staticmethod
+    def replace_url_events(db: Session, user_id: int, events: List[Dict[str, Any]]) -> None:
+        """Swap the events of the user's feed for a fresh download."""
+        db.query(CalendarEvent).filter(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.source == 'url'
+        ).delete()
+
+        for ev in events:
+            start = ev.get('start')
+            if start:
+                db.add(CalendarEvent(
+                    user_id=user_id,
+                    title=ev.get('summary', 'Unnamed'),
+                    description=ev.get('description', ''),
+                    start=start,
+                    end=ev.get('end', start),
+                    source='url'
+                ))
+        db.commit()
+
+    @staticmethod
+    def upcoming(
+        db: Session, user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[CalendarEvent]:
+        """Events that haven't ended yet, soonest first; ``start``/``end`` only narrow the range further."""
+        query = db.query(CalendarEvent).filter(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.end >= datetime.now()
+        )
+        if start:
+            query = query.filter(CalendarEvent.end >= start)
+        if end:
+            query = query.filter(CalendarEvent.start <= end)
+        return query.order_by(CalendarEvent.start.asc()).all()
@@ -0,0 +1,107 @@
+from datetime import date, datetime, timedelta
+from typing import Dict
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.activity import Activity
+from app.models.curve import ActivityCurve
+from app.services.power_curves import DURATIONS
+
+ESTIMATE_DAYS = 90  # best efforts count this long
+FTP_DURATION = 1200  # seconds; FTP = 95 % of the best 20 minutes
+FTP_FACTOR = 0.95
+# Critical power/speed fits, seconds: (shortest, longest, longest effort required)
+CP_DURATIONS = (180, 900, 600)
+CSS_DURATIONS = (120, 600, 300)
+
+
+def window_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Max over each row and the ``window - 1`` rows before it, in log2(window) steps."""
+    result = values.copy()
+    span = 1
+    while span < window:
+        step = min(span, window - span)
+        result[step:] = np.maximum(result[step:], result[:-step])
+        span += step
+    return result
+
+
+def critical_fit(curves: np.ndarray, shortest: int, longest: int, required: int) -> np.ndarray:
+    """Critical power (or speed) per row of best-effort curves, NaN where the efforts don't cover ``required``.
+
+    Work (or distance) over duration is a line whose slope is the critical
+    value; fitted by least squares over the efforts from ``shortest`` to
+    ``longest`` seconds, all rows at once.
+    """
+    columns = (DURATIONS >= shortest) & (DURATIONS <= longest)
+    t = DURATIONS[columns].astype(np.float64)
+    values = curves[:, columns]
+    valid = np.isfinite(values)
+    work = np.where(valid, values * t, 0.0)
+    n = valid.sum(axis=1)
+    sum_t = valid @ t
+    sum_tt = valid @ (t * t)
+    sum_w = work.sum(axis=1)
+    sum_tw = work @ t
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * sum_tw - sum_t * sum_w) / (n * sum_tt - sum_t ** 2)
+    covered = valid[:, t >= required].any(axis=1) & (n >= 3)
+    return np.where(covered & (slope > 0), slope, np.nan)
+
+
+class EstimateService:
+    """Daily FTP, running VO2max and swim CSS estimates for the snapshots.
+
+    Each day's estimate comes from the best efforts of the ``ESTIMATE_DAYS``
+    up to it: the cached per-activity curves (``activity_curves``) and the
+    runs' VO2max (``core_activities.vo2max``), so a new activity costs a
+    read of one window of cached values, never the streams.
+    """
+
+    @staticmethod
+    def series(db: Session, user_id: int, start: date, end: date) -> Dict[str, np.ndarray]:
+        """Snapshot estimate columns from ``start`` to ``end``, NaN without qualifying efforts."""
+        first = start - timedelta(days=ESTIMATE_DAYS - 1)
+        days = (end - first).days + 1
+        window = (
+            datetime.combine(first, datetime.min.time()),
+            datetime.combine(end + timedelta(days=1), datetime.min.time())
+        )
+
+        best = {}
+        for metric in ("power", "swim_speed"):
+            rows = db.query(ActivityCurve.start_date, ActivityCurve.values).filter(
+                ActivityCurve.user_id == user_id,
+                ActivityCurve.metric == metric,
+                ActivityCurve.start_date >= window[0],
+                ActivityCurve.start_date < window[1]
+            ).all()
+            daily = np.full((days, len(DURATIONS)), -np.inf)
+            if rows:
+                curves = np.frombuffer(b"".join(row.values for row in rows), dtype=np.float32).reshape(-1, len(DURATIONS))
+                index = np.array([(row.start_date.date() - first).days for row in rows], dtype=np.int64)
+                np.maximum.at(daily, index, np.nan_to_num(curves.astype(np.float64), nan=-np.inf))
+            curves = window_max(daily, ESTIMATE_DAYS)[-(end - start).days - 1:]
+            best[metric] = np.where(np.isfinite(curves), curves, np.nan)
+
+        rows = db.query(Activity.start_date, Activity.vo2max).filter(
+            Activity.user_id == user_id,
+            Activity.vo2max.isnot(None),
+            Activity.start_date >= window[0],
+            Activity.start_date < window[1]
+        ).all()
+        daily = np.full(days, -np.inf)
+        if rows:
+            index = np.array([(start_date.date() - first).days for start_date, _ in rows], dtype=np.int64)
+            np.maximum.at(daily, index, np.array([vo2max for _, vo2max in rows], dtype=np.float64))
+        vo2max = window_max(daily, ESTIMATE_DAYS)[-(end - start).days - 1:]
+
+        power = best["power"]
+        twenty = power[:, np.flatnonzero(DURATIONS == FTP_DURATION)[0]]
+        ftp = np.where(np.isfinite(twenty), FTP_FACTOR * twenty, critical_fit(power, *CP_DURATIONS))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            css = 100 / critical_fit(best["swim_speed"], *CSS_DURATIONS)
+        return {
+            "estimated_ftp": ftp,
+            "estimated_vo2max": np.where(np.isfinite(vo2max), vo2max, np.nan),
+            "estimated_css": css
+        }
@@ -0,0 +1,172 @@
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.availability import Availability, BlockedPeriod
+from app.models.goal import Goal
+from app.services.performance_engine import PerformanceEngine, ewma, CTL_DAYS
+from app.services.performance_snapshots import SnapshotService
+
+SIMULATIONS = 2000
+HORIZON_DAYS = 365  # goals without an event date
+MAX_HORIZON_DAYS = 730
+HISTORY_DAYS = 84  # recent weeks the plan and compliance are fitted on
+DAY_SHAPE = 8.0  # gamma shape of day-to-day load noise (CV ~0.35)
+MIN_COMPLIANCE_STD = 0.05
+# Goal types whose target_value is the CTL needed on the day
+CTL_GOAL_TYPES = ("event", "performance")
+
+
+def simulate_ctl(
+    ctl: float,
+    planned: np.ndarray,
+    compliance_mean: float,
+    compliance_std: float,
+    rng: np.random.Generator,
+    simulations: int = SIMULATIONS
+) -> np.ndarray:
+    """CTL of ``simulations`` sampled trajectories (rows) over the planned days (columns).
+
+    Each week of a trajectory gets one compliance factor, each day a
+    mean-one gamma factor on top of the planned load.
+    """
+    days = len(planned)
+    weekly = np.clip(rng.normal(compliance_mean, compliance_std, (simulations, -(-days // 7))), 0, 2)
+    daily = rng.gamma(DAY_SHAPE, 1 / DAY_SHAPE, (simulations, days))
+    tss = planned * np.repeat(weekly, 7, axis=1)[:, :days] * daily
+    return ewma(tss, CTL_DAYS, np.full(simulations, ctl))
+
+
+class GoalForecastService:
+    """Monte Carlo forecast of when an active goal's required CTL is reached.
+
+    The plan for every future day is the weekday's ``Availability`` minutes
+    at the athlete's usual TSS per hour (or, without availability, the
+    weekday's average load of the last ``HISTORY_DAYS``), zero in blocked
+    periods. Weekly compliance with that plan is fitted on the same history.
+    All trajectories run through one EWMA pass with a RNG seeded by the
+    goal, so a forecast is deterministic and cached on the goal until one of
+    its inputs (load history, availability, blocked periods, the goal) changes.
+    """
+
+    @staticmethod
+    def context(db: Session, user_id: int, today: date) -> Dict[str, Any]:
+        """Everything a forecast of this user depends on, read once for all goals."""
+        series = SnapshotService.get_series(db, user_id, today - timedelta(days=HISTORY_DAYS), today)
+        history = np.array(series["tss"][:-1])
+
+        tss_per_hour = PerformanceEngine.tss_per_hour(
+            db, user_id, datetime.combine(today - timedelta(days=HISTORY_DAYS), datetime.min.time())
+        )
+
+        minutes = np.zeros(7)
+        for weekday, available in db.query(Availability.weekday, Availability.available_minutes).filter(
+            Availability.user_id == user_id
+        ):
+            minutes[weekday] = available or 0
+
+        blocked = db.query(BlockedPeriod.start_date, BlockedPeriod.end_date).filter(
+            BlockedPeriod.user_id == user_id,
+            BlockedPeriod.end_date >= datetime.combine(today, datetime.min.time())
+        ).order_by(BlockedPeriod.start_date).all()
+
+        return {
+            "today": today,
+            "ctl": series["ctl"][-1],
+            "atl": series["atl"][-1],
+            "history": history,
+            "tss_per_hour": tss_per_hour,
+            "minutes": minutes,
+            "blocked": [(start.date(), end.date()) for start, end in blocked]
+        }
+
+    @staticmethod
+    def plan(context: Dict[str, Any], days: int):
+        """Planned daily TSS for the next ``days`` days plus the compliance mean and spread."""
+        today = context["today"]
+        history = context["history"]
+        history_weekdays = (np.arange(-len(history), 0) + today.weekday()) % 7
+
+        if context["minutes"].any():
+            per_weekday = context["minutes"] / 60 * context["tss_per_hour"]
+        else:
+            per_weekday = np.array([
+                history[history_weekdays == weekday].mean() if (history_weekdays == weekday).any() else 0.0
+                for weekday in range(7)
+            ])
+
+        # Compliance: load actually done per week relative to the plan
+        weeks = len(history) // 7
+        done = history[len(history) - weeks * 7:].reshape(weeks, 7).sum(axis=1)
+        planned_weeks = per_weekday[history_weekdays[len(history) - weeks * 7:]].reshape(weeks, 7).sum(axis=1)
+        ratios = done[planned_weeks > 0] / planned_weeks[planned_weeks > 0]
+        mean = float(np.clip(ratios.mean(), 0, 1.5)) if len(ratios) else 1.0
+        std = max(float(ratios.std()), MIN_COMPLIANCE_STD) if len(ratios) > 1 else 0.25
+
+        future = [today + timedelta(days=offset) for offset in range(1, days + 1)]
+        planned = per_weekday[[day.weekday() for day in future]]
+        for start, end in context["blocked"]:
+            planned[[start <= day <= end for day in future]] = 0
+        return planned, mean, std
+
+    @staticmethod
+    def cache_key(goal: Goal, context: Dict[str, Any]) -> str:
+        inputs = (
+            goal.target_value, goal.event_date, goal.metric_type, context["today"], context["ctl"],
+            context["history"].round(1).tolist(), context["tss_per_hour"], context["minutes"].tolist(),
+            context["blocked"], SIMULATIONS
+        )
+        return hashlib.sha1(repr(inputs).encode()).hexdigest()
+
+    @staticmethod
+    def forecast(db: Session, goal: Goal, context: Optional[Dict[str, Any]] = None) -> Goal:
+        """Update the goal's forecast fields unless the cached forecast is still valid; the caller commits."""
+        if goal.metric_type not in CTL_GOAL_TYPES or goal.status != "active":
+            return goal
+        context = context or GoalForecastService.context(db, goal.user_id, datetime.utcnow().date())
+        key = GoalForecastService.cache_key(goal, context)
+        if goal.forecast_key == key:
+            return goal
+
+        today = context["today"]
+        required = goal.target_value
+        event_day = goal.event_date.date() if goal.event_date else None
+        if event_day and event_day > today:
+            days = min((event_day - today).days, MAX_HORIZON_DAYS)
+        else:
+            days = HORIZON_DAYS
+
+        planned, mean, std = GoalForecastService.plan(context, days)
+        ctl = simulate_ctl(context["ctl"], planned, mean, std, np.random.default_rng(goal.id))
+
+        reached = ctl >= required
+        crossing = np.where(reached.any(axis=1), reached.argmax(axis=1) + 1, np.inf)
+        if context["ctl"] >= required:
+            crossing[:] = 0
+        median_day = np.median(crossing)
+
+        goal.required_ctl = required
+        goal.current_projection = round(float(np.median(ctl[:, -1])), 1)
+        goal.readiness_percentage = round(min(100.0, context["ctl"] / required * 100), 1) if required > 0 else 100.0
+        goal.estimated_achievement_date = (
+            datetime.combine(today + timedelta(days=int(median_day)), datetime.min.time())
+            if np.isfinite(median_day) else None
+        )
+        # On the event day if there is one, otherwise anywhere within the horizon
+        hit = reached[:, -1] if event_day and event_day > today else np.isfinite(crossing)
+        goal.confidence_score = round(float(hit.mean()), 3)
+        goal.forecast_key = key
+        goal.forecasted_at = datetime.utcnow()
+        return goal
+
+    @staticmethod
+    def forecast_user(db: Session, user_id: int) -> List[Goal]:
+        """Forecast all of the user's goals, sharing one read of their context."""
+        goals = db.query(Goal).filter(Goal.user_id == user_id).order_by(Goal.event_date, Goal.id).all()
+        if any(goal.metric_type in CTL_GOAL_TYPES and goal.status == "active" for goal in goals):
+            context = GoalForecastService.context(db, user_id, datetime.utcnow().date())
+            for goal in goals:
+                GoalForecastService.forecast(db, goal, context)
+            db.commit()
+        return goals
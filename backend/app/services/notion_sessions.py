@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+import requests
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.services.notion_oauth import NotionOAuthService
+
+# Notion Training Sessions DB
+NOTION_TRAINING_DB = "30f8f154-9217-814a-b957-d9030f1a1cd4"
+
+
+class NotionSessionService:
+    """Planned training sessions from the Notion training database."""
+
+    @staticmethod
+    def get_sessions(db: Session, user_id: int, days: int = 14) -> List[Dict[str, Any]]:
+        """Sessions from today on; empty without a Notion connection."""
+        notion_token = NotionOAuthService.get_valid_access_token(db, user_id)
+        if not notion_token:
+            return []
+        return NotionSessionService.fetch_sessions(notion_token, days)
+
+    @staticmethod
+    def fetch_sessions(notion_token: str, days: int = 14, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Query the training database; touches no database session, so it can run in a thread."""
+        headers = {
+            "Authorization": f"Bearer {notion_token}",
+            "Notion-Version": "2022-06-28"
+        }
+        start_date = datetime.now().strftime("%Y-%m-%d")
+        end_date = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+        resp = requests.post(
+            f"https://api.notion.com/v1/databases/{NOTION_TRAINING_DB}/query",
+            headers=headers,
+            json={
+                "filter": {
+                    "and": [
+                        {"property": "Date", "date": {"on_or_after": start_date}},
+                        {"property": "Date", "date": {"on_or_before": end_date}},
+                        {"property": "Project", "select": {"equals": "SportDashb"}}
+                    ]
+                },
+                "sorts": [{"property": "Date", "direction": "ascending"}]
+            },
+            timeout=timeout
+        )
+        if resp.status_code != 200:
+            raise HTTPException(status_code=resp.status_code, detail=resp.text)
+
+        sessions = []
+        for page in resp.json().get('results', []):
+            props = page['properties']
+            sessions.append({
+                "id": page['id'],
+                "name": props['Name']['title'][0]['text']['content'] if props['Name']['title'] else '',
+                "type": props['Type']['select']['name'] if props['Type'].get('select') else None,
+                "date": props['Date']['date']['start'] if props['Date'].get('date') else None,
+                "duration": props['Duration']['number'] if props['Duration'].get('number') else None,
+                "distance": props['Distance']['number'] if props['Distance'].get('number') else None,
+                "description": props['Description']['rich_text'][0]['text']['content'] if props['Description'].get('rich_text') else None
+            })
+        return sessions
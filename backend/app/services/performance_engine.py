@@ -1,62 +1,488 @@
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
 from app.models.activity import Activity
+from app.models.performance import SnapshotState
+from app.models.profile import UserProfile, AthleteThreshold
+from app.models.stream import ActivityStream
+from app.services.activity_columns import ActivityColumns
+from app.services.stream_codec import StreamCodec
+
+ROLLING_WINDOW = 30  # seconds, for NP and normalized graded pace
+MAX_GAP = 5  # seconds; longer gaps in the time stream are pauses and are dropped
+DEFAULT_MAX_HR = 190
+DEFAULT_RESTING_HR = 60
+DEFAULT_IF = 0.7  # last resort without power, heart rate or pace
+DEFAULT_TSS_PER_HOUR = 60.0  # planned load estimate without an hour of rated history
+METRICS_BATCH_SIZE = 500
+CTL_DAYS = 42
+ATL_DAYS = 7
+EWMA_BLOCK = 128  # days per closed-form block, keeps decay^-k well inside float64
+SPORT_GROUPS = ("swim", "bike", "run")
+VO2MAX_WARMUP = 600  # seconds; heart rate lags pace at the start of a run
+VO2MAX_BLOCK = 300  # seconds of running per pace/heart rate pair
+VO2MAX_RESERVE = (0.6, 0.95)  # share of heart rate reserve where it tracks VO2 linearly
+STREAM_TYPES = ["time", "watts", "heartrate", "velocity_smooth", "grade_smooth"]
+# What ``summary_load`` reads, for estimates from column rows instead of ORM objects
+SUMMARY_COLUMNS = ("start_date", "sport_type", "moving_time", "average_watts", "average_speed", "average_heartrate", "tss")
+
+
+def is_run(sport_type: Optional[str]) -> bool:
+    return bool(sport_type) and "Run" in sport_type
+
+
+def is_swim(sport_type: Optional[str]) -> bool:
+    return bool(sport_type) and "Swim" in sport_type
+
+
+def sport_group(sport_type: Optional[str]) -> int:
+    """Index into ``SPORT_GROUPS`` plus one, 0 for everything else."""
+    if not sport_type:
+        return 0
+    if is_swim(sport_type):
+        return 1
+    if "Ride" in sport_type or sport_type in ("Velomobile", "Handcycle"):
+        return 2
+    if "Run" in sport_type:
+        return 3
+    return 0
+
+
+def resample(values: np.ndarray, time: Optional[np.ndarray]) -> np.ndarray:
+    """Put a stream on a 1 Hz grid, holding values over short dropouts and cutting out pauses."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.dtype.kind == "f":
+        values = np.nan_to_num(values, copy=False)
+    if time is None or len(time) != len(values) or len(values) < 2:
+        return values
+    steps = np.diff(time)
+    if (steps == 1).all():
+        return values
+    steps = np.where(steps > MAX_GAP, 1, np.maximum(steps, 0))
+    elapsed = np.concatenate(([0], np.cumsum(steps))).astype(np.int64)
+    grid = np.arange(elapsed[-1] + 1)
+    return values[np.searchsorted(elapsed, grid, side="right") - 1]
+
+
+def rolling_quartic_mean(series: List[np.ndarray], window: int = ROLLING_WINDOW) -> np.ndarray:
+    """(mean of rolling-``window`` mean ^ 4) ^ 1/4 for many series at once.
+
+    All series are concatenated and handled with one cumsum, so the cost
+    doesn't depend on how many activities are in the batch. Series shorter
+    than the window give NaN.
+    """
+    count = len(series)
+    if not count:
+        return np.zeros(0)
+    lengths = np.fromiter((len(s) for s in series), dtype=np.int64, count=count)
+    values = np.concatenate(series) if lengths.sum() else np.zeros(0)
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    starts = np.cumsum(lengths) - lengths
+    segment = np.repeat(np.arange(count), lengths)
+    position = np.arange(len(values))
+
+    full = position - starts[segment] >= window - 1
+    end = position[full] + 1
+    rolling = (sums[end] - sums[end - window]) / window
+
+    squared = rolling * rolling
+    totals = np.bincount(segment[full], weights=squared * squared, minlength=count)
+    samples = np.bincount(segment[full], minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(samples > 0, (totals / samples) ** 0.25, np.nan)
+
+
+def grade_factor(grade: np.ndarray) -> np.ndarray:
+    """Energy cost of running on a grade (percent) relative to flat ground (Minetti 2002)."""
+    i = np.clip(grade / 100, -0.45, 0.45)
+    # Horner form of 155.4i^5 - 30.4i^4 - 43.3i^3 + 46.3i^2 + 19.5i + 3.6
+    cost = ((((155.4 * i - 30.4) * i - 43.3) * i + 46.3) * i + 19.5) * i + 3.6
+    return cost / 3.6
+
+
+def ewma(values: np.ndarray, days: int, initial=0.0) -> np.ndarray:
+    """Exponentially weighted load: y[t] = y[t-1] + (x[t] - y[t-1]) / days.
+
+    Vectorised per block with the closed form
+    y[j] = d^(j+1) * y0 + a * d^j * cumsum(x[i] * d^-i), d = 1 - a,
+    carrying the state from block to block like ``scipy.signal.lfilter``.
+    Runs along the last axis, so several series (one ``initial`` each) go
+    through in one pass.
+    """
+    alpha = 1 / days
+    decay = 1 - alpha
+    steps = np.arange(EWMA_BLOCK)
+    grow = decay ** -steps
+    shrink = decay ** steps
+
+    out = np.empty(np.shape(values))
+    state = np.asarray(initial, dtype=np.float64)[..., np.newaxis]
+    for start in range(0, out.shape[-1], EWMA_BLOCK):
+        block = values[..., start:start + EWMA_BLOCK]
+        size = block.shape[-1]
+        y = shrink[:size] * (decay * state + alpha * np.cumsum(block * grow[:size], axis=-1))
+        out[..., start:start + size] = y
+        state = y[..., -1:]
+    return out
+
+
+def running_vo2max(speed: np.ndarray, heartrate: np.ndarray, resting_hr: float, max_hr: float) -> Optional[float]:
+    """VO2max (ml/kg/min) from pace/heart rate pairs of a run.
+
+    Every ``VO2MAX_BLOCK`` after the warm-up is one pair: the ACSM running
+    cost VO2 = 0.2 * m/min + 3.5 of its (graded) speed over its share of
+    heart rate reserve, which tracks the share of VO2 reserve. The median of
+    at least two pairs in ``VO2MAX_RESERVE`` is the run's estimate.
+    """
+    blocks = (min(len(speed), len(heartrate)) - VO2MAX_WARMUP) // VO2MAX_BLOCK
+    if blocks < 1:
+        return None
+    end = VO2MAX_WARMUP + blocks * VO2MAX_BLOCK
+    speed = speed[VO2MAX_WARMUP:end].reshape(blocks, VO2MAX_BLOCK).mean(axis=1)
+    reserve = (heartrate[VO2MAX_WARMUP:end].reshape(blocks, VO2MAX_BLOCK).mean(axis=1) - resting_hr) / (max_hr - resting_hr)
+    usable = (reserve >= VO2MAX_RESERVE[0]) & (reserve <= VO2MAX_RESERVE[1])
+    if usable.sum() < 2:
+        return None
+    return float(np.median(3.5 + 12 * speed[usable] / reserve[usable]))
+
+
+def trimp_per_second(heartrate: np.ndarray, resting_hr: float, max_hr: float) -> np.ndarray:
+    """Banister TRIMP contribution of each 1 Hz heart rate sample."""
+    reserve = np.clip((heartrate - resting_hr) / (max_hr - resting_hr), 0, 1)
+    return reserve * 0.64 * np.exp(1.92 * reserve) / 60
+
 
 class PerformanceEngine:
-    
-    @staticmethod
-    def calculate_tss(activity: Activity) -> float:
-        """Calculate Training Stress Score for an activity"""
-        if not activity.duration or not activity.distance:
-            return 0
-        
-        # Estimate IF (Intensity Factor) from heartrate if available
-        if activity.avg_hr:
-            # Assuming a standard max HR of 185 for the estimation
-            estimated_if = min(activity.avg_hr / 185, 1.2)
-        elif getattr(activity, 'avg_power', None) and activity.duration:
-            # Placeholder for power-based IF (needs FTP)
-            estimated_if = 0.8
-        else:
-            estimated_if = 0.7  # Default dummy
-        
-        # TSS = (seconds * IF^2 * 100) / 3600
-        tss = (activity.duration * estimated_if * estimated_if * 100) / 3600
-        return tss
-
-    @staticmethod
-    def calculate_training_load(activities: List[Activity]) -> Dict[str, Any]:
-        """Calculate CTL (42-day), ATL (7-day), and TSB from a list of activities."""
-        # Calculate daily TSS for the last 42 days minimum
-        daily_tss = {}
-        for a in activities:
-            if a.start_date:
-                day = a.start_date.strftime("%Y-%m-%d")
-                tss = PerformanceEngine.calculate_tss(a)
-                daily_tss[day] = daily_tss.get(day, 0) + tss
-        
-        # Generate last 42 days sequentially to compute rolling averages
-        today = datetime.now()
-        
-        # Calculate ATL (7-day rolling average)
-        atl = 0
-        for i in range(7):
-            day = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            atl += daily_tss.get(day, 0)
-        atl = atl / 7 if daily_tss else 0
-        
-        # Calculate CTL (42-day rolling average)
-        ctl = 0
-        for i in range(42):
-            day = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            ctl += daily_tss.get(day, 0)
-        ctl = ctl / 42 if daily_tss else 0
-        
-        tsb = ctl - atl
-        
+
+    @staticmethod
+    def thresholds(
+        ftp: Optional[float] = None,
+        threshold_hr: Optional[int] = None,
+        threshold_pace: Optional[float] = None,
+        css: Optional[float] = None,
+        max_hr: Optional[int] = None,
+        resting_hr: Optional[int] = None
+    ) -> Dict[str, Optional[float]]:
+        """Thresholds as ``calculate_loads`` expects them, with heart rate defaults where they are missing."""
+        max_hr = max_hr or DEFAULT_MAX_HR
         return {
-            "ctl": ctl,
-            "atl": atl,
-            "tsb": tsb,
-            "daily_tss": daily_tss
+            "ftp": ftp,
+            "threshold_hr": threshold_hr or round(0.9 * max_hr),
+            "threshold_speed": 1000 / threshold_pace if threshold_pace else None,  # m/s
+            "css_speed": 100 / css if css else None,  # m/s
+            "max_hr": max_hr,
+            "resting_hr": resting_hr or DEFAULT_RESTING_HR
         }
+
+    @staticmethod
+    def threshold_versions(db: Session, user_id: int) -> List[Tuple[Optional[datetime], Dict[str, Optional[float]]]]:
+        """(valid_from, thresholds) of every version of the user's thresholds, oldest first.
+
+        Max and resting heart rate aren't versioned and come from the profile,
+        as do the other thresholds while the user has no versions at all.
+        """
+        profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        heart = {"max_hr": profile and profile.max_hr, "resting_hr": profile and profile.resting_hr}
+        versions = sorted(
+            db.query(AthleteThreshold).filter(AthleteThreshold.user_id == user_id),
+            key=lambda version: (version.valid_from is not None, version.valid_from or datetime.min)
+        )
+        if not versions:
+            return [(None, PerformanceEngine.thresholds(
+                profile and profile.ftp, profile and profile.threshold_hr, profile and profile.threshold_pace, **heart
+            ))]
+        return [(version.valid_from, PerformanceEngine.thresholds(
+            version.ftp, version.threshold_hr, version.threshold_pace, version.css, **heart
+        )) for version in versions]
+
+    @staticmethod
+    def version_at(versions: List[Tuple[Optional[datetime], Dict[str, Optional[float]]]], when: Optional[datetime]) -> int:
+        """Index of the version in effect at ``when``; the oldest one also covers anything before it."""
+        if when is None:
+            return len(versions) - 1
+        return max(bisect_right([valid_from for valid_from, _ in versions[1:]], when), 0)
+
+    @staticmethod
+    def get_thresholds(db: Session, user_id: int, when: Optional[datetime] = None) -> Dict[str, Optional[float]]:
+        """Thresholds in effect at ``when`` (default: now)."""
+        versions = PerformanceEngine.threshold_versions(db, user_id)
+        return versions[PerformanceEngine.version_at(versions, when or datetime.utcnow())][1]
+
+    @staticmethod
+    def calculate_loads(
+        activities: List[Activity],
+        streams: Dict[int, Dict[str, np.ndarray]],
+        thresholds: Dict[str, Optional[float]]
+    ) -> List[Dict[str, Any]]:
+        """NP, IF and TSS for a batch of activities rated with the same thresholds.
+
+        Per activity the first available method wins: power TSS from the
+        watts stream (needs FTP), rTSS from normalized graded pace for runs
+        (needs threshold pace), hrTSS from TRIMP relative to an hour at LTHR.
+        Swims are rated on average speed against CSS when it is set.
+        Activities without streams use the same methods on their summary
+        averages, and ``DEFAULT_IF`` when there is nothing at all. Runs with
+        pace and heart rate also get a VO2max estimate.
+        """
+        ftp = thresholds["ftp"]
+        threshold_speed = thresholds["threshold_speed"]
+        css_speed = thresholds.get("css_speed")
+        max_hr = thresholds["max_hr"]
+        resting_hr = thresholds["resting_hr"]
+        trimp_hour = 3600 * trimp_per_second(np.array([thresholds["threshold_hr"]]), resting_hr, max_hr)[0]
+
+        power, pace, heart = [], [], []
+        vo2max = [None] * len(activities)
+        for index, activity in enumerate(activities):
+            data = streams.get(activity.id) or {}
+            time = data.get("time")
+            speed = None
+            if is_run(activity.sport_type) and data.get("velocity_smooth") is not None:
+                speed = resample(data["velocity_smooth"], time)
+                if data.get("grade_smooth") is not None:
+                    speed = speed * grade_factor(resample(data["grade_smooth"], time))
+                if data.get("heartrate") is not None:
+                    vo2max[index] = running_vo2max(speed, resample(data["heartrate"], time), resting_hr, max_hr)
+            elif is_run(activity.sport_type) and not data and activity.average_speed and activity.average_heartrate:
+                # One pair for the whole run, if it is long enough to be past the warm-up
+                if (activity.moving_time or 0) >= VO2MAX_WARMUP + 2 * VO2MAX_BLOCK:
+                    reserve = (activity.average_heartrate - resting_hr) / (max_hr - resting_hr)
+                    if VO2MAX_RESERVE[0] <= reserve <= VO2MAX_RESERVE[1]:
+                        vo2max[index] = 3.5 + 12 * activity.average_speed / reserve
+
+            if ftp and data.get("watts") is not None:
+                power.append((index, resample(data["watts"], time)))
+            elif css_speed and is_swim(activity.sport_type) and activity.average_speed:
+                continue  # rated against CSS in summary_load
+            elif threshold_speed and speed is not None:
+                pace.append((index, speed))
+            elif data.get("heartrate") is not None:
+                heart.append((index, resample(data["heartrate"], time)))
+
+        results = [None] * len(activities)
+
+        normalized = rolling_quartic_mean([series for _, series in power])
+        for (index, series), np_watts in zip(power, normalized):
+            if np.isfinite(np_watts):
+                intensity = np_watts / ftp
+                tss = len(series) * np_watts * intensity / (ftp * 3600) * 100
+                results[index] = (np_watts, intensity, tss, "power")
+
+        normalized = rolling_quartic_mean([series for _, series in pace])
+        for (index, series), ngp in zip(pace, normalized):
+            if np.isfinite(ngp):
+                intensity = ngp / threshold_speed
+                results[index] = (None, intensity, len(series) / 3600 * intensity ** 2 * 100, "pace")
+
+        if heart:
+            lengths = [len(series) for _, series in heart]
+            values = np.concatenate([series for _, series in heart])
+            segment = np.repeat(np.arange(len(heart)), lengths)
+            trimp = np.bincount(segment, weights=trimp_per_second(values, resting_hr, max_hr), minlength=len(heart))
+            for (index, series), value in zip(heart, trimp):
+                tss = value / trimp_hour * 100
+                results[index] = (None, np.sqrt(tss / (len(series) / 36)) if len(series) else None, tss, "hr")
+
+        for index, activity in enumerate(activities):
+            if results[index] is None:
+                results[index] = PerformanceEngine.summary_load(activity, thresholds, trimp_hour)
+
+        return [{
+            "id": activity.id,
+            "normalized_power": round(float(np_watts), 1) if np_watts is not None else None,
+            "intensity_factor": round(float(intensity), 3) if intensity is not None else None,
+            "tss": round(float(tss), 1),
+            "tss_method": method,
+            "vo2max": round(vo2, 1) if vo2 is not None else None
+        } for activity, (np_watts, intensity, tss, method), vo2 in zip(activities, results, vo2max)]
+
+    @staticmethod
+    def summary_load(activity: Activity, thresholds: Dict[str, Optional[float]], trimp_hour: float):
+        """(NP, IF, TSS, method) from summary averages when there are no usable streams."""
+        hours = (activity.moving_time or 0) / 3600
+        intensity, method = None, None
+        if thresholds["ftp"] and activity.average_watts:
+            intensity, method = activity.average_watts / thresholds["ftp"], "summary_power"
+        elif thresholds["threshold_speed"] and is_run(activity.sport_type) and activity.average_speed:
+            intensity, method = activity.average_speed / thresholds["threshold_speed"], "summary_pace"
+        elif thresholds.get("css_speed") and is_swim(activity.sport_type) and activity.average_speed:
+            # sTSS: intensity cubed, swimming drag grows with speed
+            intensity = activity.average_speed / thresholds["css_speed"]
+            return None, intensity, hours * intensity ** 3 * 100, "swim"
+        elif activity.average_heartrate:
+            trimp = 3600 * hours * trimp_per_second(
+                np.array([activity.average_heartrate]), thresholds["resting_hr"], thresholds["max_hr"]
+            )[0]
+            tss = trimp / trimp_hour * 100
+            return None, np.sqrt(tss / (hours * 100)) if hours else None, tss, "summary_hr"
+        if intensity is None:
+            intensity, method = DEFAULT_IF, "default"
+        return None, intensity, hours * intensity ** 2 * 100, method
+
+    @staticmethod
+    def update_activity_loads(
+        db: Session,
+        user_id: int,
+        activity_ids: Optional[List[int]] = None,
+        only_missing: bool = False,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        """Compute and store NP/IF/TSS (and VO2max of runs) for a user's activities in batches.
+
+        ``activity_ids`` limits the run to those activities, ``only_missing``
+        to activities without a TSS yet and ``since``/``until`` to activities
+        starting in that window. Each activity is rated with the threshold
+        version in effect on its date. Streams are read per batch with one
+        query and the results written back with one executemany UPDATE.
+        """
+        versions = PerformanceEngine.threshold_versions(db, user_id)
+        query = db.query(Activity).filter(Activity.user_id == user_id)
+        if activity_ids is not None:
+            query = query.filter(Activity.id.in_(activity_ids))
+        if only_missing:
+            query = query.filter(Activity.tss.is_(None))
+        if since is not None:
+            query = query.filter(Activity.start_date >= since)
+        if until is not None:
+            query = query.filter(Activity.start_date < until)
+
+        updated = 0
+        last_id = 0
+        while True:
+            activities = query.filter(Activity.id > last_id).order_by(Activity.id).limit(METRICS_BATCH_SIZE).all()
+            if not activities:
+                break
+            last_id = activities[-1].id
+
+            with_streams = [a.id for a in activities if a.streams_status == "ok"]
+            streams: Dict[int, Dict[str, np.ndarray]] = {}
+            if with_streams:
+                for stream in db.query(ActivityStream).filter(
+                    ActivityStream.activity_id.in_(with_streams),
+                    ActivityStream.stream_type.in_(STREAM_TYPES)
+                ):
+                    streams.setdefault(stream.activity_id, {})[stream.stream_type] = StreamCodec.decode_stored(
+                        stream.encoding, stream.data
+                    )
+
+            by_version: Dict[int, List[Activity]] = {}
+            for activity in activities:
+                by_version.setdefault(PerformanceEngine.version_at(versions, activity.start_date), []).append(activity)
+            rows = []
+            for version, group in by_version.items():
+                rows.extend(PerformanceEngine.calculate_loads(group, streams, versions[version][1]))
+
+            by_id = {activity.id: activity for activity in activities}
+            changed = [
+                by_id[row["id"]].start_date for row in rows
+                if by_id[row["id"]].start_date
+                and (by_id[row["id"]].tss != row["tss"] or by_id[row["id"]].vo2max != row["vo2max"])
+            ]
+            if changed:
+                PerformanceEngine.mark_dirty(db, user_id, min(changed))
+            db.execute(update(Activity), rows)
+            db.commit()
+            updated += len(rows)
+            # Keep the identity map small; other objects of the caller's session stay attached
+            for activity in activities:
+                db.expunge(activity)
+        return updated
+
+    @staticmethod
+    def mark_dirty(db: Session, user_id: int, since: datetime) -> None:
+        """Lower the user's snapshot watermark to the day before ``since``; the caller commits.
+
+        Loads are bucketed by local date, which west of UTC is the day
+        before the UTC start date.
+        """
+        day = datetime.combine(since.date() - timedelta(days=1), datetime.min.time())
+        state = db.query(SnapshotState).filter(SnapshotState.user_id == user_id).first()
+        if state is None:
+            db.add(SnapshotState(user_id=user_id, dirty_from=day))
+        elif state.dirty_from is None or day < state.dirty_from:
+            state.dirty_from = day
+
+    @staticmethod
+    def calculate_tss(activity: Activity, thresholds: Optional[Dict[str, Optional[float]]] = None) -> float:
+        """Stored TSS, or a summary-based estimate (default thresholds unless given)."""
+        if activity.tss is not None:
+            return activity.tss
+        thresholds = thresholds or PerformanceEngine.thresholds()
+        trimp_hour = 3600 * trimp_per_second(
+            np.array([thresholds["threshold_hr"]]), thresholds["resting_hr"], thresholds["max_hr"]
+        )[0]
+        return PerformanceEngine.summary_load(activity, thresholds, trimp_hour)[2]
+
+    @staticmethod
+    def load_series(
+        dates: List[datetime],
+        loads: List[float],
+        first_day: date,
+        last_day: date,
+        initial: Tuple[Any, Any] = (0.0, 0.0),
+        sports: Optional[List[Optional[str]]] = None
+    ):
+        """Zero-filled daily TSS and its CTL/ATL from ``first_day`` to ``last_day``.
+
+        ``dates`` are datetimes or a datetime64 array. ``initial`` is the (CTL, ATL) of the day before ``first_day``. With
+        ``sports`` (the activities' sport types) every result is a matrix:
+        row 0 the combined load, then one row per ``SPORT_GROUPS`` entry, all
+        run through one EWMA pass.
+        """
+        days = (last_day - first_day).days + 1
+        index = (np.asarray(dates, dtype="datetime64[D]") - np.datetime64(first_day, "D")).astype(np.int64)
+        weights = np.asarray(loads, dtype=np.float64)
+        inside = (index >= 0) & (index < days)
+        tss = np.bincount(index[inside], weights=weights[inside], minlength=days)
+        if sports is not None:
+            groups = np.array([sport_group(sport) for sport in sports], dtype=np.int64)
+            per_group = np.bincount(
+                (groups * days + index)[inside], weights=weights[inside], minlength=(len(SPORT_GROUPS) + 1) * days
+            ).reshape(-1, days)
+            # Row 0 of per_group is "other", which only counts towards the combined load
+            tss = np.vstack((tss, per_group[1:]))
+        return tss, ewma(tss, CTL_DAYS, initial[0]), ewma(tss, ATL_DAYS, initial[1])
+
+    @staticmethod
+    def daily_loads(db: Session, user_id: int, end: date, start: Optional[date] = None):
+        """Local dates (datetime64[D]), TSS and sport types of the user's activities up to
+        ``end`` (and from ``start``), TSS estimated where not rated yet."""
+        window = [Activity.local_date.isnot(None), Activity.local_date <= end]
+        if start:
+            window.append(Activity.local_date >= start)
+        rated = ActivityColumns.arrays(
+            db, user_id, ("local_date", "tss", "sport_type"),
+            criteria=(*window, Activity.tss.isnot(None))
+        )
+        dates, loads, sports = rated["local_date"], rated["tss"], rated["sport_type"]
+        # Not rated by the engine yet
+        unrated = ActivityColumns.rows(
+            db, user_id, SUMMARY_COLUMNS + ("local_date",),
+            criteria=(*window, Activity.tss.is_(None))
+        )
+        if unrated:
+            versions = PerformanceEngine.threshold_versions(db, user_id)
+            dates = np.concatenate((dates, np.array([row.local_date for row in unrated], dtype="datetime64[D]")))
+            loads = np.concatenate((loads, [
+                PerformanceEngine.calculate_tss(row, versions[PerformanceEngine.version_at(versions, row.start_date)][1])
+                for row in unrated
+            ]))
+            sports = np.concatenate((sports, np.array([row.sport_type for row in unrated], dtype=object)))
+        return dates, loads, sports
+
+    @staticmethod
+    def tss_per_hour(db: Session, user_id: int, since: datetime) -> float:
+        """The user's average TSS per hour of moving time since ``since``, to estimate planned sessions."""
+        tss, seconds = db.query(
+            func.coalesce(func.sum(Activity.tss), 0),
+            func.coalesce(func.sum(Activity.moving_time), 0)
+        ).filter(
+            Activity.user_id == user_id,
+            Activity.tss.isnot(None),
+            Activity.start_date >= since
+        ).one()
+        return round(tss / (seconds / 3600), 1) if seconds >= 3600 else DEFAULT_TSS_PER_HOUR
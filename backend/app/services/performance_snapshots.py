@@ -0,0 +1,218 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.activity import Activity
+from app.models.performance import PerformanceSnapshot, SnapshotState
+from app.services.fitness_estimates import EstimateService
+from app.services.performance_engine import PerformanceEngine, CTL_DAYS, ATL_DAYS, SPORT_GROUPS
+
+# (TSS, CTL, ATL) column names per row of the load matrix: combined, then per sport group
+LOAD_COLUMNS = [("tss", "ctl", "atl")] + [(f"{g}_tss", f"{g}_ctl", f"{g}_atl") for g in SPORT_GROUPS]
+SNAPSHOT_COLUMNS = [column for columns in LOAD_COLUMNS for column in columns] + ["tsb"]
+ESTIMATE_COLUMNS = ["estimated_ftp", "estimated_vo2max", "estimated_css"]
+
+
+def midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+class SnapshotService:
+    """The daily load series, materialized in ``performance_snapshots``.
+
+    Every change to an activity's load lowers the user's dirty watermark
+    (``snapshot_states.dirty_from``). Because CTL/ATL are recursive,
+    ``refresh`` only recomputes forward from there, seeded with the stored
+    values of the day before, so a new activity costs O(days since its date).
+    Reads are a single range scan on the (user_id, date) index; days after
+    the last stored row had no activities yet and only decay. Each row also
+    carries the swim/bike/run split, computed in the same EWMA pass, and the
+    FTP/VO2max/CSS estimates of ``EstimateService`` for the same days.
+    """
+
+    @staticmethod
+    def refresh(db: Session, user_id: int, full: bool = False) -> int:
+        """Bring the user's snapshots up to today, returns the number of days written.
+
+        Without a stored day to seed from (first run, or a change before the
+        oldest snapshot) the whole history is rebuilt, as with ``full``.
+        """
+        today = datetime.utcnow().date()
+        state = db.query(SnapshotState).filter(SnapshotState.user_id == user_id).first()
+        dirty_from = state.dirty_from if state else None
+
+        seed = None
+        if not full:
+            last = db.query(func.max(PerformanceSnapshot.date)).filter(
+                PerformanceSnapshot.user_id == user_id
+            ).scalar()
+            if last is not None:
+                start = last.date() + timedelta(days=1)
+                if dirty_from is not None:
+                    start = min(start, dirty_from.date())
+                if start > today:
+                    return 0
+                seed = db.query(*SnapshotService.columns(1), *SnapshotService.columns(2)).filter(
+                    PerformanceSnapshot.user_id == user_id,
+                    PerformanceSnapshot.date == midnight(start - timedelta(days=1))
+                ).first()
+
+        if seed is not None:
+            dates, loads, sports = PerformanceEngine.daily_loads(db, user_id, today, start)
+            initial = np.array(seed, dtype=np.float64).reshape(2, -1)
+            tss, ctl, atl = PerformanceEngine.load_series(dates, loads, start, today, initial, sports)
+            estimates = EstimateService.series(db, user_id, start, today)
+            written = SnapshotService.write(db, user_id, start, tss, ctl, atl, estimates)
+        else:
+            dates, loads, sports = PerformanceEngine.daily_loads(db, user_id, today)
+            if len(dates):
+                start = dates.min().astype("datetime64[D]").item()
+                tss, ctl, atl = PerformanceEngine.load_series(dates, loads, start, today, sports=sports)
+                estimates = EstimateService.series(db, user_id, start, today)
+                written = SnapshotService.write(db, user_id, start, tss, ctl, atl, estimates)
+            else:
+                start, written = today + timedelta(days=1), 0
+            # History before the (possibly deleted) first activity
+            db.query(PerformanceSnapshot).filter(
+                PerformanceSnapshot.user_id == user_id,
+                PerformanceSnapshot.date < midnight(start)
+            ).delete(synchronize_session=False)
+
+        if dirty_from is not None:
+            # Only if nothing lowered it again in the meantime
+            db.query(SnapshotState).filter(
+                SnapshotState.user_id == user_id,
+                SnapshotState.dirty_from == dirty_from
+            ).update({"dirty_from": None}, synchronize_session=False)
+        db.commit()
+        return written
+
+    @staticmethod
+    def columns(position: int) -> List[Any]:
+        """Snapshot columns holding TSS (0), CTL (1) or ATL (2) of every row of the load matrix."""
+        return [getattr(PerformanceSnapshot, names[position]) for names in LOAD_COLUMNS]
+
+    @staticmethod
+    def write(
+        db: Session,
+        user_id: int,
+        start: date,
+        tss: np.ndarray,
+        ctl: np.ndarray,
+        atl: np.ndarray,
+        estimates: Optional[Dict[str, np.ndarray]] = None
+    ) -> int:
+        """Upsert consecutive days of a load matrix (and estimate columns) from ``start``; the caller commits."""
+        count = tss.shape[-1]
+        if not count:
+            return 0
+        days = np.arange(np.datetime64(start), np.datetime64(start) + count).astype(datetime)
+        values = {"tsb": (ctl[0] - atl[0]).tolist()}
+        for row, names in enumerate(LOAD_COLUMNS):
+            for name, matrix in zip(names, (tss, ctl, atl)):
+                values[name] = matrix[row].tolist()
+        for name, column in (estimates or {}).items():
+            values[name] = [None if np.isnan(value) else round(float(value), 1) for value in column]
+        rows = [
+            {"user_id": user_id, "date": midnight(day), **{name: column[i] for name, column in values.items()}}
+            for i, day in enumerate(days)
+        ]
+
+        table = PerformanceSnapshot.__table__
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["user_id", "date"],
+                set_={column: stmt.excluded[column] for column in SNAPSHOT_COLUMNS + list(estimates or {})}
+            ), rows)
+        else:
+            db.query(PerformanceSnapshot).filter(
+                PerformanceSnapshot.user_id == user_id,
+                PerformanceSnapshot.date >= midnight(start)
+            ).delete(synchronize_session=False)
+            db.execute(table.insert(), rows)
+        return len(rows)
+
+    @staticmethod
+    def get_series(db: Session, user_id: int, start: date, end: date, refresh: bool = True) -> Dict[str, Any]:
+        """Daily TSS, CTL, ATL and TSB (= CTL - ATL) from ``start`` to ``end`` as
+        parallel lists under ``dates``/``tss``/``ctl``/``atl``/``tsb``, plus the same
+        per sport group under ``sports`` and the latest FTP/VO2max/CSS under ``estimates``.
+
+        Users without any snapshot yet (history from before the table was
+        maintained) are materialized on first read.
+        """
+        tss_columns, ctl_columns, atl_columns = (SnapshotService.columns(position) for position in range(3))
+        rows = db.query(PerformanceSnapshot.date, *tss_columns, *ctl_columns, *atl_columns).filter(
+            PerformanceSnapshot.user_id == user_id,
+            PerformanceSnapshot.date >= midnight(start),
+            PerformanceSnapshot.date <= midnight(end)
+        ).order_by(PerformanceSnapshot.date).all()
+
+        width = len(LOAD_COLUMNS)
+        last = None
+        if rows:
+            last = (rows[-1][0], np.array(rows[-1][1 + width:], dtype=np.float64).reshape(2, width))
+        else:
+            before = db.query(PerformanceSnapshot.date, *ctl_columns, *atl_columns).filter(
+                PerformanceSnapshot.user_id == user_id,
+                PerformanceSnapshot.date < midnight(start)
+            ).order_by(PerformanceSnapshot.date.desc()).first()
+            if before is not None:
+                last = (before[0], np.array(before[1:], dtype=np.float64).reshape(2, width))
+
+        if last is None and refresh:
+            has_snapshots = db.query(func.count(PerformanceSnapshot.id)).filter(
+                PerformanceSnapshot.user_id == user_id
+            ).scalar()
+            if not has_snapshots and SnapshotService.refresh(db, user_id):
+                return SnapshotService.get_series(db, user_id, start, end, refresh=False)
+
+        days = (end - start).days + 1
+        tss, ctl, atl = np.zeros((width, days)), np.zeros((width, days)), np.zeros((width, days))
+        if rows:
+            index = np.array([(row[0].date() - start).days for row in rows], dtype=np.int64)
+            values = np.array([row[1:] for row in rows], dtype=np.float64).T
+            tss[:, index], ctl[:, index], atl[:, index] = values[:width], values[width:2 * width], values[2 * width:]
+
+        if last is not None:
+            # Days since the last refresh have no load
+            offset = (last[0].date() - start).days
+            after = np.arange(max(offset + 1, 0), days)
+            elapsed = after - offset
+            ctl[:, after] = last[1][0][:, np.newaxis] * (1 - 1 / CTL_DAYS) ** elapsed
+            atl[:, after] = last[1][1][:, np.newaxis] * (1 - 1 / ATL_DAYS) ** elapsed
+
+        # Latest estimates up to ``end``; they hold until the next snapshot row
+        latest = db.query(*(getattr(PerformanceSnapshot, name) for name in ESTIMATE_COLUMNS)).filter(
+            PerformanceSnapshot.user_id == user_id,
+            PerformanceSnapshot.date <= midnight(end)
+        ).order_by(PerformanceSnapshot.date.desc()).first()
+
+        def series(row: int) -> Dict[str, List[float]]:
+            return {
+                "tss": np.round(tss[row], 1).tolist(),
+                "ctl": np.round(ctl[row], 1).tolist(),
+                "atl": np.round(atl[row], 1).tolist(),
+                "tsb": np.round(ctl[row] - atl[row], 1).tolist()
+            }
+
+        return {
+            "dates": np.arange(np.datetime64(start), np.datetime64(end) + 1).astype(str).tolist(),
+            **series(0),
+            "sports": {group: series(row) for row, group in enumerate(SPORT_GROUPS, 1)},
+            "estimates": {
+                name[len("estimated_"):]: value for name, value in zip(ESTIMATE_COLUMNS, latest or [None] * len(ESTIMATE_COLUMNS))
+            }
+        }
+
+    @staticmethod
+    def missing_users(db: Session) -> List[int]:
+        """Users with activities but no snapshots yet."""
+        return [user_id for (user_id,) in db.query(Activity.user_id).filter(
+            Activity.user_id.notin_(db.query(PerformanceSnapshot.user_id))
+        ).distinct()]
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.services.performance_engine import PerformanceEngine, ewma, CTL_DAYS, ATL_DAYS
+from app.services.performance_snapshots import SnapshotService
+
+MAX_PLANS = 50
+MAX_DAYS = 730
+TSS_HISTORY_DAYS = 90  # for sessions planned by duration only
+
+
+class PlanSimulator:
+    """What-if projection of CTL/ATL/TSB for candidate training plans.
+
+    Every plan is one row of a (plans, days) TSS matrix starting today, on
+    top of the load already recorded today, seeded with yesterday's
+    snapshot. All rows go through a single EWMA pass, so comparing many
+    plans costs about as much as one.
+    """
+
+    @staticmethod
+    def session_tss(session: Dict[str, Any], tss_per_hour: float) -> float:
+        if session.get("tss") is not None:
+            return session["tss"]
+        return (session.get("duration") or 0) / 60 * tss_per_hour
+
+    @staticmethod
+    def simulate(
+        db: Session,
+        user_id: int,
+        plans: List[Dict[str, Any]],
+        race_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Project each plan (``{"name", "sessions": [{"date", "tss" or "duration"}]}``)
+        up to ``race_date`` or its last session. Sessions before today are ignored,
+        they are part of the recorded history already."""
+        if not plans:
+            raise HTTPException(status_code=400, detail="No plans to simulate")
+        if len(plans) > MAX_PLANS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_PLANS} plans per simulation")
+        today = datetime.utcnow().date()
+        if race_date is not None and race_date < today:
+            raise HTTPException(status_code=400, detail="race_date is in the past")
+
+        sessions = [
+            (row, session) for row, plan in enumerate(plans)
+            for session in plan["sessions"] if session["date"] >= today
+        ]
+        end = race_date or max((session["date"] for _, session in sessions), default=today)
+        days = (end - today).days + 1
+        if days > MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f"Simulations cover at most {MAX_DAYS} days")
+
+        if any(session.get("tss") is None for _, session in sessions):
+            tss_per_hour = PerformanceEngine.tss_per_hour(
+                db, user_id, datetime.combine(today - timedelta(days=TSS_HISTORY_DAYS), datetime.min.time())
+            )
+        else:
+            tss_per_hour = None
+        index = np.array([row * days + (session["date"] - today).days for row, session in sessions], dtype=np.int64)
+        loads = np.array([PlanSimulator.session_tss(session, tss_per_hour) for _, session in sessions])
+        tss = np.bincount(index, weights=loads, minlength=len(plans) * days).astype(np.float64).reshape(len(plans), days)
+
+        current = SnapshotService.get_series(db, user_id, today - timedelta(days=1), today)
+        tss[:, 0] += current["tss"][1]
+        ctl = ewma(tss, CTL_DAYS, np.full(len(plans), current["ctl"][0]))
+        atl = ewma(tss, ATL_DAYS, np.full(len(plans), current["atl"][0]))
+        tsb = ctl - atl
+
+        return {
+            "dates": np.arange(np.datetime64(today), np.datetime64(end) + 1).astype(str).tolist(),
+            "tss_per_hour": tss_per_hour,
+            "plans": [{
+                "name": plan["name"],
+                "tss": np.round(tss[row], 1).tolist(),
+                "ctl": np.round(ctl[row], 1).tolist(),
+                "atl": np.round(atl[row], 1).tolist(),
+                "tsb": np.round(tsb[row], 1).tolist(),
+                "final": {
+                    "date": end.isoformat(),
+                    "ctl": round(float(ctl[row, -1]), 1),
+                    "atl": round(float(atl[row, -1]), 1),
+                    "tsb": round(float(tsb[row, -1]), 1)
+                },
+                "peak_ctl": round(float(ctl[row].max()), 1)
+            } for row, plan in enumerate(plans)]
+        }
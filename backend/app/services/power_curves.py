@@ -0,0 +1,284 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from app.models.activity import Activity
+from app.models.curve import ActivityCurve, CurveEnvelope
+from app.models.stream import ActivityStream
+from app.services.performance_engine import PerformanceEngine, resample, is_run, is_swim, METRICS_BATCH_SIZE
+from app.services.stream_codec import StreamCodec
+from app.services.strava_sync import to_epoch
+
+# Seconds; log-spaced so a curve is a handful of floats per activity
+DURATIONS = np.array([
+    1, 2, 3, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600,
+    900, 1200, 1800, 2700, 3600, 5400, 7200, 10800, 14400, 18000, 21600
+])
+SCOPES = ("all", "season", "90d")
+ROLLING_DAYS = 90
+
+
+def best_efforts(values: np.ndarray) -> np.ndarray:
+    """Best mean value over every duration in ``DURATIONS``, NaN where the series is shorter.
+
+    One cumsum, then each duration is a single vectorised window difference,
+    so a curve costs O(n) per duration.
+    """
+    sums = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    curve = np.full(len(DURATIONS), np.nan, dtype=np.float32)
+    for index, duration in enumerate(DURATIONS):
+        if duration > len(values):
+            break
+        curve[index] = (sums[duration:] - sums[:-duration]).max() / duration
+    return curve
+
+
+def reduce_curves(values: np.ndarray, activity_ids: np.ndarray, dates: np.ndarray):
+    """Per-duration maximum over stacked curves and which activity holds it."""
+    if not len(values):
+        empty = np.zeros(len(DURATIONS), dtype=np.int64)
+        return np.full(len(DURATIONS), np.nan, dtype=np.float32), empty, empty.copy()
+    filled = np.where(np.isnan(values), -np.inf, values)
+    best = filled.argmax(axis=0)
+    top = filled[best, np.arange(values.shape[1])]
+    found = np.isfinite(top)
+    return (
+        np.where(found, top, np.nan).astype(np.float32),
+        np.where(found, activity_ids[best], 0).astype(np.int64),
+        np.where(found, dates[best], 0).astype(np.int64)
+    )
+
+
+class CurveService:
+
+    @staticmethod
+    def period_start(scope: str, now: datetime) -> Optional[datetime]:
+        if scope == "season":
+            return datetime(now.year, 1, 1)
+        if scope == "90d":
+            return now - timedelta(days=ROLLING_DAYS)
+        return None
+
+    @staticmethod
+    def activity_curves(activity: Activity, streams: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Power curve for anything with a watts stream, speed curve for runs and swims."""
+        time = streams.get("time")
+        curves = {}
+        if streams.get("watts") is not None:
+            curves["power"] = best_efforts(resample(streams["watts"], time))
+        if is_run(activity.sport_type) and streams.get("velocity_smooth") is not None:
+            curves["speed"] = best_efforts(resample(streams["velocity_smooth"], time))
+        if is_swim(activity.sport_type) and streams.get("velocity_smooth") is not None:
+            curves["swim_speed"] = best_efforts(resample(streams["velocity_smooth"], time))
+        return curves
+
+    @staticmethod
+    def update_activity_curves(db: Session, user_id: int, activity_ids: Optional[List[int]] = None) -> int:
+        """Cache the curves of the given activities and merge them into the envelopes.
+
+        Without ``activity_ids`` every activity whose streams could give a curve
+        but that has none cached yet is processed. New curves mark the
+        snapshots dirty from their day, for the estimates computed from them.
+        """
+        query = db.query(Activity).filter(
+            Activity.user_id == user_id,
+            Activity.streams_status == "ok"
+        )
+        if activity_ids is not None:
+            query = query.filter(Activity.id.in_(activity_ids))
+        else:
+            candidates = select(ActivityStream.activity_id).join(Activity).where(
+                Activity.user_id == user_id,
+                or_(
+                    ActivityStream.stream_type == "watts",
+                    (ActivityStream.stream_type == "velocity_smooth")
+                    & (Activity.sport_type.like("%Run%") | Activity.sport_type.like("%Swim%"))
+                )
+            )
+            query = query.filter(
+                Activity.id.in_(candidates),
+                Activity.id.notin_(select(ActivityCurve.activity_id))
+            )
+
+        written = 0
+        last_id = 0
+        while True:
+            activities = query.filter(Activity.id > last_id).order_by(Activity.id).limit(METRICS_BATCH_SIZE).all()
+            if not activities:
+                break
+            last_id = activities[-1].id
+
+            streams: Dict[int, Dict[str, np.ndarray]] = {}
+            for stream in db.query(ActivityStream).filter(
+                ActivityStream.activity_id.in_([a.id for a in activities]),
+                ActivityStream.stream_type.in_(["time", "watts", "velocity_smooth"])
+            ):
+                streams.setdefault(stream.activity_id, {})[stream.stream_type] = StreamCodec.decode_stored(
+                    stream.encoding, stream.data
+                )
+
+            rows = []
+            merged: Dict[str, List[Tuple[int, datetime, np.ndarray]]] = {}
+            for activity in activities:
+                for metric, curve in CurveService.activity_curves(activity, streams.get(activity.id, {})).items():
+                    rows.append({
+                        "activity_id": activity.id,
+                        "user_id": user_id,
+                        "metric": metric,
+                        "start_date": activity.start_date,
+                        "values": curve.tobytes()
+                    })
+                    merged.setdefault(metric, []).append((activity.id, activity.start_date, curve))
+
+            db.query(ActivityCurve).filter(
+                ActivityCurve.activity_id.in_([a.id for a in activities])
+            ).delete(synchronize_session=False)
+            if rows:
+                db.execute(ActivityCurve.__table__.insert(), rows)
+            for metric, curves in merged.items():
+                CurveService.merge(db, user_id, metric, curves)
+            dates = [start for curves in merged.values() for _, start, _ in curves if start]
+            if dates:
+                PerformanceEngine.mark_dirty(db, user_id, min(dates))
+            db.commit()
+            written += len(rows)
+            for activity in activities:
+                db.expunge(activity)
+        return written
+
+    @staticmethod
+    def merge(db: Session, user_id: int, metric: str, curves: List[Tuple[int, datetime, np.ndarray]]) -> None:
+        """Fold new activity curves into the stored envelopes with an element-wise max."""
+        now = datetime.utcnow()
+        values = np.vstack([curve for _, _, curve in curves])
+        activity_ids = np.array([activity_id for activity_id, _, _ in curves], dtype=np.int64)
+        dates = np.array([to_epoch(start) if start else 0 for _, start, _ in curves], dtype=np.int64)
+
+        for scope in SCOPES:
+            envelope = CurveService.get_envelope(db, user_id, metric, scope, now)
+            start = CurveService.period_start(scope, now)
+            inside = dates >= to_epoch(start) if start else np.ones(len(dates), dtype=bool)
+            if not inside.any():
+                continue
+
+            new_values, new_ids, new_dates = reduce_curves(values[inside], activity_ids[inside], dates[inside])
+            old_values = np.frombuffer(envelope.values, dtype=np.float32)
+            better = np.nan_to_num(new_values, nan=-np.inf) > np.nan_to_num(old_values, nan=-np.inf)
+            if better.any():
+                envelope.values = np.where(better, new_values, old_values).astype(np.float32).tobytes()
+                envelope.activity_ids = np.where(
+                    better, new_ids, np.frombuffer(envelope.activity_ids, dtype=np.int64)
+                ).tobytes()
+                envelope.record_dates = np.where(
+                    better, new_dates, np.frombuffer(envelope.record_dates, dtype=np.int64)
+                ).tobytes()
+                envelope.updated_at = now
+
+    @staticmethod
+    def get_envelope(db: Session, user_id: int, metric: str, scope: str, now: datetime) -> CurveEnvelope:
+        """Stored envelope, rebuilt from the cached curves only if missing or stale.
+
+        Stale means a new season has started or a 90-day record has dropped
+        out of the window; max-merging alone can't retire old records.
+        """
+        envelope = db.query(CurveEnvelope).filter(
+            CurveEnvelope.user_id == user_id,
+            CurveEnvelope.metric == metric,
+            CurveEnvelope.scope == scope
+        ).first()
+
+        start = CurveService.period_start(scope, now)
+        stale = envelope is None
+        if envelope is not None and scope == "season":
+            stale = envelope.period_start != start
+        elif envelope is not None and scope == "90d":
+            record_dates = np.frombuffer(envelope.record_dates, dtype=np.int64)
+            values = np.frombuffer(envelope.values, dtype=np.float32)
+            stale = bool((record_dates[~np.isnan(values)] < to_epoch(start)).any())
+
+        if stale:
+            values, activity_ids, record_dates = CurveService.reduce_range(db, user_id, metric, start)
+            if envelope is None:
+                envelope = CurveEnvelope(user_id=user_id, metric=metric, scope=scope)
+                db.add(envelope)
+            envelope.period_start = start if scope == "season" else None
+            envelope.values = values.tobytes()
+            envelope.activity_ids = activity_ids.tobytes()
+            envelope.record_dates = record_dates.tobytes()
+            envelope.updated_at = now
+        return envelope
+
+    @staticmethod
+    def reduce_range(
+        db: Session,
+        user_id: int,
+        metric: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ):
+        """Max-reduce the cached curves of a date range."""
+        query = db.query(ActivityCurve.activity_id, ActivityCurve.start_date, ActivityCurve.values).filter(
+            ActivityCurve.user_id == user_id,
+            ActivityCurve.metric == metric
+        )
+        if start:
+            query = query.filter(ActivityCurve.start_date >= start)
+        if end:
+            query = query.filter(ActivityCurve.start_date < end)
+        rows = query.all()
+
+        values = np.frombuffer(b"".join(row.values for row in rows), dtype=np.float32).reshape(-1, len(DURATIONS))
+        activity_ids = np.array([row.activity_id for row in rows], dtype=np.int64)
+        dates = np.array([to_epoch(row.start_date) if row.start_date else 0 for row in rows], dtype=np.int64)
+        return reduce_curves(values, activity_ids, dates)
+
+    @staticmethod
+    def remove_activities(db: Session, user_id: int, activity_ids: List[int]) -> None:
+        """Drop cached curves and rebuild envelopes that held a record of these activities."""
+        db.query(ActivityCurve).filter(
+            ActivityCurve.activity_id.in_(activity_ids)
+        ).delete(synchronize_session=False)
+
+        removed = np.array(activity_ids, dtype=np.int64)
+        now = datetime.utcnow()
+        for envelope in db.query(CurveEnvelope).filter(CurveEnvelope.user_id == user_id):
+            if np.isin(np.frombuffer(envelope.activity_ids, dtype=np.int64), removed).any():
+                db.delete(envelope)
+                db.flush()
+                CurveService.get_envelope(db, user_id, envelope.metric, envelope.scope, now)
+
+    @staticmethod
+    def get_curve(
+        db: Session,
+        user_id: int,
+        metric: str,
+        scope: str = "all",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Curve of a stored scope, or of an arbitrary date range if ``start``/``end`` is given."""
+        if start or end:
+            values, activity_ids, dates = CurveService.reduce_range(db, user_id, metric, start, end)
+        else:
+            envelope = CurveService.get_envelope(db, user_id, metric, scope, datetime.utcnow())
+            db.commit()
+            values = np.frombuffer(envelope.values, dtype=np.float32)
+            activity_ids = np.frombuffer(envelope.activity_ids, dtype=np.int64)
+            dates = np.frombuffer(envelope.record_dates, dtype=np.int64)
+        return CurveService.to_points(metric, values, activity_ids, dates)
+
+    @staticmethod
+    def to_points(metric: str, values: np.ndarray, activity_ids=None, dates=None) -> List[Dict[str, Any]]:
+        points = []
+        for index, duration in enumerate(DURATIONS):
+            if np.isnan(values[index]):
+                continue
+            point = {"duration": int(duration), "value": round(float(values[index]), 2)}
+            if metric == "speed" and values[index] > 0:
+                point["pace"] = round(1000 / float(values[index]), 1)  # seconds per km
+            if activity_ids is not None:
+                point["activity_id"] = int(activity_ids[index])
+                point["date"] = datetime.utcfromtimestamp(int(dates[index])).isoformat()
+            points.append(point)
+        return points
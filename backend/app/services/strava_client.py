@@ -0,0 +1,238 @@
+import asyncio
+from collections import deque
+from typing import Optional, Dict, Any, List, AsyncIterator
+import httpx
+from app.core.config import settings
+from app.services.strava_rate_limiter import (
+    StravaRateLimiter, RateLimitExceeded, Priority, rate_limiter as default_rate_limiter
+)
+
+STRAVA_TOKEN_URL = "https://www.strava.com/oauth/token"
+STRAVA_API_URL = "https://www.strava.com/api/v3"
+
+
+class StravaAPIError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StravaAPIClient:
+    """Async Strava client on top of one keep-alive connection pool."""
+
+    def __init__(
+        self,
+        http: Optional[httpx.AsyncClient] = None,
+        page_concurrency: Optional[int] = None,
+        rate_limiter: Optional[StravaRateLimiter] = None
+    ):
+        self.http = http or httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.STRAVA_HTTP_TIMEOUT,
+                connect=settings.STRAVA_HTTP_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.STRAVA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.STRAVA_MAX_CONNECTIONS,
+                keepalive_expiry=60
+            )
+        )
+        self.page_concurrency = page_concurrency or settings.STRAVA_PAGE_CONCURRENCY
+        self.rate_limiter = rate_limiter or default_rate_limiter
+
+    async def __aenter__(self) -> "StravaAPIClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        try:
+            return await self.http.request(method, url, **kwargs)
+        except httpx.TimeoutException:
+            raise StravaAPIError(504, f"Strava request timed out: {url}")
+        except httpx.HTTPError as e:
+            raise StravaAPIError(502, f"Strava request failed: {e}")
+
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        res = await self._send(method, url, **kwargs)
+        if res.status_code != 200:
+            raise StravaAPIError(res.status_code, res.text)
+        return res.json()
+
+    async def _acquire(self, user_id: Optional[int], priority: Priority) -> None:
+        while True:
+            try:
+                self.rate_limiter.acquire(user_id, priority)
+                return
+            except RateLimitExceeded as e:
+                # Interactive callers get the estimate, background work waits for the next window
+                if priority == Priority.INTERACTIVE or e.retry_after > settings.STRAVA_BACKFILL_MAX_WAIT:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def _post_token(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._request("POST", STRAVA_TOKEN_URL, data={
+            "client_id": settings.STRAVA_CLIENT_ID,
+            "client_secret": settings.STRAVA_CLIENT_SECRET,
+            **payload
+        })
+
+    async def exchange_code(self, code: str) -> Dict[str, Any]:
+        """Exchange an authorization code for access and refresh tokens."""
+        return await self._post_token({"code": code, "grant_type": "authorization_code"})
+
+    async def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
+        """Trade a refresh token for a new access token."""
+        return await self._post_token({"refresh_token": refresh_token, "grant_type": "refresh_token"})
+
+    async def get(
+        self,
+        access_token: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Any:
+        """GET an API resource within the app-wide rate budget."""
+        await self._acquire(user_id, priority)
+        res = await self._send(
+            "GET",
+            f"{STRAVA_API_URL}{path}",
+            headers={"Authorization": f"Bearer {access_token}"},
+            params=params
+        )
+        self.rate_limiter.update_from_headers(res.headers)
+
+        if res.status_code == 429:
+            self.rate_limiter.mark_exhausted()
+            raise RateLimitExceeded(self.rate_limiter.retry_after("15-minute"), "15-minute")
+        if res.status_code != 200:
+            raise StravaAPIError(res.status_code, res.text)
+        return res.json()
+
+    async def get_athlete(
+        self,
+        access_token: str,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Dict[str, Any]:
+        return await self.get(access_token, "/athlete", user_id=user_id, priority=priority)
+
+    async def get_activity(
+        self,
+        access_token: str,
+        activity_id: str,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Dict[str, Any]:
+        """Fetch a single (detailed) activity."""
+        return await self.get(access_token, f"/activities/{activity_id}", user_id=user_id, priority=priority)
+
+    async def get_activity_streams(
+        self,
+        access_token: str,
+        activity_id: str,
+        keys: List[str],
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Dict[str, Any]:
+        """Fetch the recorded streams of an activity, keyed by stream type."""
+        params = {"keys": ",".join(keys), "key_by_type": "true"}
+        return await self.get(access_token, f"/activities/{activity_id}/streams", params, user_id, priority)
+
+    async def get_activities(
+        self,
+        access_token: str,
+        page: int = 1,
+        per_page: int = 100,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        """Fetch one page of the athlete's summary activities."""
+        params = {"per_page": per_page, "page": page}
+        if after is not None:
+            params["after"] = after
+        if before is not None:
+            params["before"] = before
+        return await self.get(access_token, "/athlete/activities", params, user_id, priority)
+
+    async def iter_activity_pages(
+        self,
+        access_token: str,
+        per_page: int = 100,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        stats: Optional[Dict[str, int]] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield activity pages in order while the next pages are already in flight.
+
+        Only page 1 is requested up front, so a routine sync costs a single
+        request. Once a full page comes back up to ``page_concurrency`` pages are
+        kept in flight and the caller can write page N while N+1 is on the wire.
+        Outstanding requests are cancelled as soon as a short page marks the end.
+        ``stats["requests"]`` counts requests that were actually sent.
+        """
+        if stats is not None:
+            stats.setdefault("requests", 0)
+
+        async def fetch(page: int) -> List[Dict[str, Any]]:
+            if stats is not None:
+                stats["requests"] += 1
+            return await self.get_activities(access_token, page, per_page, after, before, user_id, priority)
+
+        pending = deque()
+        next_page = 1
+
+        def schedule(window: int) -> None:
+            nonlocal next_page
+            while len(pending) < window and (max_pages is None or next_page <= max_pages):
+                pending.append(asyncio.ensure_future(fetch(next_page)))
+                next_page += 1
+
+        schedule(1)
+        try:
+            while pending:
+                data = await pending.popleft()
+                if not data:
+                    break
+                # A short page is the last one
+                if len(data) < per_page:
+                    yield data
+                    break
+                # Refill the window before handing the page out, so the next
+                # requests run while the caller is writing this one
+                schedule(self.page_concurrency)
+                yield data
+        finally:
+            for task in pending:
+                if not task.cancel():
+                    # Already finished, retrieve a possible error so it isn't logged as lost
+                    task.exception()
+
+
+_client: Optional[StravaAPIClient] = None
+
+
+def get_strava_client() -> StravaAPIClient:
+    """Process-wide client so all requests share one connection pool."""
+    global _client
+    if _client is None:
+        _client = StravaAPIClient()
+    return _client
+
+
+async def close_strava_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
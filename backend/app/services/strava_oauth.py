@@ -1,11 +1,12 @@
-import requests
 from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 from app.core.encryption import encrypt_token, decrypt_token
 from app.models.oauth import OAuthConnection
+from app.services.strava_client import get_strava_client, StravaAPIError
 
 class StravaOAuthService:
     AUTHORIZE_URL = "https://www.strava.com/oauth/authorize"
@@ -26,20 +27,13 @@ class StravaOAuthService:
         )
     
     @staticmethod
-    def exchange_code_for_token(db: Session, user_id: int, code: str) -> dict:
-        payload = {
-            "client_id": settings.STRAVA_CLIENT_ID,
-            "client_secret": settings.STRAVA_CLIENT_SECRET,
-            "code": code,
-            "grant_type": "authorization_code"
-        }
-        
-        response = requests.post(StravaOAuthService.TOKEN_URL, data=payload)
-        if response.status_code != 200:
+    async def exchange_code_for_token(db: Session, user_id: int, code: str) -> dict:
+        try:
+            data = await get_strava_client().exchange_code(code)
+        except StravaAPIError:
             raise HTTPException(status_code=400, detail="Failed to exchange Strava token")
             
-        data = response.json()
-        StravaOAuthService._save_connection(db, user_id, data)
+        await run_in_threadpool(StravaOAuthService._save_connection, db, user_id, data)
         return {"status": "success", "athlete": data.get("athlete")}
         
     @staticmethod
@@ -60,15 +54,16 @@ class StravaOAuthService:
         connection.access_token = encrypt_token(access_token)
         connection.refresh_token = encrypt_token(refresh_token)
         connection.expires_at = expires_at
+        # Only the authorization response carries the athlete
+        if data.get("athlete"):
+            connection.provider_user_id = str(data["athlete"]["id"])
         
         db.commit()
 
     @staticmethod
-    def get_valid_access_token(db: Session, user_id: int) -> Optional[str]:
-        connection = db.query(OAuthConnection).filter(
-            OAuthConnection.user_id == user_id, 
-            OAuthConnection.provider == "strava"
-        ).first()
+    async def get_valid_access_token(db: Session, user_id: int) -> Optional[str]:
+        # Session calls block, keep them off the event loop around the awaited refresh
+        connection = await run_in_threadpool(StravaOAuthService._get_connection, db, user_id)
         
         if not connection:
             return None
@@ -79,17 +74,37 @@ class StravaOAuthService:
                 return None
             
             # Refresh token
-            payload = {
-                "client_id": settings.STRAVA_CLIENT_ID,
-                "client_secret": settings.STRAVA_CLIENT_SECRET,
-                "grant_type": "refresh_token",
-                "refresh_token": decrypt_token(connection.refresh_token)
-            }
-            res = requests.post(StravaOAuthService.TOKEN_URL, data=payload)
-            if res.status_code == 200:
-                data = res.json()
-                StravaOAuthService._save_connection(db, user_id, data)
-                return data.get("access_token")
-            return None
+            try:
+                data = await get_strava_client().refresh_token(decrypt_token(connection.refresh_token))
+            except StravaAPIError:
+                return None
+            await run_in_threadpool(StravaOAuthService._save_connection, db, user_id, data)
+            return data.get("access_token")
             
         return decrypt_token(connection.access_token)
+
+    @staticmethod
+    async def is_revoked(db: Session, user_id: int) -> bool:
+        """Ask Strava whether the user revoked our access.
+
+        A refresh with a revoked grant is refused (400/401); a working one
+        stores the new tokens. Other errors are raised, nothing is confirmed.
+        """
+        connection = await run_in_threadpool(StravaOAuthService._get_connection, db, user_id)
+        if not connection or not connection.refresh_token:
+            return False
+        try:
+            data = await get_strava_client().refresh_token(decrypt_token(connection.refresh_token))
+        except StravaAPIError as e:
+            if e.status_code in (400, 401):
+                return True
+            raise
+        await run_in_threadpool(StravaOAuthService._save_connection, db, user_id, data)
+        return False
+
+    @staticmethod
+    def _get_connection(db: Session, user_id: int) -> Optional[OAuthConnection]:
+        return db.query(OAuthConnection).filter(
+            OAuthConnection.user_id == user_id, 
+            OAuthConnection.provider == "strava"
+        ).first()
@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+from enum import IntEnum
+from typing import Callable, Dict, Optional, Mapping, Tuple
+from app.core.config import settings
+
+SHORT_WINDOW = 15 * 60
+DAILY_WINDOW = 24 * 60 * 60
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKFILL = 1
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float, scope: str):
+        super().__init__(f"Strava {scope} rate limit reached, retry in {math.ceil(retry_after)}s")
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+class StravaRateLimiter:
+    """App-wide budget for Strava's 15-minute and daily request limits.
+
+    Strava counts every request of the application against two fixed windows
+    (quarter hours and UTC days), so both are modelled as token buckets that
+    refill at the window boundary. The usage headers of each response correct
+    the local count, since other processes spend the same budget.
+
+    Interactive requests may use the whole bucket, backfills leave a reserve
+    for them. Within a 15-minute window every user running a backfill gets an
+    equal share of the backfill budget; usage is counted per user and
+    priority, so interactive requests neither count against that share nor
+    are limited by it. ``clock`` returns Unix seconds and can be replaced by a
+    simulated clock.
+    """
+
+    def __init__(
+        self,
+        short_limit: Optional[int] = None,
+        daily_limit: Optional[int] = None,
+        interactive_reserve: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.short_limit = short_limit or settings.STRAVA_RATE_LIMIT_15MIN
+        self.daily_limit = daily_limit or settings.STRAVA_RATE_LIMIT_DAILY
+        self.interactive_reserve = (
+            settings.STRAVA_INTERACTIVE_RESERVE if interactive_reserve is None else interactive_reserve
+        )
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._short_window = None
+        self._day = None
+        self.short_used = 0
+        self.daily_used = 0
+        self._usage: Dict[Tuple[Optional[int], Priority], int] = {}
+
+    def _roll(self, now: float) -> None:
+        short_window = int(now // SHORT_WINDOW)
+        day = int(now // DAILY_WINDOW)
+        if short_window != self._short_window:
+            self._short_window = short_window
+            self.short_used = 0
+            self._usage = {}
+        if day != self._day:
+            self._day = day
+            self.daily_used = 0
+
+    def _reserve(self, limit: int, priority: Priority) -> int:
+        if priority == Priority.INTERACTIVE:
+            return 0
+        return math.ceil(limit * self.interactive_reserve)
+
+    def retry_after(self, scope: str) -> float:
+        now = self.clock()
+        window = DAILY_WINDOW if scope == "daily" else SHORT_WINDOW
+        return (now // window + 1) * window - now
+
+    def _check(self, user_id: Optional[int], priority: Priority) -> Optional[str]:
+        """Name of the exhausted scope, or None if the request may go out."""
+        if self.daily_used >= self.daily_limit - self._reserve(self.daily_limit, priority):
+            return "daily"
+
+        short_budget = self.short_limit - self._reserve(self.short_limit, priority)
+        if self.short_used >= short_budget:
+            return "15-minute"
+
+        if priority == Priority.BACKFILL:
+            backfill_users = {user for user, user_priority in self._usage if user_priority == priority} | {user_id}
+            if len(backfill_users) > 1:
+                fair_share = max(1, short_budget // len(backfill_users))
+                if self._usage.get((user_id, priority), 0) >= fair_share:
+                    return "per-user 15-minute"
+        return None
+
+    def acquire(self, user_id: Optional[int], priority: Priority = Priority.INTERACTIVE) -> None:
+        """Take one request from the budget or raise RateLimitExceeded."""
+        with self._lock:
+            self._roll(self.clock())
+            scope = self._check(user_id, priority)
+            if scope:
+                raise RateLimitExceeded(self.retry_after("daily" if scope == "daily" else "15-minute"), scope)
+            self.short_used += 1
+            self.daily_used += 1
+            key = (user_id, Priority(priority))
+            self._usage[key] = self._usage.get(key, 0) + 1
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Take over limits and usage reported by Strava (``X-RateLimit-*``)."""
+        limit = _parse_pair(headers.get("X-RateLimit-Limit"))
+        usage = _parse_pair(headers.get("X-RateLimit-Usage"))
+        with self._lock:
+            self._roll(self.clock())
+            if limit:
+                self.short_limit, self.daily_limit = limit
+            if usage:
+                # Local counts may already include requests still in flight
+                self.short_used = max(self.short_used, usage[0])
+                self.daily_used = max(self.daily_used, usage[1])
+
+    def mark_exhausted(self) -> None:
+        """Strava answered 429, treat the current 15-minute window as used up."""
+        with self._lock:
+            self._roll(self.clock())
+            self.short_used = max(self.short_used, self.short_limit)
+
+    def status(self) -> Dict[str, float]:
+        with self._lock:
+            self._roll(self.clock())
+            return {
+                "short_limit": self.short_limit,
+                "short_used": self.short_used,
+                "short_resets_in": self.retry_after("15-minute"),
+                "daily_limit": self.daily_limit,
+                "daily_used": self.daily_used,
+                "daily_resets_in": self.retry_after("daily"),
+                "active_users": len({user for user, _ in self._usage})
+            }
+
+
+def _parse_pair(value: Optional[str]):
+    """'600,30000' -> (600, 30000)"""
+    if not value:
+        return None
+    try:
+        short, daily = (int(part) for part in value.split(","))
+    except ValueError:
+        return None
+    return short, daily
+
+
+rate_limiter = StravaRateLimiter()
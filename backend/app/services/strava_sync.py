@@ -0,0 +1,218 @@
+import calendar
+from datetime import datetime
+from typing import Callable, Dict, Any, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models.activity import Activity
+from app.models.oauth import OAuthConnection
+from app.models.sync import StravaSyncState
+from app.services.activity_ingest import ActivityIngestService
+from app.services.strava_client import get_strava_client, StravaAPIError
+from app.services.strava_oauth import StravaOAuthService
+from app.services.strava_rate_limiter import RateLimitExceeded, Priority
+
+
+# Older history than this is left to the backfill
+MAX_SYNC_PAGES = 10
+BACKFILL_PAGE_SIZE = 200  # Strava's maximum
+
+
+def to_epoch(dt: datetime) -> int:
+    """Unix timestamp for a UTC datetime (naive values are treated as UTC)."""
+    return calendar.timegm(dt.utctimetuple())
+
+
+class StravaSyncService:
+
+    @staticmethod
+    def get_state(db: Session, user_id: int) -> StravaSyncState:
+        state = db.query(StravaSyncState).filter(
+            StravaSyncState.user_id == user_id
+        ).first()
+
+        if not state:
+            # Seed the watermark from what is already stored so existing users
+            # don't re-download their whole history on the first incremental sync
+            latest = db.query(func.max(Activity.start_date)).filter(
+                Activity.user_id == user_id
+            ).scalar()
+            state = StravaSyncState(user_id=user_id, latest_activity_at=latest)
+            db.add(state)
+            db.commit()
+        return state
+
+    @staticmethod
+    async def _ensure_athlete_id(db: Session, user_id: int, access_token: str, priority: Priority) -> None:
+        """Connections made before webhooks existed don't know their athlete id yet."""
+        connection = db.query(OAuthConnection).filter(
+            OAuthConnection.user_id == user_id,
+            OAuthConnection.provider == "strava"
+        ).first()
+        if connection and not connection.provider_user_id:
+            athlete = await get_strava_client().get_athlete(access_token, user_id=user_id, priority=priority)
+            connection.provider_user_id = str(athlete["id"])
+            await run_in_threadpool(db.commit)
+
+    @staticmethod
+    async def sync_user(
+        db: Session,
+        user_id: int,
+        full: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Fetch activities newer than the user's watermark and write them page by page.
+
+        ``progress`` is called (in the threadpool) after every written page with
+        the running totals.
+        """
+        access_token = await StravaOAuthService.get_valid_access_token(db, user_id)
+        if not access_token:
+            raise StravaAPIError(400, "No Strava connection")
+
+        state = await run_in_threadpool(StravaSyncService.get_state, db, user_id)
+        await StravaSyncService._ensure_athlete_id(db, user_id, access_token, priority)
+
+        per_page = 100
+        window_end = datetime.utcnow()
+        after = None
+        if state.latest_activity_at and not full:
+            after = to_epoch(state.latest_activity_at)
+
+        result = {
+            "total_activities": 0,
+            "new_activities": 0,
+            "pages_fetched": 0,
+            "requests": 0,
+            "incremental": after is not None,
+            "has_more": False
+        }
+        latest_activity_at = state.latest_activity_at
+
+        def write_page(data):
+            nonlocal latest_activity_at
+            written = ActivityIngestService.ingest_page(db, user_id, data)
+            result["total_activities"] += len(data)
+            result["new_activities"] += written["inserted"]
+            result["pages_fetched"] += 1
+            # Stopped by the page cap rather than by a short page
+            result["has_more"] = result["pages_fetched"] == MAX_SYNC_PAGES and len(data) == per_page
+
+            for act in data:
+                start_date = ActivityIngestService.parse_start_date(act)
+                if start_date and (not latest_activity_at or start_date > latest_activity_at):
+                    latest_activity_at = start_date
+            # Incremental pages come oldest first, so everything up to the newest
+            # written activity is complete and an aborted sync continues from there
+            if after is not None:
+                state.latest_activity_at = latest_activity_at
+                db.commit()
+            if progress:
+                progress(result)
+
+        try:
+            # Write each page while the next ones are fetched
+            async for data in get_strava_client().iter_activity_pages(
+                access_token,
+                per_page=per_page,
+                after=after,
+                before=to_epoch(window_end),
+                max_pages=MAX_SYNC_PAGES,
+                stats=result,
+                user_id=user_id,
+                priority=priority
+            ):
+                await run_in_threadpool(write_page, data)
+        except RateLimitExceeded:
+            if progress:
+                await run_in_threadpool(progress, result)
+            raise
+
+        state.latest_activity_at = latest_activity_at
+        state.last_synced_at = window_end
+        await run_in_threadpool(db.commit)
+
+        result["latest_activity_at"] = latest_activity_at.isoformat() if latest_activity_at else None
+        return result
+
+    @staticmethod
+    async def backfill_user(
+        db: Session,
+        user_id: int,
+        restart: bool = False,
+        priority: Priority = Priority.BACKFILL,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Walk the user's history backwards below the checkpoint, without a page cap.
+
+        Pages are requested newest first with a fixed ``before`` anchor and
+        written as they arrive; after each page the checkpoint moves to the
+        oldest activity written, so an interrupted run resumes there. Only the
+        pages in flight are held in memory. ``restart`` starts again from now.
+        """
+        access_token = await StravaOAuthService.get_valid_access_token(db, user_id)
+        if not access_token:
+            raise StravaAPIError(400, "No Strava connection")
+
+        state = await run_in_threadpool(StravaSyncService.get_state, db, user_id)
+
+        def anchor() -> Optional[datetime]:
+            if restart:
+                return None
+            if state.backfill_before:
+                return state.backfill_before
+            # The regular sync already holds the newest activities
+            return db.query(func.min(Activity.start_date)).filter(
+                Activity.user_id == user_id
+            ).scalar()
+
+        before = await run_in_threadpool(anchor)
+        if restart:
+            state.backfill_completed_at = None
+
+        result = {
+            "total_activities": 0,
+            "new_activities": 0,
+            "pages_fetched": 0,
+            "requests": 0,
+            "backfill_before": None
+        }
+
+        def write_page(data):
+            written = ActivityIngestService.ingest_page(db, user_id, data)
+            result["total_activities"] += len(data)
+            result["new_activities"] += written["inserted"]
+            result["pages_fetched"] += 1
+
+            oldest = min(
+                (d for d in map(ActivityIngestService.parse_start_date, data) if d),
+                default=None
+            )
+            if oldest and (not state.backfill_before or restart or oldest < state.backfill_before):
+                state.backfill_before = oldest
+            db.commit()
+            if progress:
+                progress(result)
+
+        try:
+            async for data in get_strava_client().iter_activity_pages(
+                access_token,
+                per_page=BACKFILL_PAGE_SIZE,
+                before=to_epoch(before) if before else None,
+                stats=result,
+                user_id=user_id,
+                priority=priority
+            ):
+                await run_in_threadpool(write_page, data)
+                restart = False
+        except RateLimitExceeded:
+            if progress:
+                await run_in_threadpool(progress, result)
+            raise
+
+        state.backfill_completed_at = datetime.utcnow()
+        await run_in_threadpool(db.commit)
+
+        result["backfill_before"] = state.backfill_before.isoformat() if state.backfill_before else None
+        return result
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.activity import Activity
+from app.models.oauth import OAuthConnection
+from app.models.stream import ActivityStream
+from app.models.webhook import StravaWebhookEvent
+from app.services.activity_ingest import ActivityIngestService
+from app.services.performance_engine import PerformanceEngine
+from app.services.performance_snapshots import SnapshotService
+from app.services.power_curves import CurveService
+from app.services.strava_client import get_strava_client, StravaAPIError
+from app.services.strava_oauth import StravaOAuthService
+from app.services.strava_rate_limiter import RateLimitExceeded, Priority
+from app.services.sync_jobs import SyncJobService
+from app.services.volume_stats import VolumeService
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("object_type", "object_id", "aspect_type", "owner_id")
+
+
+class StravaWebhookService:
+    """Receives Strava push events and applies them through the ingest path.
+
+    The HTTP handler only validates and appends to an in-memory buffer, so
+    Strava gets its 200 immediately. A flusher writes the buffer to
+    ``strava_webhook_events`` in one multi-row insert every
+    ``STRAVA_WEBHOOK_FLUSH_INTERVAL`` seconds (or when it is full) and a
+    processor applies pending rows in batches: deletes in one statement,
+    title changes in place, and new/retyped activities fetched concurrently
+    at background priority and upserted page-wise.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.flush_interval = settings.STRAVA_WEBHOOK_FLUSH_INTERVAL
+        self.batch_size = settings.STRAVA_WEBHOOK_BATCH_SIZE
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_now: Optional[asyncio.Event] = None
+        self._pending: Optional[asyncio.Event] = None
+        self._tasks = []
+        self.counters = {"received": 0, "rejected": 0, "persisted": 0, "processed": 0, "failed": 0}
+
+    @staticmethod
+    def verify_subscription(mode: str, verify_token: str, challenge: str) -> Optional[Dict[str, str]]:
+        """Answer to Strava's subscription validation request, None if it isn't ours."""
+        if mode != "subscribe" or not settings.STRAVA_WEBHOOK_VERIFY_TOKEN:
+            return None
+        if verify_token != settings.STRAVA_WEBHOOK_VERIFY_TOKEN:
+            return None
+        return {"hub.challenge": challenge}
+
+    def receive(self, event: Dict[str, Any]) -> bool:
+        """Validate and buffer one event. Never touches the database."""
+        if any(event.get(field) in (None, "") for field in REQUIRED_FIELDS):
+            self.counters["rejected"] += 1
+            return False
+        # Strava doesn't sign events, the subscription id is the only proof one comes from it
+        subscription_id = settings.STRAVA_WEBHOOK_SUBSCRIPTION_ID
+        if not subscription_id or str(event.get("subscription_id")) != subscription_id:
+            self.counters["rejected"] += 1
+            return False
+
+        self._buffer.append({
+            "object_type": str(event["object_type"]),
+            "object_id": str(event["object_id"]),
+            "aspect_type": str(event["aspect_type"]),
+            "owner_id": str(event["owner_id"]),
+            "updates": json.dumps(event.get("updates") or {}),
+            "event_time": event.get("event_time"),
+            "status": "pending",
+            "received_at": datetime.utcnow()
+        })
+        self.counters["received"] += 1
+        if len(self._buffer) >= self.batch_size and self._flush_now:
+            self._flush_now.set()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "buffered": len(self._buffer)}
+
+    async def start(self) -> None:
+        self._flush_now = asyncio.Event()
+        self._pending = asyncio.Event()
+        # Leftovers from the last run
+        self._pending.set()
+        self._tasks = [
+            asyncio.create_task(self._flush_loop()),
+            asyncio.create_task(self._process_loop())
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Persisting webhook events failed")
+
+    async def flush(self) -> int:
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        try:
+            await run_in_threadpool(self._persist, rows)
+        except Exception:
+            # Keep them for the next attempt
+            self._buffer = rows + self._buffer
+            raise
+        self.counters["persisted"] += len(rows)
+        if self._pending:
+            self._pending.set()
+        return len(rows)
+
+    def _persist(self, rows: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(StravaWebhookEvent.__table__.insert(), rows)
+            db.commit()
+        finally:
+            db.close()
+
+    async def _process_loop(self) -> None:
+        while True:
+            await self._pending.wait()
+            self._pending.clear()
+            try:
+                while await self.process_batch():
+                    pass
+            except RateLimitExceeded as e:
+                # Events stay pending, try again once the window has refilled
+                await asyncio.sleep(e.retry_after)
+                self._pending.set()
+            except Exception:
+                logger.exception("Processing webhook events failed")
+
+    async def process_batch(self) -> int:
+        """Apply up to ``batch_size`` pending events, returns how many were handled."""
+        db = self.session_factory()
+        try:
+            events = await run_in_threadpool(
+                lambda: db.query(StravaWebhookEvent).filter(
+                    StravaWebhookEvent.status == "pending"
+                ).order_by(StravaWebhookEvent.id).limit(self.batch_size).all()
+            )
+            if not events:
+                return 0
+
+            try:
+                await self._apply(db, events)
+            except RateLimitExceeded:
+                raise
+            except Exception:
+                # One malformed event must not keep the whole batch pending forever
+                logger.exception("Webhook batch failed, applying its events one by one")
+                await run_in_threadpool(db.rollback)
+                await self._apply_each(db, [event.id for event in events])
+            else:
+                await run_in_threadpool(self._finish, db, events)
+            self.counters["processed"] += len(events)
+            return len(events)
+        finally:
+            db.close()
+
+    async def _apply_each(self, db: Session, event_ids: List[int]) -> None:
+        """Apply events separately; one that fails is marked ``failed`` with its error."""
+        for event_id in event_ids:
+            event = await run_in_threadpool(db.get, StravaWebhookEvent, event_id)
+            try:
+                await self._apply(db, [event])
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                await run_in_threadpool(db.rollback)
+                event = await run_in_threadpool(db.get, StravaWebhookEvent, event_id)
+                await run_in_threadpool(self._finish, db, [event], "failed", repr(e))
+                self.counters["failed"] += 1
+            else:
+                await run_in_threadpool(self._finish, db, [event])
+
+    @staticmethod
+    def _finish(db: Session, events: List[StravaWebhookEvent], status: str = "done", error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        for event in events:
+            # Events already settled by _apply (ignored) keep their status
+            if event.status == "pending":
+                event.status = status
+                event.error = error
+            event.processed_at = now
+        db.commit()
+
+    async def _apply(self, db: Session, events: List[StravaWebhookEvent]) -> None:
+        owners = {event.owner_id for event in events}
+        user_by_owner = dict(await run_in_threadpool(
+            lambda: db.query(OAuthConnection.provider_user_id, OAuthConnection.user_id).filter(
+                OAuthConnection.provider == "strava",
+                OAuthConnection.provider_user_id.in_(owners)
+            ).all()
+        ))
+
+        # Collapse to one action per activity: a delete wins, then anything that needs a fetch
+        actions: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            user_id = user_by_owner.get(event.owner_id)
+            if user_id is None:
+                event.status = "ignored"
+                continue
+
+            if event.object_type == "athlete":
+                updates = json.loads(event.updates or "{}")
+                # Events aren't signed, only drop the connection once Strava refuses it
+                if str(updates.get("authorized")).lower() == "false" and await StravaOAuthService.is_revoked(db, user_id):
+                    await run_in_threadpool(self._deauthorize, db, user_id)
+                continue
+
+            action = actions.setdefault(event.object_id, {"user_id": user_id, "fetch": False, "delete": False, "title": None})
+            updates = json.loads(event.updates or "{}")
+            if event.aspect_type == "delete":
+                action["delete"] = True
+            elif event.aspect_type == "create" or "type" in updates or "sport_type" in updates:
+                action["fetch"] = True
+            elif "title" in updates:
+                action["title"] = updates["title"]
+
+        deletes = [object_id for object_id, action in actions.items() if action["delete"]]
+        if deletes:
+            await run_in_threadpool(self._delete, db, deletes, actions)
+
+        live = {object_id: action for object_id, action in actions.items() if not action["delete"]}
+        known = set(await run_in_threadpool(
+            lambda: db.query(Activity.user_id, Activity.strava_id).filter(
+                Activity.user_id.in_({action["user_id"] for action in live.values()}),
+                Activity.strava_id.in_(list(live))
+            ).all()
+        )) if live else set()
+
+        to_fetch = defaultdict(list)
+        renames = {}
+        for object_id, action in live.items():
+            # An update for an activity we never stored is as good as a create
+            if action["fetch"] or (action["user_id"], object_id) not in known:
+                to_fetch[action["user_id"]].append(object_id)
+            elif action["title"] is not None:
+                renames[object_id] = action["title"]
+
+        if renames:
+            await run_in_threadpool(self._rename, db, renames, actions)
+        changed = {actions[object_id]["user_id"] for object_id in deletes}
+        for user_id, object_ids in to_fetch.items():
+            if await self._fetch_and_ingest(db, user_id, object_ids):
+                changed.add(user_id)
+        for user_id in changed:
+            await run_in_threadpool(SnapshotService.refresh, db, user_id)
+
+    def _deauthorize(self, db: Session, user_id: int) -> None:
+        db.query(OAuthConnection).filter(
+            OAuthConnection.user_id == user_id,
+            OAuthConnection.provider == "strava"
+        ).delete(synchronize_session=False)
+
+    def _delete(self, db: Session, object_ids: List[str], actions: Dict[str, Dict[str, Any]]) -> None:
+        by_user = defaultdict(list)
+        for object_id in object_ids:
+            by_user[actions[object_id]["user_id"]].append(object_id)
+        for user_id, ids in by_user.items():
+            removed = db.query(Activity.id, Activity.start_date, Activity.local_date).filter(
+                Activity.user_id == user_id,
+                Activity.strava_id.in_(ids)
+            ).all()
+            if removed:
+                CurveService.remove_activities(db, user_id, [activity_id for activity_id, _, _ in removed])
+                dates = [start_date for _, start_date, _ in removed if start_date]
+                if dates:
+                    PerformanceEngine.mark_dirty(db, user_id, min(dates))
+            # Not left to ON DELETE CASCADE, SQLite doesn't enforce it by default
+            db.query(ActivityStream).filter(ActivityStream.activity_id.in_(
+                select(Activity.id).where(Activity.user_id == user_id, Activity.strava_id.in_(ids))
+            )).delete(synchronize_session=False)
+            db.query(Activity).filter(
+                Activity.user_id == user_id,
+                Activity.strava_id.in_(ids)
+            ).delete(synchronize_session=False)
+            VolumeService.update_rollups(db, user_id, [local_date for _, _, local_date in removed])
+
+    def _rename(self, db: Session, renames: Dict[str, str], actions: Dict[str, Dict[str, Any]]) -> None:
+        for strava_id, title in renames.items():
+            db.query(Activity).filter(
+                Activity.user_id == actions[strava_id]["user_id"],
+                Activity.strava_id == strava_id
+            ).update(
+                {"name": title}, synchronize_session=False
+            )
+
+    async def _fetch_and_ingest(self, db: Session, user_id: int, object_ids: List[str]) -> bool:
+        """Fetch and upsert the given activities, True if new ones were stored."""
+        access_token = await StravaOAuthService.get_valid_access_token(db, user_id)
+        if not access_token:
+            return False
+
+        client = get_strava_client()
+        semaphore = asyncio.Semaphore(client.page_concurrency)
+
+        async def fetch(object_id: str):
+            async with semaphore:
+                return await client.get_activity(access_token, object_id, user_id=user_id, priority=Priority.BACKFILL)
+
+        results = await asyncio.gather(*(fetch(object_id) for object_id in object_ids), return_exceptions=True)
+
+        activities = []
+        for result in results:
+            if isinstance(result, RateLimitExceeded):
+                # Roll back to leave the whole batch pending
+                await run_in_threadpool(db.rollback)
+                raise result
+            if isinstance(result, StravaAPIError):
+                # Gone or private by now, nothing to ingest
+                continue
+            if isinstance(result, Exception):
+                raise result
+            activities.append(result)
+
+        if activities:
+            previous = await run_in_threadpool(
+                lambda: db.query(Activity.id, Activity.start_date).filter(
+                    Activity.user_id == user_id,
+                    Activity.strava_id.in_([str(activity.get("id")) for activity in activities])
+                ).all()
+            )
+            written = await run_in_threadpool(
+                ActivityIngestService.ingest_page, db, user_id, activities, True
+            )
+            if previous:
+                await run_in_threadpool(self._rerate, db, user_id, previous, activities)
+            if written["inserted"]:
+                await run_in_threadpool(PerformanceEngine.update_activity_loads, db, user_id, None, True)
+                await run_in_threadpool(SyncJobService.enqueue_streams, db, user_id)
+            return bool(written["inserted"] or written["updated"])
+        return False
+
+    def _rerate(
+        self,
+        db: Session,
+        user_id: int,
+        previous: List[Tuple[int, Optional[datetime]]],
+        activities: List[Dict[str, Any]]
+    ) -> None:
+        """Re-rate updated activities (a new type changes TSS and sport group) and
+        mark the snapshots dirty from the earliest of their old and new dates."""
+        PerformanceEngine.update_activity_loads(db, user_id, [activity_id for activity_id, _ in previous])
+        dates = [start_date for _, start_date in previous if start_date] + [
+            start_date for start_date in map(ActivityIngestService.parse_start_date, activities) if start_date
+        ]
+        if dates:
+            PerformanceEngine.mark_dirty(db, user_id, min(dates))
+            db.commit()
+
+
+webhook_service = StravaWebhookService()
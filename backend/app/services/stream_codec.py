@@ -0,0 +1,149 @@
+import json
+import struct
+import zlib
+from typing import Any, List, Optional
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is always available
+    zstandard = None
+
+MAGIC = b"SC"
+VERSION = 1
+# magic, version, kind, compression, decimals, width, count
+HEADER = struct.Struct("<2sBBBBBI")
+
+KIND_VARINT = 0  # (scaled) integers, delta + zigzag + varint per column
+KIND_FLOAT32 = 1  # anything finer than MAX_DECIMALS or with gaps (NaN)
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSIONS = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+
+# Strava sends at most 6 decimals (latlng), most streams have 0-3
+MAX_DECIMALS = 6
+
+
+def _decimals(values: np.ndarray) -> Optional[int]:
+    """Smallest number of decimals that represents every value exactly, None if there is none."""
+    if not np.isfinite(values).all():
+        return None
+    for decimals in range(MAX_DECIMALS + 1):
+        scaled = values * 10 ** decimals
+        if np.abs(scaled - np.round(scaled)).max(initial=0) < 1e-4 and np.abs(scaled).max(initial=0) < 2 ** 62:
+            return decimals
+    return None
+
+
+def _varint_encode(values: np.ndarray) -> bytes:
+    """LEB128 for an unsigned 64-bit array, vectorised per byte position."""
+    lengths = np.ones(len(values), dtype=np.int64)
+    for position in range(1, 10):
+        lengths += values >= (np.uint64(1) << np.uint64(7 * position))
+
+    offsets = np.cumsum(lengths) - lengths
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for position in range(int(lengths.max(initial=0))):
+        selected = lengths > position
+        chunk = (values[selected] >> np.uint64(7 * position)) & np.uint64(0x7F)
+        more = (lengths[selected] > position + 1).astype(np.uint64) << np.uint64(7)
+        out[offsets[selected] + position] = (chunk | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def _varint_decode(buffer: np.ndarray) -> np.ndarray:
+    """Inverse of ``_varint_encode`` without a Python-level loop over values."""
+    if not len(buffer):
+        return np.zeros(0, dtype=np.uint64)
+    ends = (buffer & 0x80) == 0
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    value_index = np.cumsum(ends) - ends
+    position = np.arange(len(buffer)) - starts[value_index]
+    parts = (buffer & 0x7F).astype(np.uint64) << (np.uint64(7) * position.astype(np.uint64))
+    return np.add.reduceat(parts, starts)
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+class StreamCodec:
+    """Compact binary encoding for one activity stream.
+
+    Integer and fixed-decimal streams (time, heartrate, watts, distance,
+    latlng, ...) are scaled to integers, delta encoded per column and stored
+    as zigzag varints, which is lossless and needs 1-2 bytes per sample for
+    smooth sensor data. Anything else is stored as little-endian float32.
+    Multi-component streams (latlng) are stored column by column. The payload
+    can be compressed with zlib or zstd (if ``zstandard`` is installed).
+    """
+
+    @staticmethod
+    def encode(data: List[Any], compression: str = "zlib") -> bytes:
+        values = np.asarray(data, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, np.newaxis]
+        count, width = values.shape
+
+        decimals = _decimals(values)
+        if decimals is not None:
+            kind = KIND_VARINT
+            scaled = np.round(values * 10 ** decimals).astype(np.int64)
+            # Column-wise deltas, the first row is stored as is
+            deltas = np.diff(scaled.T, axis=1, prepend=0)
+            payload = _varint_encode(_zigzag(deltas.ravel()))
+        else:
+            kind, decimals = KIND_FLOAT32, 0
+            payload = np.ascontiguousarray(values.T, dtype="<f4").tobytes()
+
+        method = COMPRESSIONS[compression]
+        if method == COMPRESSION_ZSTD and zstandard is None:
+            method = COMPRESSION_ZLIB
+        if method == COMPRESSION_ZLIB:
+            payload = zlib.compress(payload, 6)
+        elif method == COMPRESSION_ZSTD:
+            payload = zstandard.ZstdCompressor(level=3).compress(payload)
+
+        return HEADER.pack(MAGIC, VERSION, kind, method, decimals, width, count) + payload
+
+    @staticmethod
+    def decode(blob: bytes) -> np.ndarray:
+        """Decode into a NumPy array, shape (n,) or (n, width) for latlng.
+
+        Integer streams come back as int64, fixed-decimal ones as float64 and
+        float32 streams as a read-only view on the (decompressed) buffer.
+        """
+        magic, version, kind, method, decimals, width, count = HEADER.unpack_from(blob)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a stream codec blob")
+
+        payload = memoryview(blob)[HEADER.size:]
+        if method == COMPRESSION_ZLIB:
+            payload = zlib.decompress(payload)
+        elif method == COMPRESSION_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to decode this stream")
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+
+        if kind == KIND_FLOAT32:
+            columns = np.frombuffer(payload, dtype="<f4").reshape(width, count)
+        else:
+            deltas = _unzigzag(_varint_decode(np.frombuffer(payload, dtype=np.uint8)))
+            columns = np.cumsum(deltas.reshape(width, count), axis=1)
+            if decimals:
+                columns = columns / 10 ** decimals
+
+        return columns[0] if width == 1 else columns.T
+
+    @staticmethod
+    def decode_stored(encoding: str, blob: bytes) -> np.ndarray:
+        """Decode an ``activity_streams`` payload, including rows stored as JSON."""
+        if encoding == "json":
+            return np.asarray(json.loads(blob))
+        return StreamCodec.decode(blob)
@@ -0,0 +1,369 @@
+import asyncio
+import itertools
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.activity import Activity
+from app.models.oauth import OAuthConnection
+from app.models.sync import SyncJob, StravaSyncState
+from app.services.strava_client import StravaAPIError
+from app.services.strava_rate_limiter import RateLimitExceeded, Priority
+from app.services.strava_sync import StravaSyncService
+from app.services.activity_streams import ActivityStreamService
+from app.services.performance_engine import PerformanceEngine
+from app.services.performance_snapshots import SnapshotService
+from app.services.power_curves import CurveService
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class SyncJobService:
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        user_id: int,
+        kind: str = "sync",
+        full: bool = False,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> SyncJob:
+        """Create a job, or return the user's queued/running job of the same kind."""
+        job = SyncJobService.active(db, user_id, kind)
+        if job:
+            # An interactive click on top of a queued background run should jump the queue
+            if job.status == "queued" and priority < job.priority:
+                job.priority = int(priority)
+                db.commit()
+                sync_worker.submit(job)
+            return job
+
+        job = SyncJob(user_id=user_id, kind=kind, full=full, priority=int(priority), status="queued")
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request queued the same job first
+            db.rollback()
+            job = SyncJobService.active(db, user_id, kind)
+            if job is None:
+                raise
+            return job
+        db.refresh(job)
+        sync_worker.submit(job)
+        return job
+
+    @staticmethod
+    def active(db: Session, user_id: int, kind: str) -> Optional[SyncJob]:
+        return db.query(SyncJob).filter(
+            SyncJob.user_id == user_id,
+            SyncJob.kind == kind,
+            SyncJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(SyncJob.id.desc()).first()
+
+    @staticmethod
+    def enqueue_streams(db: Session, user_id: int) -> SyncJob:
+        """Stream fetches always queue behind summary ingestion."""
+        return SyncJobService.enqueue(db, user_id, kind="streams", priority=Priority.BACKFILL)
+
+    @staticmethod
+    def enqueue_metrics(
+        db: Session,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> SyncJob:
+        """Queue re-rating the activities starting in [start, end), None is open.
+
+        A queued job's window is widened instead of queueing another; a
+        running one may have read the old thresholds, so a new job follows it.
+        """
+        job = db.query(SyncJob).filter(
+            SyncJob.user_id == user_id,
+            SyncJob.kind == "metrics",
+            SyncJob.status == "queued"
+        ).order_by(SyncJob.id.desc()).first()
+        if job:
+            job.window_start = None if start is None or job.window_start is None else min(start, job.window_start)
+            job.window_end = None if end is None or job.window_end is None else max(end, job.window_end)
+            db.commit()
+            return job
+
+        job = SyncJob(
+            user_id=user_id, kind="metrics", priority=int(Priority.BACKFILL), status="queued",
+            window_start=start, window_end=end
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        sync_worker.submit(job)
+        return job
+
+    @staticmethod
+    def to_dict(job: SyncJob) -> Dict[str, Any]:
+        return {
+            "job_id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "pages_fetched": job.pages_fetched or 0,
+            "requests": job.requests or 0,
+            "rows_written": job.rows_written or 0,
+            "error": job.error,
+            "retry_after": job.retry_after,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None
+        }
+
+
+class SyncWorker:
+    """In-process workers for the jobs in ``sync_jobs``.
+
+    The table is the source of truth: queued jobs are picked up again after a
+    restart and jobs left ``running`` by a crashed process are re-queued. The
+    asyncio queue only orders the job ids, interactive before background.
+    """
+
+    def __init__(self, workers: Optional[int] = None, session_factory: Callable[[], Session] = SessionLocal):
+        self.workers = workers or settings.SYNC_WORKERS
+        self.session_factory = session_factory
+        self.handlers: Dict[str, Callable] = {
+            "sync": run_sync_job,
+            "backfill": run_backfill_job,
+            "streams": run_streams_job,
+            "metrics": run_metrics_job,
+            "snapshots": run_snapshots_job
+        }
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = []
+        self._counter = itertools.count()
+
+    def submit(self, job: SyncJob) -> None:
+        """Hand a committed job to the workers; safe to call from threadpool routes."""
+        if self._loop is None:
+            return
+        item = (job.priority, next(self._counter), job.id)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._queue.put_nowait(item)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        for job in await run_in_threadpool(self._recover):
+            self.submit(job)
+        await run_in_threadpool(self._enqueue_snapshots)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        if settings.SYNC_INTERVAL_MINUTES > 0:
+            self._tasks.append(asyncio.create_task(self._schedule()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def _recover(self):
+        db = self.session_factory()
+        try:
+            db.query(SyncJob).filter(SyncJob.status == "running").update(
+                {"status": "queued"}, synchronize_session=False
+            )
+            db.commit()
+            jobs = db.query(SyncJob).filter(SyncJob.status == "queued").order_by(SyncJob.id).all()
+            db.expunge_all()
+            return jobs
+        finally:
+            db.close()
+
+    def _enqueue_snapshots(self) -> None:
+        """Materialize the load series of users whose history predates the snapshot table."""
+        db = self.session_factory()
+        try:
+            for user_id in SnapshotService.missing_users(db):
+                SyncJobService.enqueue(db, user_id, kind="snapshots", priority=Priority.BACKFILL)
+        finally:
+            db.close()
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self.run(job_id)
+            except Exception:
+                logger.exception("Sync job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def run(self, job_id: int) -> None:
+        db = self.session_factory()
+        try:
+            job = await run_in_threadpool(lambda: db.get(SyncJob, job_id))
+            # Duplicates in the queue (re-prioritised jobs) only run once
+            if not job or job.status != "queued":
+                return
+
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            await run_in_threadpool(db.commit)
+
+            try:
+                await self.handlers[job.kind](db, job)
+                job.status = "succeeded"
+            except RateLimitExceeded as e:
+                job.status = "rate_limited"
+                job.retry_after = int(e.retry_after)
+                job.error = str(e)
+            except StravaAPIError as e:
+                job.status = "failed"
+                job.error = e.detail
+            except Exception as e:
+                db.rollback()
+                job.status = "failed"
+                job.error = str(e)
+                raise
+            finally:
+                job.finished_at = datetime.utcnow()
+                await run_in_threadpool(db.commit)
+        finally:
+            db.close()
+
+    async def _schedule(self) -> None:
+        """Periodic background sync for every user with a Strava connection.
+
+        Also re-queues unfinished backfills, which then resume from their
+        checkpoint, and stream fetches for activities that still lack them.
+        """
+        while True:
+            await asyncio.sleep(settings.SYNC_INTERVAL_MINUTES * 60)
+            try:
+                await run_in_threadpool(self._enqueue_all)
+            except Exception:
+                logger.exception("Scheduling background syncs failed")
+
+    def _enqueue_all(self) -> None:
+        db = self.session_factory()
+        try:
+            user_ids = [user_id for (user_id,) in db.query(OAuthConnection.user_id).filter(
+                OAuthConnection.provider == "strava"
+            ).distinct()]
+            for user_id in user_ids:
+                SyncJobService.enqueue(db, user_id, priority=Priority.BACKFILL)
+
+            # Pick up backfills that stopped on the rate limit or an error
+            unfinished = [user_id for (user_id,) in db.query(StravaSyncState.user_id).filter(
+                StravaSyncState.backfill_before.isnot(None),
+                StravaSyncState.backfill_completed_at.is_(None),
+                StravaSyncState.user_id.in_(user_ids)
+            )]
+            for user_id in unfinished:
+                SyncJobService.enqueue(db, user_id, kind="backfill", priority=Priority.BACKFILL)
+
+            without_streams = [user_id for (user_id,) in db.query(Activity.user_id).filter(
+                ActivityStreamService.pending_criterion(),
+                Activity.user_id.in_(user_ids)
+            ).distinct()]
+            for user_id in without_streams:
+                SyncJobService.enqueue(db, user_id, kind="streams", priority=Priority.BACKFILL)
+        finally:
+            db.close()
+
+
+async def process_new_activities(db: Session, user_id: int) -> None:
+    """Rate newly ingested activities, refresh the snapshots and queue their streams."""
+    await run_in_threadpool(PerformanceEngine.update_activity_loads, db, user_id, None, True)
+    await run_in_threadpool(SnapshotService.refresh, db, user_id)
+    await run_in_threadpool(SyncJobService.enqueue_streams, db, user_id)
+
+
+async def run_sync_job(db: Session, job: SyncJob) -> None:
+    totals = {"pages_fetched": 0, "requests": 0, "new_activities": 0}
+
+    def progress(result: Dict[str, Any]) -> None:
+        job.pages_fetched = totals["pages_fetched"] + result["pages_fetched"]
+        job.requests = totals["requests"] + result["requests"]
+        job.rows_written = totals["new_activities"] + result["new_activities"]
+        db.commit()
+
+    priority = Priority(job.priority)
+    watermark = None
+    while True:
+        result = await StravaSyncService.sync_user(db, job.user_id, full=job.full, priority=priority, progress=progress)
+        await run_in_threadpool(progress, result)
+        for name in totals:
+            totals[name] += result[name]
+        # Incremental pages come oldest first, so a capped run left newer activities
+        # behind: continue from the advanced watermark in the background
+        if not (result["has_more"] and result["incremental"]) or result["latest_activity_at"] == watermark:
+            break
+        watermark = result["latest_activity_at"]
+        priority = Priority.BACKFILL
+
+    # First sync of a long history: pages come newest first, the rest comes from a background backfill
+    if result["has_more"] and not result["incremental"]:
+        await run_in_threadpool(
+            SyncJobService.enqueue, db, job.user_id, "backfill", False, Priority.BACKFILL
+        )
+    if totals["new_activities"]:
+        await process_new_activities(db, job.user_id)
+
+
+async def run_backfill_job(db: Session, job: SyncJob) -> None:
+    def progress(result: Dict[str, Any]) -> None:
+        job.pages_fetched = result["pages_fetched"]
+        job.requests = result["requests"]
+        job.rows_written = result["new_activities"]
+        db.commit()
+
+    result = await StravaSyncService.backfill_user(
+        db, job.user_id, restart=job.full, priority=Priority(job.priority), progress=progress
+    )
+    await run_in_threadpool(progress, result)
+    if result["new_activities"]:
+        await process_new_activities(db, job.user_id)
+
+
+async def run_streams_job(db: Session, job: SyncJob) -> None:
+    def progress(result: Dict[str, Any]) -> None:
+        job.pages_fetched = result["activities"]
+        job.requests = result["requests"]
+        job.rows_written = result["streams"]
+        db.commit()
+
+    result = await ActivityStreamService.fetch_pending(
+        db, job.user_id, priority=Priority(job.priority), progress=progress
+    )
+    await run_in_threadpool(progress, result)
+    # Activities whose streams predate the curve cache
+    if await run_in_threadpool(CurveService.update_activity_curves, db, job.user_id):
+        await run_in_threadpool(SnapshotService.refresh, db, job.user_id)
+
+
+async def run_metrics_job(db: Session, job: SyncJob) -> None:
+    """Recompute NP/IF/TSS/VO2max of the user's activities in the job's window, e.g. after a threshold change."""
+    job.rows_written = await run_in_threadpool(
+        PerformanceEngine.update_activity_loads, db, job.user_id, None, False, job.window_start, job.window_end
+    )
+    await run_in_threadpool(CurveService.update_activity_curves, db, job.user_id)
+    await run_in_threadpool(SnapshotService.refresh, db, job.user_id)
+
+
+async def run_snapshots_job(db: Session, job: SyncJob) -> None:
+    """Rebuild the user's materialized daily load series from scratch."""
+    job.rows_written = await run_in_threadpool(SnapshotService.refresh, db, job.user_id, True)
+
+
+sync_worker = SyncWorker()
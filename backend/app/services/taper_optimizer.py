@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.models.goal import Goal
+from app.services.goal_forecast import GoalForecastService
+from app.services.performance_engine import ewma, CTL_DAYS, ATL_DAYS
+
+TAPER_LENGTHS = (7, 14, 21)
+DEFAULT_MAX_CTL_LOSS = 0.1  # share of the CTL at the start of the taper
+
+
+def end_weights(days: int, time_constant: int) -> np.ndarray:
+    """Effect of one TSS on each of ``days`` days on the EWMA at the end of the last one."""
+    alpha = 1 / time_constant
+    return alpha * (1 - alpha) ** np.arange(days - 1, -1, -1)
+
+
+class TaperOptimizer:
+    """Daily loads for the last 1-3 weeks before an event goal.
+
+    Maximizes race-morning TSB (CTL - ATL at the end of the day before the
+    event) while CTL loses at most ``max_ctl_loss`` over the taper, and no day
+    exceeds its ``Availability`` minutes at the athlete's TSS per hour (zero
+    in blocked periods). Days before the taper follow the usual plan of
+    ``GoalForecastService`` at the fitted compliance.
+
+    CTL and ATL are linear in the daily loads, so race-morning TSB and CTL
+    are dot products with fixed weights and the problem is a linear program
+    with one constraint: load days that raise TSB as far as allowed, then
+    add the missing CTL on the days that cost the least TSB per CTL point.
+    One sort per taper length gives the exact optimum. The recommended
+    length is the best one meeting the CTL constraint, None if none does.
+    """
+
+    @staticmethod
+    def solve(tsb_weights: np.ndarray, ctl_weights: np.ndarray, caps: np.ndarray, ctl_needed: float):
+        """Loads within ``caps`` maximizing ``tsb_weights @ x`` with ``ctl_weights @ x >= ctl_needed``.
+
+        Returns the loads and whether the CTL constraint could be met.
+        """
+        loads = np.where(tsb_weights > 0, caps, 0.0)
+        missing = ctl_needed - ctl_weights @ loads
+        if missing <= 0:
+            return loads, True
+        candidates = np.flatnonzero(tsb_weights <= 0)
+        # TSB given up per CTL point gained
+        candidates = candidates[np.argsort(-tsb_weights[candidates] / ctl_weights[candidates], kind="stable")]
+        gain = np.cumsum(ctl_weights[candidates] * caps[candidates])
+        full = np.searchsorted(gain, missing)
+        loads[candidates[:full]] = caps[candidates[:full]]
+        if full < len(candidates):
+            last = candidates[full]
+            loads[last] = (missing - (gain[full - 1] if full else 0.0)) / ctl_weights[last]
+            return loads, True
+        return loads, False
+
+    @staticmethod
+    def optimize(db: Session, goal: Goal, max_ctl_loss: float = DEFAULT_MAX_CTL_LOSS) -> Dict[str, Any]:
+        if goal.event_date is None:
+            raise HTTPException(status_code=400, detail="Goal has no event date")
+        today = datetime.utcnow().date()
+        event_day = goal.event_date.date()
+        # Days from tomorrow to the day before the event
+        days = (event_day - today).days - 1
+        if days < 1:
+            raise HTTPException(status_code=400, detail="Event is too close for a taper")
+
+        context = GoalForecastService.context(db, goal.user_id, today)
+        usual, compliance, _ = GoalForecastService.plan(context, days)
+        usual = usual * compliance
+        future = [today + timedelta(days=offset) for offset in range(1, days + 1)]
+        if context["minutes"].any():
+            caps = context["minutes"][[day.weekday() for day in future]] / 60 * context["tss_per_hour"]
+        else:
+            caps = np.full(days, context["history"].max(initial=0.0))
+        for start, end in context["blocked"]:
+            caps[[start <= day <= end for day in future]] = 0
+
+        lengths = sorted({min(length, days) for length in TAPER_LENGTHS})
+        schedules = np.tile(usual, (len(lengths), 1))
+        met = []
+        for row, length in enumerate(lengths):
+            # State at the start of the taper under the usual plan
+            before = usual[:days - length]
+            ctl_start = ewma(before, CTL_DAYS, context["ctl"])[-1] if len(before) else context["ctl"]
+            atl_start = ewma(before, ATL_DAYS, context["atl"])[-1] if len(before) else context["atl"]
+            ctl_weights, atl_weights = end_weights(length, CTL_DAYS), end_weights(length, ATL_DAYS)
+            ctl_decayed = ctl_start * (1 - 1 / CTL_DAYS) ** length
+            loads, ok = TaperOptimizer.solve(
+                ctl_weights - atl_weights, ctl_weights, caps[days - length:],
+                (1 - max_ctl_loss) * ctl_start - ctl_decayed
+            )
+            schedules[row, days - length:] = loads
+            met.append((ctl_start, ok))
+
+        # All candidate schedules in one pass
+        ctl = ewma(schedules, CTL_DAYS, np.full(len(lengths), context["ctl"]))
+        atl = ewma(schedules, ATL_DAYS, np.full(len(lengths), context["atl"]))
+        tsb = ctl[:, -1] - atl[:, -1]
+        # Only lengths that keep the CTL floor qualify, None if even full days can't
+        feasible = [row for row, (_, ok) in enumerate(met) if ok]
+        best = max(feasible, key=lambda row: round(float(tsb[row]), 1), default=None)
+
+        options = []
+        for row, length in enumerate(lengths):
+            ctl_start, ok = met[row]
+            taper = range(days - length, days)
+            options.append({
+                "days": length,
+                "loads": [{
+                    "date": future[i].isoformat(),
+                    "tss": round(float(schedules[row, i]), 1),
+                    "minutes": round(float(schedules[row, i]) / context["tss_per_hour"] * 60) if context["tss_per_hour"] else None
+                } for i in taper],
+                "race_day": {
+                    "ctl": round(float(ctl[row, -1]), 1),
+                    "atl": round(float(atl[row, -1]), 1),
+                    "tsb": round(float(tsb[row]), 1)
+                },
+                "ctl_loss": round(float(1 - ctl[row, -1] / ctl_start), 3) if ctl_start > 0 else 0.0,
+                "ctl_constraint_met": ok
+            })
+        return {
+            "goal_id": goal.id,
+            "event_date": event_day.isoformat(),
+            "max_ctl_loss": max_ctl_loss,
+            "recommended": lengths[best] if best is not None else None,
+            "options": options
+        }
@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.models.profile import UserProfile, AthleteThreshold
+from app.models.sync import SyncJob
+from app.services.sync_jobs import SyncJobService
+
+VERSIONED_FIELDS = ("ftp", "threshold_hr", "threshold_pace", "css")
+
+
+class ThresholdService:
+    """Time-versioned FTP, LTHR, threshold pace and CSS.
+
+    A version applies from its ``valid_from`` until the next one, so adding,
+    changing or deleting a version only re-rates the activities in that
+    validity window, in a background metrics job.
+    """
+
+    @staticmethod
+    def get_versions(db: Session, user_id: int) -> List[AthleteThreshold]:
+        return sorted(
+            db.query(AthleteThreshold).filter(AthleteThreshold.user_id == user_id),
+            key=lambda version: (version.valid_from is not None, version.valid_from or datetime.min)
+        )
+
+    @staticmethod
+    def window(versions: List[AthleteThreshold], version: AthleteThreshold) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """[start, end) of the activities rated with ``version``; None is open."""
+        index = versions.index(version)
+        # The oldest version also rates everything before it
+        start = None if index == 0 else version.valid_from
+        end = versions[index + 1].valid_from if index + 1 < len(versions) else None
+        return start, end
+
+    @staticmethod
+    def set_version(
+        db: Session,
+        user_id: int,
+        valid_from: Optional[datetime],
+        values: Dict[str, Any]
+    ) -> Tuple[AthleteThreshold, SyncJob]:
+        """Create or update the version starting at ``valid_from``.
+
+        Fields not given are carried over from the version in effect at that
+        date. Returns the version and the metrics job re-rating its window.
+        """
+        versions = ThresholdService.get_versions(db, user_id)
+        version = next((v for v in versions if v.valid_from == valid_from), None)
+        if version is None:
+            previous = [v for v in versions if v.valid_from is None or (valid_from and v.valid_from <= valid_from)]
+            version = AthleteThreshold(user_id=user_id, valid_from=valid_from)
+            for field in VERSIONED_FIELDS:
+                setattr(version, field, getattr(previous[-1], field) if previous else None)
+            db.add(version)
+            versions = sorted(
+                versions + [version],
+                key=lambda v: (v.valid_from is not None, v.valid_from or datetime.min)
+            )
+        for field, value in values.items():
+            if field in VERSIONED_FIELDS:
+                setattr(version, field, value)
+
+        start, end = ThresholdService.window(versions, version)
+        ThresholdService.sync_profile(db, user_id, versions)
+        db.commit()
+        db.refresh(version)
+        return version, SyncJobService.enqueue_metrics(db, user_id, start, end)
+
+    @staticmethod
+    def delete_version(db: Session, user_id: int, version_id: int) -> SyncJob:
+        """Drop a version; its window falls back to the version before it."""
+        versions = ThresholdService.get_versions(db, user_id)
+        version = next((v for v in versions if v.id == version_id), None)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Threshold version not found")
+
+        start, end = ThresholdService.window(versions, version)
+        versions.remove(version)
+        db.delete(version)
+        ThresholdService.sync_profile(db, user_id, versions)
+        db.commit()
+        return SyncJobService.enqueue_metrics(db, user_id, start, end)
+
+    @staticmethod
+    def sync_profile(db: Session, user_id: int, versions: List[AthleteThreshold]) -> None:
+        """Mirror the newest version into the profile, which shows the current thresholds."""
+        profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        if profile is None or not versions:
+            return
+        for field in ("ftp", "threshold_hr", "threshold_pace"):
+            setattr(profile, field, getattr(versions[-1], field))
@@ -0,0 +1,179 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.activity import Activity, ActivityRollup, RollupState
+
+PERIODS = ("day", "week", "month", "year")
+ROLLUP_PERIODS = ("week", "month", "year")
+UNKNOWN_SPORT = "Unknown"
+
+
+def period_floor(day: date, period: str) -> date:
+    """First day of the day/week (Monday)/month/year containing ``day``."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    if period == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_period(start: date, period: str) -> date:
+    if period == "week":
+        return start + timedelta(days=7)
+    if period == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    if period == "year":
+        return start.replace(year=start.year + 1)
+    return start + timedelta(days=1)
+
+
+def as_date(value: Any) -> date:
+    """Period keys come back as strings from SQLite's date(), as datetimes from Postgres' date_trunc."""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+class VolumeService:
+    """Count, distance, moving time and elevation per day, week, month or year.
+
+    Aggregation runs in SQL (``GROUP BY`` the period start of ``local_date``,
+    the day in the activity's own timezone) over the (user_id, local_date)
+    index. Weeks, months and years are also
+    kept in ``activity_rollups``, recomputed for the periods an ingested or
+    deleted activity falls into, so multi-year ranges read one row per
+    period and sport instead of every activity.
+    """
+
+    @staticmethod
+    def period_key(db: Session, period: str):
+        """SQL expression for the start of the period containing ``local_date``."""
+        if period == "day":
+            return Activity.local_date
+        if db.get_bind().dialect.name == "postgresql":
+            return func.date_trunc(period, Activity.local_date)
+        modifiers = {
+            "week": ("weekday 0", "-6 days"),  # Sunday on or after, minus six days: Monday
+            "month": ("start of month",),
+            "year": ("start of year",)
+        }[period]
+        return func.date(Activity.local_date, *modifiers)
+
+    @staticmethod
+    def aggregate(
+        db: Session,
+        user_id: int,
+        period: str,
+        start: date,
+        end: Optional[date] = None,
+        by_sport: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Totals per period (and sport type) of the activities on local days [start, end)."""
+        key = VolumeService.period_key(db, period).label("period_start")
+        sport = func.coalesce(Activity.sport_type, UNKNOWN_SPORT).label("sport_type")
+        stmt = select(
+            key,
+            *((sport,) if by_sport else ()),
+            func.count(Activity.id).label("count"),
+            func.coalesce(func.sum(Activity.distance), 0).label("distance"),
+            func.coalesce(func.sum(Activity.moving_time), 0).label("moving_time"),
+            func.coalesce(func.sum(Activity.total_elevation_gain), 0).label("total_elevation_gain")
+        ).where(
+            Activity.user_id == user_id,
+            Activity.local_date >= start
+        )
+        if end is not None:
+            stmt = stmt.where(Activity.local_date < end)
+        stmt = stmt.group_by(key, *((sport,) if by_sport else ())).order_by(key)
+        return [{**row._asdict(), "period_start": as_date(row.period_start)} for row in db.execute(stmt)]
+
+    @staticmethod
+    def update_rollups(db: Session, user_id: int, days: Iterable[Optional[date]]) -> None:
+        """Recompute the rollups of every period from the first to the last of the local ``days``; the caller commits."""
+        days = [day for day in days if day]
+        if not days:
+            return
+        for period in ROLLUP_PERIODS:
+            first = period_floor(min(days), period)
+            end = next_period(period_floor(max(days), period), period)
+            rows = VolumeService.aggregate(db, user_id, period, first, end, by_sport=True)
+            db.query(ActivityRollup).filter(
+                ActivityRollup.user_id == user_id,
+                ActivityRollup.period == period,
+                ActivityRollup.period_start >= midnight(first),
+                ActivityRollup.period_start < midnight(end)
+            ).delete(synchronize_session=False)
+            if rows:
+                db.execute(ActivityRollup.__table__.insert(), [{
+                    **row,
+                    "user_id": user_id,
+                    "period": period,
+                    "period_start": midnight(row["period_start"]),
+                    "moving_time": int(row["moving_time"])
+                } for row in rows])
+
+    @staticmethod
+    def rebuild_rollups(db: Session, user_id: int) -> None:
+        first, last = db.query(func.min(Activity.local_date), func.max(Activity.local_date)).filter(
+            Activity.user_id == user_id
+        ).one()
+        db.query(ActivityRollup).filter(ActivityRollup.user_id == user_id).delete(synchronize_session=False)
+        VolumeService.update_rollups(db, user_id, [first, last])
+        state = db.query(RollupState).filter(RollupState.user_id == user_id).first()
+        if not state:
+            state = RollupState(user_id=user_id)
+            db.add(state)
+        state.built_at = datetime.utcnow()
+        db.commit()
+
+    @staticmethod
+    def rollups_built(db: Session, user_id: int) -> bool:
+        """Whether the rollups were built from the whole history (one indexed row, however long it is).
+
+        Ingest only recomputes the periods it touches, so rollups that were
+        never built or were cleared stay partial until rebuilt.
+        """
+        return db.query(RollupState.built_at).filter(
+            RollupState.user_id == user_id,
+            RollupState.built_at.isnot(None)
+        ).first() is not None
+
+    @staticmethod
+    def get_volume(db: Session, user_id: int, period: str, start: date, end: date) -> List[Dict[str, Any]]:
+        """Totals and per-sport split of every week/month/year from ``start`` to ``end`` that had activities."""
+        query = db.query(ActivityRollup).filter(
+            ActivityRollup.user_id == user_id,
+            ActivityRollup.period == period,
+            ActivityRollup.period_start >= midnight(period_floor(start, period)),
+            ActivityRollup.period_start <= midnight(end)
+        ).order_by(ActivityRollup.period_start, ActivityRollup.sport_type)
+        if not VolumeService.rollups_built(db, user_id):
+            # Activities from before the rollups were maintained (or were cleared by a migration)
+            VolumeService.rebuild_rollups(db, user_id)
+        rollups = query.all()
+
+        periods: Dict[date, Dict[str, Any]] = {}
+        for rollup in rollups:
+            entry = periods.setdefault(rollup.period_start.date(), {
+                "period_start": rollup.period_start.date().isoformat(),
+                "count": 0, "distance": 0.0, "moving_time": 0, "total_elevation_gain": 0.0, "sports": {}
+            })
+            values = {
+                "count": rollup.count,
+                "distance": rollup.distance,
+                "moving_time": rollup.moving_time,
+                "total_elevation_gain": rollup.total_elevation_gain
+            }
+            for name, value in values.items():
+                entry[name] += value
+            entry["sports"][rollup.sport_type] = values
+        return list(periods.values())
@@ -0,0 +1,32 @@
+import json
+import urllib.request
+from typing import Dict, Any, Tuple
+from sqlalchemy.orm import Session
+from app.models.profile import UserProfile
+
+DEFAULT_LOCATION = (52.52, 13.41)  # Berlin
+
+
+class WeatherService:
+    """Sunrise and sunset at the athlete's location from Open-Meteo."""
+
+    @staticmethod
+    def location(db: Session, user_id: int) -> Tuple[float, float]:
+        profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        lat = profile.latitude if profile and profile.latitude else DEFAULT_LOCATION[0]
+        lng = profile.longitude if profile and profile.longitude else DEFAULT_LOCATION[1]
+        return lat, lng
+
+    @staticmethod
+    def daily_sun(lat: float, lng: float, timeout: float = 10) -> Dict[str, Dict[str, Any]]:
+        """Sunrise/sunset of the next 10 days by date; touches no database session."""
+        url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lng}&daily=sunrise,sunset&timezone=auto&forecast_days=10"
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            data = json.loads(response.read().decode('utf-8'))
+
+        if not data.get('daily'):
+            return {}
+        return {
+            date: {'sunrise': data['daily']['sunrise'][i], 'sunset': data['daily']['sunset'][i]}
+            for i, date in enumerate(data['daily']['time'])
+        }
@@ -3,20 +3,19 @@ Strava API OAuth Client
 Handles authorization, token refresh, and API requests
 """
 import os
-import requests
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 from dotenv import load_dotenv
 
+from app.services.strava_client import StravaAPIClient
+
 load_dotenv()
 
 # Strava API Configuration
 STRAVA_AUTH_URL = "https://www.strava.com/oauth/authorize"
-STRAVA_TOKEN_URL = "https://www.strava.com/oauth/token"
-STRAVA_API_URL = "https://www.strava.com/api/v3"
 
 CLIENT_ID = os.getenv("STRAVA_CLIENT_ID")
-CLIENT_SECRET = os.getenv("STRAVA_CLIENT_SECRET")
 
 
 class StravaClient:
@@ -25,6 +24,13 @@ class StravaClient:
         self.refresh_token = os.getenv("STRAVA_REFRESH_TOKEN")
         self.token_expires_at = os.getenv("STRAVA_TOKEN_EXPIRES_AT")
     
+    def _run(self, call):
+        """Run a request on the async client (this class is used from plain scripts)"""
+        async def runner():
+            async with StravaAPIClient() as client:
+                return await call(client)
+        return asyncio.run(runner())
+    
     def get_authorization_url(self, redirect_uri: str = "http://localhost:8000/callback") -> str:
         """Generate OAuth authorization URL"""
         params = {
@@ -38,27 +44,11 @@ class StravaClient:
     
     def exchange_code_for_token(self, code: str) -> dict:
         """Exchange authorization code for access token"""
-        data = {
-            "client_id": CLIENT_ID,
-            "client_secret": CLIENT_SECRET,
-            "code": code,
-            "grant_type": "authorization_code"
-        }
-        response = requests.post(STRAVA_TOKEN_URL, data=data)
-        response.raise_for_status()
-        return response.json()
+        return self._run(lambda client: client.exchange_code(code))
     
     def refresh_access_token(self) -> dict:
         """Refresh the access token"""
-        data = {
-            "client_id": CLIENT_ID,
-            "client_secret": CLIENT_SECRET,
-            "refresh_token": self.refresh_token,
-            "grant_type": "refresh_token"
-        }
-        response = requests.post(STRAVA_TOKEN_URL, data=data)
-        response.raise_for_status()
-        tokens = response.json()
+        tokens = self._run(lambda client: client.refresh_token(self.refresh_token))
         
         # Update stored tokens
         self.access_token = tokens.get("access_token")
@@ -93,26 +83,12 @@ class StravaClient:
     def get_activities(self, per_page: int = 30, page: int = 1) -> list:
         """Fetch activities from Strava"""
         self.ensure_valid_token()
-        
-        headers = {"Authorization": f"Bearer {self.access_token}"}
-        params = {"per_page": per_page, "page": page}
-        
-        response = requests.get(
-            f"{STRAVA_API_URL}/athlete/activities",
-            headers=headers,
-            params=params
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._run(lambda client: client.get_activities(self.access_token, page, per_page))
     
     def get_athlete(self) -> dict:
         """Get athlete profile"""
         self.ensure_valid_token()
-        
-        headers = {"Authorization": f"Bearer {self.access_token}"}
-        response = requests.get(f"{STRAVA_API_URL}/athlete", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return self._run(lambda client: client.get_athlete(self.access_token))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+"""Fake Strava: post Strava-shaped webhook events to a local backend at a high rate.
+
+    python scripts/fake_strava_webhooks.py --events 5000 --concurrency 10
+    python scripts/fake_strava_webhooks.py --owners 12345 --token <jwt>
+
+Reports how many events per second the receiver accepted. With ``--token``
+it then polls ``/strava/webhook/stats`` until the processor has caught up
+and reports the processed events per second as well. Events of owners
+without a Strava connection are only stored and marked ignored; pass the
+athlete ids of connected users as ``--owners`` to exercise the ingest path.
+The backend only accepts events carrying its ``STRAVA_WEBHOOK_SUBSCRIPTION_ID``
+(``--subscription-id``).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+
+def fake_event(owners, activities: int, subscription_id: int) -> dict:
+    """One event the way Strava posts it."""
+    aspect_type = random.choices(("create", "update", "delete"), (6, 3, 1))[0]
+    updates = {}
+    if aspect_type == "update":
+        updates = random.choice(({"title": f"Renamed {random.randint(1, 999)}"}, {"type": "Ride"}))
+    return {
+        "object_type": "activity",
+        "object_id": random.randint(1, activities),
+        "aspect_type": aspect_type,
+        "owner_id": random.choice(owners),
+        "subscription_id": subscription_id,
+        "event_time": int(time.time()),
+        "updates": updates
+    }
+
+
+async def post_events(url: str, total: int, concurrency: int, owners, activities: int, subscription_id: int) -> dict:
+    sent = {"ok": 0, "failed": 0}
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(fake_event(owners, activities, subscription_id))
+
+    async def worker(client: httpx.AsyncClient):
+        while not queue.empty():
+            event = queue.get_nowait()
+            try:
+                response = await client.post(url, json=event)
+                sent["ok" if response.status_code == 200 else "failed"] += 1
+            except httpx.HTTPError:
+                sent["failed"] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return sent
+
+
+async def wait_processed(stats_url: str, token: str, target: int, timeout: float) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(headers=headers, timeout=10) as client:
+        while True:
+            stats = (await client.get(stats_url)).json()
+            if stats["processed"] >= target or time.perf_counter() > deadline:
+                return stats
+            await asyncio.sleep(0.1)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--owners", default="900001", help="comma separated Strava athlete ids")
+    parser.add_argument("--activities", type=int, default=500, help="distinct activity ids to draw from")
+    parser.add_argument("--subscription-id", type=int, default=1, help="the backend's STRAVA_WEBHOOK_SUBSCRIPTION_ID")
+    parser.add_argument("--token", help="access token, enables waiting for the processor")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    owners = [int(owner) for owner in args.owners.split(",")]
+    stats_url = f"{args.base_url}/strava/webhook/stats"
+    before = None
+    if args.token:
+        before = await wait_processed(stats_url, args.token, 0, 0)
+
+    start = time.perf_counter()
+    sent = await post_events(f"{args.base_url}/strava/webhook", args.events, args.concurrency, owners, args.activities, args.subscription_id)
+    elapsed = time.perf_counter() - start
+    print(f"posted {sent['ok']} events ({sent['failed']} failed) in {elapsed:.2f}s: {sent['ok'] / elapsed:.0f} events/s")
+
+    if before is not None:
+        target = before["processed"] + sent["ok"]
+        stats = await wait_processed(stats_url, args.token, target, args.timeout)
+        elapsed = time.perf_counter() - start
+        processed = stats["processed"] - before["processed"]
+        print(f"processed {processed} events in {elapsed:.2f}s: {processed / elapsed:.0f} events/s")
+        print(stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
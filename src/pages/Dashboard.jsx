@@ -67,40 +67,33 @@ export default function Dashboard() {
         'Authorization': `Bearer ${token}`
       }
 
-      const [athleteRes, activitiesRes, statsRes, loadRes, sessionsRes, calendarRes] = await Promise.allSettled([
-        fetch(`${API_URL}/athlete`, { headers }),
-        fetch(`${API_URL}/activities?limit=100`, { headers }),
-        fetch(`${API_URL}/stats/week?days=${selectedRange}`, { headers }),
-        fetch(`${API_URL}/stats/training-load`, { headers }),
-        fetch(`${API_URL}/training-sessions?days=90`, { headers }),
-        fetch(`${API_URL}/calendar/events?refresh=true`, { headers })
-      ])
-
-      setAthlete(athleteRes.status === 'fulfilled' && athleteRes.value.ok ? await athleteRes.value.json() : null)
-      setActivities(activitiesRes.status === 'fulfilled' && activitiesRes.value.ok ? await activitiesRes.value.json() : [])
-      setWeekStats(statsRes.status === 'fulfilled' && statsRes.value.ok ? await statsRes.value.json() : null)
-      setTrainingLoad(loadRes.status === 'fulfilled' && loadRes.value.ok ? await loadRes.value.json() : null)
-      setTrainingSessions(sessionsRes.status === 'fulfilled' && sessionsRes.value.ok ? await sessionsRes.value.json() : [])
-      setCalendarEvents(calendarRes.status === 'fulfilled' && calendarRes.value.ok ? await calendarRes.value.json() : [])
-      
-      // Fetch sunrise/sunset from Open-Meteo
-      try {
-        const sunRes = await fetch(`${API_URL}/weather/sun/daily`, { headers })
-        const sunData = await sunRes.json()
-        if (sunData && !sunData.error) {
-          const byDate = {}
-          Object.entries(sunData).forEach(([date, times]) => {
-            if (times.sunrise) {
-              const srStr = times.sunrise.substring(11, 16)
-              const ssStr = times.sunset.substring(11, 16)
-              const sr = parseInt(srStr.split(':')[0]) + parseInt(srStr.split(':')[1]) / 60
-              const ss = parseInt(ssStr.split(':')[0]) + parseInt(ssStr.split(':')[1]) / 60
-              byDate[date] = { sunrise: sr, sunset: ss }
-            }
-          })
-          setWeather(byDate)
-        }
-      } catch (e) { console.error('Sun API:', e) }
+      // One request: the backend reads the DB parts on one session and fetches Notion, calendar and weather concurrently
+      const res = await fetch(`${API_URL}/dashboard?days=${selectedRange}&limit=100&session_days=90`, { headers })
+      const data = res.ok ? await res.json() : {}
+      if (data.errors && Object.keys(data.errors).length) console.warn('Dashboard parts failed:', data.errors)
+
+      setAthlete(data.athlete || null)
+      setActivities(data.activities || [])
+      setWeekStats(data.week_stats || null)
+      setTrainingLoad(data.training_load || null)
+      setTrainingSessions(data.training_sessions || [])
+      setCalendarEvents(data.calendar_events || [])
+
+      // Sunrise/sunset from Open-Meteo
+      const sunData = data.weather
+      if (sunData) {
+        const byDate = {}
+        Object.entries(sunData).forEach(([date, times]) => {
+          if (times.sunrise) {
+            const srStr = times.sunrise.substring(11, 16)
+            const ssStr = times.sunset.substring(11, 16)
+            const sr = parseInt(srStr.split(':')[0]) + parseInt(srStr.split(':')[1]) / 60
+            const ss = parseInt(ssStr.split(':')[0]) + parseInt(ssStr.split(':')[1]) / 60
+            byDate[date] = { sunrise: sr, sunset: ss }
+          }
+        })
+        setWeather(byDate)
+      }
     } catch (err) {
       console.error('Error:', err)
     } finally {
@@ -279,11 +272,13 @@ export default function Dashboard() {
     })).sort((a, b) => new Date(a.date) - new Date(b.date))
     : []
 
-  const loadChartData = trainingLoad?.daily_tss
-    ? Object.entries(trainingLoad.daily_tss).map(([date, tss]) => ({
+  const loadChartData = trainingLoad?.series
+    ? trainingLoad.series.dates.map((date, i) => ({
       date: new Date(date).toLocaleDateString('de-DE', { month: 'short', day: 'numeric' }),
-      tss: Math.round(tss)
-    })).sort((a, b) => new Date(a.date) - new Date(b.date))
+      tss: Math.round(trainingLoad.series.tss[i]),
+      ctl: trainingLoad.series.ctl[i],
+      atl: trainingLoad.series.atl[i]
+    }))
     : []
 
   return (
@@ -377,6 +372,13 @@ export default function Dashboard() {
                   <span className={`text-4xl font-bold ${trainingLoad?.ctl > trainingLoad?.atl ? 'text-green-600 dark:text-green-400' : 'text-slate-800 dark:text-white'}`}>{trainingLoad?.ctl || 0}</span>
                   <span className="text-sm font-medium text-slate-400">TSS/Tag</span>
                 </div>
+                {trainingLoad?.sports && (
+                  <div className="mt-3 flex gap-4 text-xs font-medium text-slate-500 dark:text-slate-400">
+                    <span>Schwimmen {trainingLoad.sports.swim.ctl}</span>
+                    <span>Rad {trainingLoad.sports.bike.ctl}</span>
+                    <span>Laufen {trainingLoad.sports.run.ctl}</span>
+                  </div>
+                )}
               </div>
 
               <div className="glass-card p-6 rounded-2xl relative overflow-hidden group">
@@ -413,7 +415,9 @@ export default function Dashboard() {
                       <XAxis dataKey="date" tick={{ fill: '#64748b', fontSize: 12 }} axisLine={false} tickLine={false} />
                       <YAxis tick={{ fill: '#64748b', fontSize: 12 }} axisLine={false} tickLine={false} />
                       <Tooltip contentStyle={{ borderRadius: '12px', background: 'rgba(15,23,42,0.9)', border: 'none', color: '#fff' }} />
-                      <Area type="monotone" dataKey="tss" stroke="var(--ring)" strokeWidth={3} fillOpacity={1} fill="url(#colorTss)" />
+                      <Area type="monotone" dataKey="tss" name="TSS" stroke="var(--ring)" strokeWidth={1} fillOpacity={1} fill="url(#colorTss)" />
+                      <Area type="monotone" dataKey="ctl" name="CTL" stroke="#22c55e" strokeWidth={3} fill="none" dot={false} />
+                      <Area type="monotone" dataKey="atl" name="ATL" stroke="#a855f7" strokeWidth={2} fill="none" dot={false} />
                       <defs>
                         <linearGradient id="colorTss" x1="0" y1="0" x2="0" y2="1">
                           <stop offset="5%" stopColor="var(--ring)" stopOpacity={0.3} />
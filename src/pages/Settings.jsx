@@ -6,6 +6,8 @@ import { Settings, Loader2, Activity, Link, Unlink, RefreshCw, Check, X, ArrowLe
 import CalendarSettings from './CalendarSettings'
 
 const API_URL = (import.meta.env.VITE_API_URL || 'http://192.168.20.112:8000') + '/api/v1'
+// Give up polling a sync job that hasn't finished by then (e.g. no worker running)
+const SYNC_POLL_TIMEOUT_MS = 5 * 60 * 1000
 
 export default function SettingsPage() {
   const { token, logout } = useAuth()
@@ -87,13 +89,34 @@ export default function SettingsPage() {
         method: 'POST',
         headers: { 'Authorization': `Bearer ${token}` }
       })
-      const data = await res.json()
-      
-      if (res.ok) {
-        setSyncResult({ success: true, count: data.new_activities })
+      let job = await res.json()
+
+      if (!res.ok) {
+        setSyncResult({ success: false, error: job.detail || 'Fehler' })
+        setSyncing(false)
+        return
+      }
+
+      // Sync runs in the background, poll the job until it is done
+      const deadline = Date.now() + SYNC_POLL_TIMEOUT_MS
+      while (job.status === 'queued' || job.status === 'running') {
+        if (Date.now() > deadline) {
+          setSyncResult({ success: false, error: 'Sync antwortet nicht, bitte später erneut versuchen' })
+          setSyncing(false)
+          return
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        const jobRes = await fetch(`${API_URL}/strava/sync/${job.job_id}`, {
+          headers: { 'Authorization': `Bearer ${token}` }
+        })
+        job = await jobRes.json()
+      }
+
+      if (job.status === 'succeeded') {
+        setSyncResult({ success: true, count: job.rows_written })
         loadActivities()
       } else {
-        setSyncResult({ success: false, error: data.detail || 'Fehler' })
+        setSyncResult({ success: false, error: job.error || 'Fehler' })
       }
     } catch (err) {
       setSyncResult({ success: false, error: err.message })